@@ -0,0 +1,36 @@
+"""add_scope_category_column
+
+Revision ID: 5b7e2c9d4a10
+Revises: 0c36bd5048dc
+Create Date: 2026-10-16 09:12:05.418233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c9d4a10'
+down_revision: Union[str, None] = '0c36bd5048dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Category is the second segment of the scope name (akm:projects:read -> projects)
+    op.add_column(
+        'akm_scopes',
+        sa.Column('category', sa.String(length=100), server_default='system', nullable=False)
+    )
+
+    # Backfill existing scopes; names without a second segment stay 'system'
+    op.execute(
+        "UPDATE akm_scopes "
+        "SET category = COALESCE(NULLIF(split_part(scope_name, ':', 2), ''), 'system')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('akm_scopes', 'category')
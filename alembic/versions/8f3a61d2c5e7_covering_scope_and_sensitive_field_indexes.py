@@ -0,0 +1,71 @@
+"""covering_scope_and_sensitive_field_indexes
+
+Revision ID: 8f3a61d2c5e7
+Revises: 5b7e2c9d4a10
+Create Date: 2026-10-16 10:04:31.772519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a61d2c5e7'
+down_revision: Union[str, None] = '5b7e2c9d4a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _require_valid_index(name: str) -> None:
+    # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind
+    valid = op.get_bind().execute(
+        sa.text(
+            "SELECT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": name},
+    ).scalar()
+    if not valid:
+        raise RuntimeError(f"Index {name} is missing or INVALID; drop it and rerun the migration")
+
+
+def upgrade() -> None:
+    # Build the new indexes without blocking writes on live tables
+    with op.get_context().autocommit_block():
+        # Clear leftovers of an earlier run that failed half-way
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS uq_project_scope_covering')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS uq_global_sensitive_field')
+        # description is unbounded Text and stays out of the index: B-tree
+        # tuples are capped at about 2.7 KB
+        op.create_index(
+            'uq_project_scope_covering', 'akm_scopes', ['project_id', 'scope_name'],
+            unique=True,
+            postgresql_include=['id', 'is_active'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'uq_global_sensitive_field', 'akm_sensitive_fields', ['field_name'],
+            unique=True,
+            postgresql_where=sa.text('project_id IS NULL'),
+            postgresql_concurrently=True,
+        )
+
+    _require_valid_index('uq_project_scope_covering')
+    _require_valid_index('uq_global_sensitive_field')
+
+    # The covering index takes over the unique constraint's name and role
+    op.drop_constraint('uq_project_scope', 'akm_scopes', type_='unique')
+    op.execute('ALTER INDEX uq_project_scope_covering RENAME TO uq_project_scope')
+
+    # Same columns as uq_project_sensitive_field's backing index
+    op.drop_index('idx_sensitive_field_project', table_name='akm_sensitive_fields')
+
+
+def downgrade() -> None:
+    op.create_index('idx_sensitive_field_project', 'akm_sensitive_fields', ['project_id', 'field_name'], unique=False)
+    op.drop_index('uq_global_sensitive_field', table_name='akm_sensitive_fields')
+    op.drop_index('uq_project_scope', table_name='akm_scopes')
+    op.create_unique_constraint('uq_project_scope', 'akm_scopes', ['project_id', 'scope_name'])
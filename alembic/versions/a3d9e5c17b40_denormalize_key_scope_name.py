@@ -0,0 +1,72 @@
+"""denormalize_key_scope_name
+
+Revision ID: a3d9e5c17b40
+Revises: f2c8d61e4a37
+Create Date: 2026-10-16 16:12:47.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d9e5c17b40'
+down_revision: Union[str, None] = 'f2c8d61e4a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('akm_api_key_scopes', sa.Column('scope_name', sa.String(length=100), nullable=True))
+    op.execute(
+        """
+        UPDATE akm_api_key_scopes AS aks
+        SET scope_name = s.scope_name
+        FROM akm_scopes AS s
+        WHERE s.id = aks.scope_id
+        """
+    )
+    op.alter_column('akm_api_key_scopes', 'scope_name', nullable=False)
+
+    # Scope renames are rare; carry them over to the assignment rows
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION akm_sync_key_scope_name() RETURNS trigger AS $$
+        BEGIN
+            UPDATE akm_api_key_scopes
+            SET scope_name = NEW.scope_name
+            WHERE scope_id = NEW.id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_akm_scopes_sync_name
+        AFTER UPDATE OF scope_name ON akm_scopes
+        FOR EACH ROW
+        WHEN (OLD.scope_name IS DISTINCT FROM NEW.scope_name)
+        EXECUTE FUNCTION akm_sync_key_scope_name()
+        """
+    )
+
+    # Authentication reads scope names by api_key_id straight from the index
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_akm_key_scope_covering', 'akm_api_key_scopes', ['api_key_id', 'scope_id'],
+            postgresql_include=['scope_name'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index('idx_akm_key_scope', table_name='akm_api_key_scopes', postgresql_concurrently=True)
+    op.execute('ALTER INDEX idx_akm_key_scope_covering RENAME TO idx_akm_key_scope')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_akm_key_scope', table_name='akm_api_key_scopes')
+    op.create_index('idx_akm_key_scope', 'akm_api_key_scopes', ['api_key_id', 'scope_id'], unique=False)
+    op.execute('DROP TRIGGER IF EXISTS trg_akm_scopes_sync_name ON akm_scopes')
+    op.execute('DROP FUNCTION IF EXISTS akm_sync_key_scope_name()')
+    op.drop_column('akm_api_key_scopes', 'scope_name')
@@ -0,0 +1,33 @@
+"""key_hash_hash_index
+
+Revision ID: b6f1a84d2c93
+Revises: a3d9e5c17b40
+Create Date: 2026-10-16 16:35:21.540118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f1a84d2c93'
+down_revision: Union[str, None] = 'a3d9e5c17b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_akm_key_hash_hash', 'akm_api_keys', ['key_hash'],
+            postgresql_using='hash',
+            postgresql_concurrently=True,
+        )
+        # key_hash is unique, so the trailing is_active column never narrowed a lookup
+        op.drop_index('idx_akm_key_hash_active', table_name='akm_api_keys', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index('idx_akm_key_hash_active', 'akm_api_keys', ['key_hash', 'is_active'], unique=False)
+    op.drop_index('idx_akm_key_hash_hash', table_name='akm_api_keys')
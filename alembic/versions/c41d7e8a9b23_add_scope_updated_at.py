@@ -0,0 +1,30 @@
+"""add_scope_updated_at
+
+Revision ID: c41d7e8a9b23
+Revises: 8f3a61d2c5e7
+Create Date: 2026-10-16 11:20:47.306194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e8a9b23'
+down_revision: Union[str, None] = '8f3a61d2c5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL until the first update; readers fall back to created_at
+    op.add_column(
+        'akm_scopes',
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('akm_scopes', 'updated_at')
@@ -0,0 +1,48 @@
+"""binary_digest_columns
+
+Revision ID: c8e2b57f0d16
+Revises: b6f1a84d2c93
+Create Date: 2026-10-16 17:02:55.918463
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2b57f0d16'
+down_revision: Union[str, None] = 'b6f1a84d2c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_DIGEST_COLUMNS = (
+    ('akm_api_keys', 'key_hash', False),
+    ('akm_audit_logs', 'entry_hash', False),
+    ('akm_audit_logs', 'prev_hash', True),
+)
+
+
+def upgrade() -> None:
+    # Hex text -> 32 raw bytes; indexes on these columns are rebuilt in place
+    for table, column, nullable in _DIGEST_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.LargeBinary(length=32),
+            existing_type=sa.String(length=64),
+            existing_nullable=nullable,
+            postgresql_using=f"decode({column}, 'hex')",
+        )
+
+
+def downgrade() -> None:
+    for table, column, nullable in _DIGEST_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.String(length=64),
+            existing_type=sa.LargeBinary(length=32),
+            existing_nullable=nullable,
+            postgresql_using=f"encode({column}, 'hex')",
+        )
@@ -0,0 +1,30 @@
+"""add_audit_prev_hash
+
+Revision ID: d5a0f3b7e812
+Revises: c41d7e8a9b23
+Create Date: 2026-10-16 14:02:18.540273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a0f3b7e812'
+down_revision: Union[str, None] = 'c41d7e8a9b23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows stay unchained (NULL); their entry_hash still verifies
+    op.add_column(
+        'akm_audit_logs',
+        sa.Column('prev_hash', sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('akm_audit_logs', 'prev_hash')
@@ -0,0 +1,54 @@
+"""covering_audit_time_indexes
+
+Revision ID: e7b4c2a9f015
+Revises: d5a0f3b7e812
+Create Date: 2026-10-16 15:12:44.208316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4c2a9f015'
+down_revision: Union[str, None] = 'd5a0f3b7e812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# AuditLogSummary columns not already in the index key
+_SUMMARY_INCLUDE = [
+    'id', 'correlation_id', 'operation', 'resource_type', 'resource_id',
+    'status', 'ip_address', 'response_status',
+]
+
+
+def upgrade() -> None:
+    # Build the covering indexes beside the old ones, then swap them in
+    # without blocking audit writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_audit_project_time_covering', 'akm_audit_logs',
+            ['project_id', sa.text('timestamp DESC')],
+            postgresql_include=_SUMMARY_INCLUDE + ['api_key_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'idx_audit_key_time_covering', 'akm_audit_logs',
+            ['api_key_id', sa.text('timestamp DESC')],
+            postgresql_include=_SUMMARY_INCLUDE + ['project_id'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index('idx_audit_project_time', table_name='akm_audit_logs', postgresql_concurrently=True)
+        op.drop_index('idx_audit_key_time', table_name='akm_audit_logs', postgresql_concurrently=True)
+
+    op.execute('ALTER INDEX idx_audit_project_time_covering RENAME TO idx_audit_project_time')
+    op.execute('ALTER INDEX idx_audit_key_time_covering RENAME TO idx_audit_key_time')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_audit_key_time', table_name='akm_audit_logs')
+    op.drop_index('idx_audit_project_time', table_name='akm_audit_logs')
+    op.create_index('idx_audit_key_time', 'akm_audit_logs', ['api_key_id', sa.text('timestamp DESC')], unique=False)
+    op.create_index('idx_audit_project_time', 'akm_audit_logs', ['project_id', sa.text('timestamp DESC')], unique=False)
@@ -0,0 +1,44 @@
+"""rate_bucket_expiry_index
+
+Revision ID: f2c8d61e4a37
+Revises: e7b4c2a9f015
+Create Date: 2026-10-16 15:40:09.631872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8d61e4a37'
+down_revision: Union[str, None] = 'e7b4c2a9f015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # The expiry sweep filters on window_end without a key
+        op.create_index(
+            'idx_akm_rate_bucket_window_end', 'akm_rate_limit_buckets', ['window_end'],
+            postgresql_concurrently=True,
+        )
+        # Both are left prefixes of the tables' unique constraints
+        op.drop_index(
+            'idx_akm_rate_bucket_window', table_name='akm_rate_limit_buckets',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'idx_akm_usage_key_date', table_name='akm_usage_metrics',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.create_index('idx_akm_usage_key_date', 'akm_usage_metrics', ['api_key_id', 'date'], unique=False)
+    op.create_index(
+        'idx_akm_rate_bucket_window', 'akm_rate_limit_buckets',
+        ['api_key_id', 'window_start', 'window_end'], unique=False,
+    )
+    op.drop_index('idx_akm_rate_bucket_window_end', table_name='akm_rate_limit_buckets')
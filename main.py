@@ -1,34 +1,26 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime
-import uuid
 import traceback
-from fastapi import FastAPI, Request, HTTPException
+from typing import Optional
+from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 import time
+import orjson
 
-from src.api import (
-    health_router,
-    home_router,
-    projects_router,
-    keys_router,
-    scopes_router,
-    webhooks_router,
-    configs_router,
-    alerts_router,
-    openapi_scopes_router,
-    audit_router,
-    sensitive_fields_router,
-    project_configurations_router,
-)
+from src.api import health_router, home_router
 # Import v1 API router
-from src.api.v1 import v1_router
+from src.api.v1 import V1_ROUTERS, v1_router
+from src.api.routes.openapi_scopes import shutdown_generation_pool
 from src.api.versioning import LATEST_VERSION, get_deprecation_warning
 from src.middleware import RateLimitMiddleware, VersioningMiddleware
 from src.middleware.audit import AuditMiddleware
 from src.middleware.cors import DynamicCORSMiddleware
 from src.config import settings
+from src.database.connection import close_database_connections, warm_up_pool
+from src.audit_logger import AuditLogger, start_audit_flusher, stop_audit_flusher
 from src.logging_config import get_logger, log_with_context
 
 # Initialize logger
@@ -44,8 +36,20 @@ log_with_context(
     betterstack_enabled=settings.betterstack_enabled
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prefill the database pool and start the audit writer; drain and dispose on shutdown."""
+    await warm_up_pool(settings.db_pool_warmup)
+    start_audit_flusher()
+    yield
+    shutdown_generation_pool()
+    await stop_audit_flusher()
+    await close_database_connections()
+
+
 # Create FastAPI application with security scheme
 app = FastAPI(
+    lifespan=lifespan,
     title="API Key Management Service",
     description="""
 **API Key Management and Authentication Service**
@@ -187,13 +191,37 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+# Encoded schema, built on the first /openapi.json request
+_openapi_body: Optional[bytes] = None
+
+
+async def openapi_json(request: Request) -> Response:
+    """Serve the OpenAPI schema as bytes encoded once per process."""
+    global _openapi_body
+    if _openapi_body is None:
+        schema = app.openapi()
+        if not app.openapi_schema:
+            # Generation failed; report it without caching the error payload
+            return JSONResponse(schema)
+        _openapi_body = orjson.dumps(schema)
+    return Response(content=_openapi_body, media_type="application/json")
+
+
+# FastAPI's built-in /openapi.json route re-serializes the schema on every
+# request; replace it with the cached variant (/docs and /redoc still point here)
+app.router.routes = [
+    route for route in app.router.routes
+    if getattr(route, "path", None) != app.openapi_url
+]
+app.add_route(app.openapi_url, openapi_json, include_in_schema=False)
+
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Custom exception handler for HTTPException to return standardized error format."""
     
     # Get correlation_id from request state
-    correlation_id = getattr(request.state, "correlation_id", str(uuid.uuid4()))
+    correlation_id = getattr(request.state, "correlation_id", None) or AuditLogger.generate_correlation_id()
     
     # Determine status type based on status code
     if 400 <= exc.status_code < 500:
@@ -253,7 +281,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unhandled errors (500 Internal Server Error)."""  
     # Get correlation_id from request state
-    correlation_id = getattr(request.state, "correlation_id", str(uuid.uuid4()))
+    correlation_id = getattr(request.state, "correlation_id", None) or AuditLogger.generate_correlation_id()
     
     # Captura stacktrace completo
     stack_trace = traceback.format_exc()
@@ -289,7 +317,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     """Custom exception handler for request validation errors."""
     
     # Get correlation_id from request state
-    correlation_id = getattr(request.state, "correlation_id", str(uuid.uuid4()))
+    correlation_id = getattr(request.state, "correlation_id", None) or AuditLogger.generate_correlation_id()
     
     # Format validation errors in a friendly way
     errors = exc.errors()
@@ -380,7 +408,7 @@ async def log_requests(request: Request, call_next):
 async def correlation_id_middleware(request: Request, call_next):
     """Middleware to add correlation_id to all requests. Must be declared last to run first."""
     # Get correlation_id from header or generate new one
-    correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
+    correlation_id = request.headers.get("X-Correlation-ID") or AuditLogger.generate_correlation_id()
     
     # Store correlation_id in request state for access in routes
     request.state.correlation_id = correlation_id
@@ -430,16 +458,8 @@ app.include_router(v1_router, prefix="/akm")
 # Legacy support: Include unversioned routes (defaults to v1 behavior)
 # These routes will be deprecated in the future
 akm_prefix = "/akm"
-app.include_router(projects_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(keys_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(scopes_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(webhooks_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(configs_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(alerts_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(openapi_scopes_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(audit_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(sensitive_fields_router, prefix=akm_prefix, include_in_schema=False)
-app.include_router(project_configurations_router, prefix=akm_prefix, include_in_schema=False)
+for legacy_router in V1_ROUTERS:
+    app.include_router(legacy_router, prefix=akm_prefix, include_in_schema=False)
 
 # Log application ready
 log_with_context(
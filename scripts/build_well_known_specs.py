@@ -0,0 +1,55 @@
+"""
+Build script that pre-parses well-known OpenAPI specs.
+
+Downloads every spec listed in src/assets/specs/well_known_specs.json and
+writes the parsed dict to src/assets/specs/<name>.pickle. The scope
+generator loads these instead of fetching and parsing the URL at runtime.
+
+Usage:
+    python scripts/build_well_known_specs.py
+"""
+
+import json
+import pickle
+import sys
+from pathlib import Path
+
+import httpx
+import yaml
+
+SPECS_DIR = Path(__file__).parent.parent / "src" / "assets" / "specs"
+CATALOG_PATH = SPECS_DIR / "well_known_specs.json"
+
+
+def fetch_spec(url: str) -> dict:
+    """Download and parse a spec (JSON or YAML)"""
+    response = httpx.get(url, timeout=60.0, follow_redirects=True)
+    response.raise_for_status()
+
+    content_type = response.headers.get("content-type", "")
+    if "yaml" in content_type or url.endswith((".yaml", ".yml")):
+        return yaml.safe_load(response.text)
+    return response.json()
+
+
+def main() -> int:
+    catalog = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+    failures = 0
+
+    for name, url in catalog.items():
+        try:
+            spec = fetch_spec(url)
+        except Exception as e:
+            print(f"✗ {name}: {e}")
+            failures += 1
+            continue
+
+        target = SPECS_DIR / f"{name}.pickle"
+        target.write_bytes(pickle.dumps(spec, protocol=5))
+        print(f"✓ {name}: {len(spec.get('paths', {}))} paths -> {target.name}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -105,7 +105,8 @@ def update_admin_key_scopes():
                 # Add scope to key
                 key_scope = AKMAPIKeyScope(
                     api_key_id=ADMIN_KEY_ID,
-                    scope_id=scope.id
+                    scope_id=scope.id,
+                    scope_name=scope.scope_name
                 )
                 
                 session.add(key_scope)
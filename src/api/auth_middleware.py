@@ -2,11 +2,18 @@
 Authentication and authorization middleware with scope-based permissions.
 """
 
-from typing import List, Optional, Set
+from typing import FrozenSet, Iterable, List, Optional, Set
 from fastapi import Header, HTTPException, status, Request, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, time as datetime_time
 
+from src.api.cache.auth_cache import (
+    AuthIdentity,
+    KeyConfig,
+    get_cached_key,
+    invalidate_api_key,
+    store_api_key,
+)
 from src.database.connection import get_session
 from src.database.repositories.api_key_repository import api_key_repository
 from src.database.repositories.project_configuration_repository import project_configuration_repository
@@ -29,53 +36,36 @@ async def get_api_key_from_header(
     return x_api_key
 
 
-async def get_current_api_key(
-    request: Request,
-    api_key: str = Depends(get_api_key_from_header),
-    session: AsyncSession = Depends(get_session),
-) -> AKMAPIKey:
-    """
-    Validate API key and return the full record with scopes and config.
-    
-    This is the base authentication dependency. All protected endpoints
-    should use this or a permission checker that depends on it.
-    """
-    correlation_id = getattr(request.state, "correlation_id", "unknown")
-
-    # Validate the key
-    api_key_record = await api_key_repository.validate_key(session, api_key)
+def _key_config(config: AKMAPIKeyConfig) -> KeyConfig:
+    """Snapshot the key's own config"""
+    return KeyConfig(
+        rate_limit_enabled=config.rate_limit_enabled,
+        rate_limit_requests=config.rate_limit_requests,
+        rate_limit_window_seconds=config.rate_limit_window_seconds,
+        daily_request_limit=config.daily_request_limit,
+        monthly_request_limit=config.monthly_request_limit,
+        ip_whitelist_enabled=config.ip_whitelist_enabled,
+        allowed_ips=tuple(config.allowed_ips or ()),
+        allowed_time_start=config.allowed_time_start,
+        allowed_time_end=config.allowed_time_end,
+    )
 
-    if not api_key_record:
-        # Log como ERROR para visibilidade explícita em casos de autenticação inválida
-        logger.error(
-            "Invalid API key attempt",
-            extra={
-                "correlation_id": correlation_id,
-                "path": request.url.path,
-                "key_prefix": api_key[:12] if api_key else "none",
-            },
-        )
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired API key.",
-            headers={"WWW-Authenticate": "ApiKey"},
-        )
 
-    # Store in request state for use by other middleware/dependencies
-    request.state.api_key = api_key_record
-    request.state.api_key_id = api_key_record.id
-    request.state.api_key_name = api_key_record.name
-    
-    # Load effective configuration (key config OR project defaults)
-    effective_config = api_key_record.config
+async def _build_identity(
+    session: AsyncSession,
+    api_key_record: AKMAPIKey,
+    correlation_id: str
+) -> AuthIdentity:
+    """Snapshot a validated key with its config, or a virtual one built from the project defaults"""
+    config = api_key_record.config
+    effective_config = None
+    defaults_version = None
     
-    # If no key-specific config, try to load project defaults
-    if not effective_config:
-        project_id = getattr(api_key_record, "project_id", None)
-        if project_id is not None and hasattr(project_id, "value"):
-            project_id = project_id.value
-        elif project_id is not None and hasattr(project_id, "name"):
-            project_id = getattr(api_key_record, "project_id")
+    if config is not None:
+        effective_config = _key_config(config)
+    else:
+        # If no key-specific config, try to load project defaults
+        project_id = api_key_record.project_id
         if project_id is None or not isinstance(project_id, int):
             logger.error(
                 "API key missing valid project_id",
@@ -95,51 +85,133 @@ async def get_current_api_key(
         )
         
         if project_config:
-            # Create a virtual AKMAPIKeyConfig from project defaults
-            effective_config = AKMAPIKeyConfig(
-                id=0,  # Virtual config
-                api_key_id=api_key_record.id,
+            defaults_version = project_config.updated_at or project_config.created_at
+            effective_config = KeyConfig(
                 rate_limit_enabled=project_config.default_rate_limit_per_minute is not None,
                 rate_limit_requests=project_config.default_rate_limit_per_minute or 60,
                 rate_limit_window_seconds=60,  # 1 minute window
                 daily_request_limit=project_config.default_rate_limit_per_day,
                 monthly_request_limit=project_config.default_rate_limit_per_month,
-                ip_whitelist=project_config.ip_allowlist,
-                # Other fields use defaults
-                allowed_http_methods=None,
-                max_requests_per_day_reached=False,
-                max_requests_per_month_reached=False,
-                active_hours_start=None,
-                active_hours_end=None,
-                active_days_of_week=None,
-                bypass_rate_limiting=False,
-                custom_headers={},
-                allowed_endpoints=[],
-                blocked_endpoints=[],
-                request_timeout_seconds=30,
-                max_response_size_bytes=None,
-                cost_per_request=0.0,
-                monthly_cost_limit=None,
-                require_https=True,
-                auto_rotate_days=None,
-                last_rotation_at=None
+                ip_whitelist_enabled=bool(project_config.ip_allowlist),
+                allowed_ips=tuple(project_config.ip_allowlist or ()),
+            )
+    
+    return AuthIdentity(
+        id=api_key_record.id,
+        project_id=api_key_record.project_id,
+        name=api_key_record.name,
+        scope_names=api_key_record._scope_set,
+        config=effective_config,
+        expires_at=api_key_record.expires_at,
+        config_version=(config.updated_at or config.created_at) if config is not None else None,
+        defaults_version=defaults_version,
+    )
+
+
+async def get_current_api_key(
+    request: Request,
+    api_key: str = Depends(get_api_key_from_header),
+    session: AsyncSession = Depends(get_session),
+) -> AuthIdentity:
+    """
+    Validate API key and return an immutable snapshot of its identity.
+    
+    Validated keys are served from the in-process auth cache for a short
+    TTL; every hit is checked against the key's current state in the same
+    statement that records its use.
+    
+    This is the base authentication dependency. All protected endpoints
+    should use this or a permission checker that depends on it.
+    """
+    correlation_id = getattr(request.state, "correlation_id", "unknown")
+
+    key_hash = api_key_repository.hash_key(api_key)
+    identity = get_cached_key(key_hash)
+    if identity is not None:
+        # The usage UPDATE only matches active keys and returns their current
+        # scopes and config versions, so changes made by another worker apply
+        state = None if identity.is_expired() else await api_key_repository.record_use(session, identity.id)
+        if state is None or not identity.is_current(state):
+            invalidate_api_key(identity.id)
+            identity = None
+    
+    if identity is None:
+        # Validate the key
+        api_key_record = await api_key_repository.validate_key(session, api_key)
+
+        if not api_key_record:
+            # Log como ERROR para visibilidade explícita em casos de autenticação inválida
+            logger.error(
+                "Invalid API key attempt",
+                extra={
+                    "correlation_id": correlation_id,
+                    "path": request.url.path,
+                    "key_prefix": api_key[:12] if api_key else "none",
+                },
+            )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired API key.",
+                headers={"WWW-Authenticate": "ApiKey"},
             )
+        
+        # Load effective configuration (key config OR project defaults)
+        identity = await _build_identity(session, api_key_record, correlation_id)
+        store_api_key(key_hash, identity)
+
+    # Store in request state for use by other middleware/dependencies
+    request.state.api_key = identity
+    request.state.api_key_id = identity.id
+    request.state.api_key_name = identity.name
     
-    if effective_config:
-        request.state.api_key_config = effective_config
+    if identity.config:
+        request.state.api_key_config = identity.config
 
     logger.info(
-        f"API key authenticated: {api_key_record.name}",
+        f"API key authenticated: {identity.name}",
         extra={
             "correlation_id": correlation_id,
-            "api_key_name": api_key_record.name,
-            "api_key_id": api_key_record.id,
-            "project_id": api_key_record.project_id,
-            "request_count": api_key_record.request_count,
+            "api_key_name": identity.name,
+            "api_key_id": identity.id,
+            "project_id": identity.project_id,
         },
     )
 
-    return api_key_record
+    return identity
+
+
+async def get_request_key(
+    request: Request,
+    session: AsyncSession,
+    key_id: int
+) -> Optional[AKMAPIKey]:
+    """
+    Load an API key by id, memoized for the duration of the request.
+    
+    Keys are fetched once and kept in ``request.state.akm_keys``.
+    """
+    keys = getattr(request.state, "akm_keys", None)
+    if keys is None:
+        keys = request.state.akm_keys = {}
+    if key_id not in keys:
+        keys[key_id] = await api_key_repository.get_by_id(session, key_id)
+    return keys[key_id]
+
+
+async def ensure_key_in_project(
+    request: Request,
+    session: AsyncSession,
+    project_id: int,
+    key_id: int
+) -> AKMAPIKey:
+    """Return the key (request-memoized), or raise 404 unless it belongs to the project"""
+    key = await get_request_key(request, session, key_id)
+    if not key or key.project_id != project_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"API key {key_id} not found in project {project_id}"
+        )
+    return key
 
 
 class PermissionChecker:
@@ -149,31 +221,31 @@ class PermissionChecker:
     Usage:
         @router.get("/projects")
         async def list_projects(
-            api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:read"]))
+            api_key: AuthIdentity = Depends(PermissionChecker(["akm:projects:read"]))
         ):
             ...
     """
     
-    def __init__(self, required_scopes: List[str]):
+    def __init__(self, required_scopes: Iterable[str]):
         """
         Initialize with required scopes.
         
         Args:
-            required_scopes: List of scope names required for this endpoint
+            required_scopes: Scope names required for this endpoint
         """
-        self.required_scopes = required_scopes
+        self.required_scopes: FrozenSet[str] = frozenset(required_scopes)
     
     async def __call__(
         self,
         request: Request,
-        api_key: AKMAPIKey = Depends(get_current_api_key),
+        api_key: AuthIdentity = Depends(get_current_api_key),
         session: AsyncSession = Depends(get_session)
-    ) -> AKMAPIKey:
+    ) -> AuthIdentity:
         """
         Verify that the API key has all required scopes and passes config checks.
         
         Returns:
-            The validated API key record
+            The authenticated key identity
             
         Raises:
             HTTPException: If permissions are insufficient or config restrictions fail
@@ -183,9 +255,7 @@ class PermissionChecker:
         # Check configuration restrictions
         await self._check_config_restrictions(request, api_key, session)
         
-        # Extract scope names from relationships
-        # AKMAPIKeyScope has a relationship 'scope' that points to AKMScope
-        key_scopes = {scope.scope.scope_name for scope in api_key.scopes}
+        key_scopes = api_key.scope_names
         
         # Super admin has access to everything
         if "akm:admin:*" in key_scopes or "akm:*" in key_scopes:
@@ -199,11 +269,11 @@ class PermissionChecker:
             )
             return api_key
         
-        # Check each required scope
-        missing_scopes = []
-        for required in self.required_scopes:
-            if not self._has_permission(required, key_scopes):
-                missing_scopes.append(required)
+        # Exact grants cover the common case; only the rest need wildcard matching
+        missing_scopes = sorted(
+            required for required in self.required_scopes - key_scopes
+            if not self._has_permission(required, key_scopes)
+        )
         
         if missing_scopes:
             logger.warning(
@@ -226,7 +296,7 @@ class PermissionChecker:
             extra={
                 "correlation_id": correlation_id,
                 "api_key_id": api_key.id,
-                "required_scopes": self.required_scopes,
+                "required_scopes": sorted(self.required_scopes),
                 "endpoint": request.url.path
             }
         )
@@ -262,7 +332,7 @@ class PermissionChecker:
     async def _check_config_restrictions(
         self,
         request: Request,
-        api_key: AKMAPIKey,
+        api_key: AuthIdentity,
         session: AsyncSession
     ):
         """
@@ -317,7 +387,7 @@ class PermissionChecker:
         # Check for forwarded IP (behind proxy)
         forwarded = request.headers.get("X-Forwarded-For")
         if forwarded:
-            return forwarded.split(",")[0].strip()
+            return forwarded.partition(",")[0].strip()
         
         # Check for real IP
         real_ip = request.headers.get("X-Real-IP")
@@ -0,0 +1,32 @@
+"""Response-side caches for API routes."""
+
+from .auth_cache import (
+    AuthIdentity,
+    KeyConfig,
+    get_cached_key,
+    store_api_key,
+    invalidate_api_key,
+    invalidate_project_keys,
+)
+from .last_modified import not_modified
+from .project_cache import ensure_project_exists, invalidate_project
+from .scope_export_cache import (
+    get_scope_export,
+    store_scope_export,
+    invalidate_scope_export,
+)
+
+__all__ = [
+    "AuthIdentity",
+    "KeyConfig",
+    "get_cached_key",
+    "store_api_key",
+    "invalidate_api_key",
+    "invalidate_project_keys",
+    "not_modified",
+    "ensure_project_exists",
+    "invalidate_project",
+    "get_scope_export",
+    "store_scope_export",
+    "invalidate_scope_export",
+]
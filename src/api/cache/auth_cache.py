@@ -0,0 +1,114 @@
+"""
+In-process cache of authenticated API key identities.
+
+get_current_api_key() runs on every protected request and used to load the
+key with its scopes, config and project (plus the project defaults when the
+key has no config of its own). Validated keys are kept here for
+AUTH_CACHE_TTL seconds, keyed by key_hash, as frozen AuthIdentity snapshots
+of the fields authorization reads: no ORM instances are shared between
+requests.
+
+A hit is still checked against the database: the usage UPDATE only matches
+active keys and returns the key's current expiry, scope names and config
+versions, and an identity that no longer matches is dropped and reloaded.
+Changes made on another worker therefore apply on the next request. Routes
+that change keys, scopes or configs also invalidate entries in this process
+so the next request skips the stale hit.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as datetime_time
+from typing import Dict, FrozenSet, Optional, Tuple
+
+AUTH_CACHE_TTL = 30
+AUTH_CACHE_MAX_ENTRIES = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class KeyConfig:
+    """Restrictions and limits that apply to a key (its own config or the project defaults)"""
+    rate_limit_enabled: bool = False
+    rate_limit_requests: Optional[int] = None
+    rate_limit_window_seconds: Optional[int] = 60
+    daily_request_limit: Optional[int] = None
+    monthly_request_limit: Optional[int] = None
+    ip_whitelist_enabled: bool = False
+    allowed_ips: Tuple[str, ...] = ()
+    allowed_time_start: Optional[datetime_time] = None
+    allowed_time_end: Optional[datetime_time] = None
+
+
+@dataclass(frozen=True, slots=True)
+class AuthIdentity:
+    """
+    Immutable view of an authenticated key.
+
+    config_version and defaults_version stamp the key config and project
+    configuration the snapshot was built from; they are compared with the
+    database on every cache hit.
+    """
+    id: int
+    project_id: int
+    name: str
+    scope_names: FrozenSet[str]
+    config: Optional[KeyConfig]
+    expires_at: Optional[datetime] = None
+    config_version: Optional[datetime] = None
+    defaults_version: Optional[datetime] = None
+
+    def is_expired(self) -> bool:
+        """Check if the key has expired since it was cached"""
+        if self.expires_at is None:
+            return False
+        return datetime.now(self.expires_at.tzinfo) > self.expires_at
+
+    def is_current(self, state) -> bool:
+        """
+        Check the snapshot against the key's current state.
+
+        Args:
+            state: Row returned by api_key_repository.record_use()
+        """
+        if state.expires_at != self.expires_at or state.config_version != self.config_version:
+            return False
+        # Project defaults only apply to keys without a config of their own
+        if self.config_version is None and state.defaults_version != self.defaults_version:
+            return False
+        current = frozenset(state.scope_names.split(" ")) if state.scope_names else frozenset()
+        return current == self.scope_names
+
+
+# key_hash -> (time.monotonic() deadline, identity); dicts keep insertion order,
+# so the first entry is the oldest
+_keys: Dict[str, Tuple[float, AuthIdentity]] = {}
+
+
+def get_cached_key(key_hash: str) -> Optional[AuthIdentity]:
+    """Return the cached identity for key_hash unless it has expired"""
+    entry = _keys.get(key_hash)
+    if entry is None:
+        return None
+    if entry[0] > time.monotonic():
+        return entry[1]
+    _keys.pop(key_hash, None)
+    return None
+
+
+def store_api_key(key_hash: str, identity: AuthIdentity) -> None:
+    """Cache a key that has just been validated against the database"""
+    if len(_keys) >= AUTH_CACHE_MAX_ENTRIES:
+        _keys.pop(next(iter(_keys)), None)
+    _keys[key_hash] = (time.monotonic() + AUTH_CACHE_TTL, identity)
+
+
+def invalidate_api_key(key_id: int) -> None:
+    """Drop a key after it is updated, revoked, deleted or its scopes/config change"""
+    for key_hash in [h for h, (_, identity) in _keys.items() if identity.id == key_id]:
+        _keys.pop(key_hash, None)
+
+
+def invalidate_project_keys(project_id: int) -> None:
+    """Drop every key of a project whose settings or defaults changed"""
+    for key_hash in [h for h, (_, identity) in _keys.items() if identity.project_id == project_id]:
+        _keys.pop(key_hash, None)
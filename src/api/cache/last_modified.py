@@ -0,0 +1,52 @@
+"""
+Last-Modified / If-Modified-Since handling for single-row GET routes.
+
+Routes pass the row's modification time; when the client's copy is still
+current they answer 304 without serializing the response model.
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def _http_time(value: datetime) -> datetime:
+    """UTC, truncated to the one-second precision of HTTP dates"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    modified: Optional[datetime]
+) -> Optional[Response]:
+    """
+    Set Last-Modified and honour If-Modified-Since.
+
+    Returns:
+        A 304 response when the client's copy is current, otherwise None
+        (the Last-Modified header is then set on ``response``)
+    """
+    if modified is None:
+        return None
+
+    modified = _http_time(modified)
+    last_modified = format_datetime(modified, usegmt=True)
+
+    since = request.headers.get("if-modified-since")
+    if since and "if-none-match" not in request.headers:
+        try:
+            if modified <= _http_time(parsedate_to_datetime(since)):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={"Last-Modified": last_modified}
+                )
+        except (TypeError, ValueError):
+            pass  # Malformed dates are ignored, as RFC 9110 requires
+
+    response.headers["Last-Modified"] = last_modified
+    return None
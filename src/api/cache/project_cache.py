@@ -0,0 +1,111 @@
+"""
+Cache-aside project existence checks backed by Redis.
+
+Routes that only need to know a project exists call ensure_project_exists()
+instead of loading the row on every request. Hits are cached for
+PROJECT_EXISTS_TTL seconds and misses for PROJECT_MISSING_TTL seconds.
+When REDIS_URL is not configured (or the redis package is missing), or
+Redis is unreachable, the check falls back to the database.
+
+Misses are also remembered in-process for PROJECT_MISSING_TTL seconds, so a
+flood of requests for an unknown project id is answered without Redis or
+database round-trips, with or without Redis configured.
+"""
+
+import time
+from typing import Dict
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.cache.redis_client import RedisError, get_redis
+from src.database.repositories.project_repository import project_repository
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_EXISTS_TTL = 60
+PROJECT_MISSING_TTL = 5
+MISSING_PROJECTS_MAX_ENTRIES = 10_000
+
+# project_id -> time.monotonic() deadline of the in-process negative entry
+_missing_projects: Dict[int, float] = {}
+
+
+def _cache_key(project_id: int) -> str:
+    return f"project:{project_id}:exists"
+
+
+def _known_missing(project_id: int) -> bool:
+    deadline = _missing_projects.get(project_id)
+    if deadline is None:
+        return False
+    if deadline > time.monotonic():
+        return True
+    _missing_projects.pop(project_id, None)
+    return False
+
+
+def _remember_missing(project_id: int) -> None:
+    if len(_missing_projects) >= MISSING_PROJECTS_MAX_ENTRIES:
+        # Dicts keep insertion order: drop the oldest entry
+        _missing_projects.pop(next(iter(_missing_projects)), None)
+    _missing_projects[project_id] = time.monotonic() + PROJECT_MISSING_TTL
+
+
+def _not_found(project_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Project {project_id} not found"
+    )
+
+
+async def ensure_project_exists(session: AsyncSession, project_id: int) -> None:
+    """
+    Raise 404 unless the project exists.
+    
+    Raises:
+        HTTPException: 404 if the project does not exist
+    """
+    if _known_missing(project_id):
+        raise _not_found(project_id)
+    
+    redis = get_redis()
+    cached = None
+    
+    if redis is not None:
+        try:
+            cached = await redis.get(_cache_key(project_id))
+        except RedisError as e:
+            logger.warning(f"Project cache unavailable, falling back to database: {e}")
+            redis = None
+    
+    if cached is None:
+        exists = await project_repository.get_by_id(session, project_id) is not None
+        if redis is not None:
+            try:
+                await redis.setex(
+                    _cache_key(project_id),
+                    PROJECT_EXISTS_TTL if exists else PROJECT_MISSING_TTL,
+                    "1" if exists else "0"
+                )
+            except RedisError as e:
+                logger.warning(f"Failed to cache project existence: {e}")
+    else:
+        exists = cached == "1"
+    
+    if not exists:
+        _remember_missing(project_id)
+        raise _not_found(project_id)
+
+
+async def invalidate_project(project_id: int) -> None:
+    """Drop the cached existence entry after a project is created, updated or deleted"""
+    _missing_projects.pop(project_id, None)
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.delete(_cache_key(project_id))
+    except RedisError as e:
+        logger.warning(f"Failed to invalidate project cache: {e}")
@@ -0,0 +1,30 @@
+"""
+Shared Redis client for the API caches.
+
+Redis is optional: get_redis() returns None unless REDIS_URL is set and
+the redis package is installed, and callers treat that as a cache miss.
+"""
+
+from typing import Optional
+
+from src.config import get_settings
+
+try:
+    from redis.asyncio import Redis
+    from redis.exceptions import RedisError
+except ImportError:  # redis is an optional dependency
+    Redis = None
+    RedisError = Exception
+
+_redis: Optional["Redis"] = None
+
+
+def get_redis() -> Optional["Redis"]:
+    """Return the shared Redis client, or None when caching is disabled"""
+    global _redis
+    if _redis is None:
+        settings = get_settings()
+        if Redis is None or not settings.redis_url:
+            return None
+        _redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis
@@ -0,0 +1,94 @@
+"""
+Redis cache for the scope export payload.
+
+Entries hold the serialized export body together with its ETag so a hit
+can answer (or 304) without touching the database. Every route that
+changes a project's scopes calls invalidate_scope_export().
+
+Each project has a generation counter that invalidation increments.
+Readers get the current generation with the entry, and fills are stamped
+with the generation read before the export was built. An export built
+from rows read before a write committed is stored under the older
+generation and never served, even when it is stored after the
+invalidation.
+"""
+
+from typing import Optional, Tuple
+
+from src.api.cache.redis_client import RedisError, get_redis
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SCOPE_EXPORT_TTL = 300
+
+
+def _cache_key(project_id: int, active_only: bool) -> str:
+    return f"akm-cache:scopes_export:{project_id}:{int(active_only)}"
+
+
+def _generation_key(project_id: int) -> str:
+    return f"akm-cache:scopes_export:{project_id}:generation"
+
+
+async def get_scope_export(
+    project_id: int,
+    active_only: bool
+) -> Tuple[Optional[Tuple[str, str]], Optional[str]]:
+    """
+    Look up an export in one round-trip.
+    
+    Returns:
+        (etag, body) or None on a miss, and the generation to pass to
+        store_scope_export() (None when Redis is unavailable)
+    """
+    redis = get_redis()
+    if redis is None:
+        return None, None
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.get(_generation_key(project_id))
+            pipe.hgetall(_cache_key(project_id, active_only))
+            generation, entry = await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Scope export cache unavailable: {e}")
+        return None, None
+    generation = generation or "0"
+    if not entry or entry.get("generation") != generation:
+        return None, generation
+    return (entry["etag"], entry["body"]), generation
+
+
+async def store_scope_export(
+    project_id: int,
+    active_only: bool,
+    generation: Optional[str],
+    etag: str,
+    body: str
+) -> None:
+    """Cache an export body and its ETag for SCOPE_EXPORT_TTL seconds under a generation"""
+    redis = get_redis()
+    if redis is None or generation is None:
+        return
+    key = _cache_key(project_id, active_only)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"generation": generation, "etag": etag, "body": body})
+            pipe.expire(key, SCOPE_EXPORT_TTL)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Failed to cache scope export: {e}")
+
+
+async def invalidate_scope_export(project_id: int) -> None:
+    """Start a new generation and drop both export variants after the project's scopes change"""
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(_generation_key(project_id))
+            pipe.delete(_cache_key(project_id, True), _cache_key(project_id, False))
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Failed to invalidate scope export cache: {e}")
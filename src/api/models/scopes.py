@@ -41,6 +41,7 @@ class ScopeResponse(BaseModel):
     id: int
     scope_name: str
     description: Optional[str]
+    category: str = "system"
     is_active: bool
     created_at: datetime
     
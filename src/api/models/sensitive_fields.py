@@ -1,6 +1,6 @@
 """Pydantic models for Sensitive Field management."""
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Annotated, Optional, List
+from pydantic import BaseModel, Field, StringConstraints
 
 
 class SensitiveFieldBase(BaseModel):
@@ -14,7 +14,10 @@ class SensitiveFieldBase(BaseModel):
 
 
 class SensitiveFieldCreate(SensitiveFieldBase):
-    pass
+    # Lowercased during validation: field names are stored and matched in lowercase
+    field_name: Annotated[str, StringConstraints(to_lower=True)] = Field(
+        ..., description="Name of the sensitive field (case-insensitive)"
+    )
 
 
 class SensitiveFieldUpdate(BaseModel):
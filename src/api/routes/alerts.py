@@ -11,14 +11,12 @@ Alerts are now key-scoped following RESTful hierarchy:
 
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_session
 from src.database.repositories.alert_repository import alert_repository
-from src.database.repositories.api_key_repository import api_key_repository
-from src.database.models import AKMAPIKey
-from src.api.auth_middleware import PermissionChecker
+from src.api.auth_middleware import AuthIdentity, PermissionChecker, ensure_key_in_project
 from src.api.models import (
     AlertRuleCreate,
     AlertRuleUpdate,
@@ -33,20 +31,16 @@ router = APIRouter(tags=["Alerts"])
 # Alert Rules CRUD - Key-scoped
 @router.post("/projects/{project_id}/keys/{key_id}/alerts", response_model=AlertRuleResponse, status_code=status.HTTP_201_CREATED)
 async def create_alert_rule(
+    request: Request,
     project_id: int,
     key_id: int,
     rule_data: AlertRuleCreate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:alerts:write"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:alerts:write"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Create a new alert rule for an API key"""
     # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
+    await ensure_key_in_project(request, session, project_id, key_id)
     
     rule = await alert_repository.create_rule(
         session,
@@ -66,23 +60,19 @@ async def create_alert_rule(
 
 @router.get("/projects/{project_id}/keys/{key_id}/alerts", response_model=List[AlertRuleResponse])
 async def list_alert_rules(
+    request: Request,
     project_id: int,
     key_id: int,
     alert_type: Optional[str] = None,
     active_only: bool = True,
     skip: int = 0,
     limit: int = 100,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:alerts:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:alerts:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """List alert rules for an API key"""
     # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
+    await ensure_key_in_project(request, session, project_id, key_id)
     
     rules = await alert_repository.list_rules(
         session,
@@ -97,20 +87,16 @@ async def list_alert_rules(
 
 @router.get("/projects/{project_id}/keys/{key_id}/alerts/{alert_id}", response_model=AlertRuleResponse)
 async def get_alert_rule(
+    request: Request,
     project_id: int,
     key_id: int,
     alert_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:alerts:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:alerts:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Get alert rule by ID"""
     # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
+    await ensure_key_in_project(request, session, project_id, key_id)
     
     rule = await alert_repository.get_rule(session, alert_id)
     
@@ -125,21 +111,17 @@ async def get_alert_rule(
 
 @router.put("/projects/{project_id}/keys/{key_id}/alerts/{alert_id}", response_model=AlertRuleResponse)
 async def update_alert_rule(
+    request: Request,
     project_id: int,
     key_id: int,
     alert_id: int,
     rule_data: AlertRuleUpdate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:alerts:write"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:alerts:write"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Update alert rule"""
     # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
+    await ensure_key_in_project(request, session, project_id, key_id)
     
     rule = await alert_repository.get_rule(session, alert_id)
     if not rule or rule.api_key_id != key_id:
@@ -165,20 +147,16 @@ async def update_alert_rule(
 
 @router.delete("/projects/{project_id}/keys/{key_id}/alerts/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_alert_rule(
+    request: Request,
     project_id: int,
     key_id: int,
     alert_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:alerts:delete"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:alerts:delete"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Delete alert rule"""
     # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
+    await ensure_key_in_project(request, session, project_id, key_id)
     
     rule = await alert_repository.get_rule(session, alert_id)
     if not rule or rule.api_key_id != key_id:
@@ -206,7 +184,7 @@ async def list_alert_history(
     end_date: Optional[datetime] = Query(None, description="End date for history"),
     skip: int = 0,
     limit: int = 100,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:alerts:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:alerts:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """List alert history"""
@@ -224,7 +202,7 @@ async def list_alert_history(
 @router.get("/alerts/history/{history_id}", response_model=AlertHistoryResponse)
 async def get_alert_history_item(
     history_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:alerts:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:alerts:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Get alert history item by ID"""
@@ -246,7 +224,7 @@ async def get_alert_stats(
     api_key_id: Optional[int] = None,
     start_date: Optional[datetime] = Query(None, description="Start date for stats"),
     end_date: Optional[datetime] = Query(None, description="End date for stats"),
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:alerts:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:alerts:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Get alert statistics"""
@@ -11,7 +11,7 @@ from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.connection import get_async_session as get_db
+from src.database.connection import get_session as get_db
 from src.database.repositories.audit_repository import AuditLogRepository
 from src.api.auth_middleware import PermissionChecker
 from src.api.models.audit import (
@@ -108,7 +108,8 @@ async def list_audit_logs(
         start_date=start_date,
         end_date=end_date,
         limit=limit,
-        offset=offset
+        offset=offset,
+        summary_only=True
     )
     
     # Get total count
@@ -253,7 +254,8 @@ async def get_audit_statistics(
         project_id=project_id,
         start_date=start_date,
         end_date=end_date,
-        limit=10000  # High limit for statistics
+        limit=10000,  # High limit for statistics
+        summary_only=True
     )
     
     # Calculate statistics
@@ -361,3 +363,32 @@ async def bulk_verify_integrity(
         )
     
     return BulkIntegrityVerification(**verification)
+
+
+@router.get(
+    "/integrity/chain-verify",
+    response_model=BulkIntegrityVerification,
+    summary="Verify the audit hash chain",
+    description="Replay the audit hash chain in ID order to detect modified, deleted or reordered entries."
+)
+async def verify_audit_chain(
+    after_id: Optional[int] = Query(None, ge=1, description="Resume after this audit ID"),
+    limit: int = Query(1000, ge=1, le=10000, description="Number of logs to verify"),
+    db: AsyncSession = Depends(get_db),
+    _: dict = Depends(PermissionChecker([AUDIT_READ_SCOPE]))
+):
+    """Verify the audit hash chain."""
+    repo = AuditLogRepository(db)
+    verification = await repo.verify_chain(after_id=after_id, limit=limit)
+    
+    if verification["failed"] > 0:
+        logger.critical(
+            f"AUDIT CHAIN VIOLATION: {verification['failed']} logs failed verification",
+            extra={
+                "total_verified": verification["total_verified"],
+                "failed_count": verification["failed"],
+                "violations": verification["violations"]
+            }
+        )
+    
+    return BulkIntegrityVerification(**verification)
@@ -4,14 +4,14 @@ API routes for API Key configuration and usage statistics.
 
 from typing import Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_session
 from src.database.repositories.api_key_repository import api_key_repository
 from src.database.repositories.rate_limit_repository import rate_limit_repository
-from src.database.models import AKMAPIKey
-from src.api.auth_middleware import PermissionChecker
+from src.api.auth_middleware import AuthIdentity, PermissionChecker, get_request_key
+from src.api.cache import invalidate_api_key
 from src.api.models import APIKeyConfigUpdate, APIKeyConfigResponse, UsageStatsResponse
 
 router = APIRouter(prefix="/keys", tags=["API Key Configuration"])
@@ -19,12 +19,13 @@ router = APIRouter(prefix="/keys", tags=["API Key Configuration"])
 
 @router.get("/{key_id}/config", response_model=APIKeyConfigResponse)
 async def get_key_config(
+    request: Request,
     key_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Get API key configuration"""
-    key = await api_key_repository.get_by_id(session, key_id)
+    key = await get_request_key(request, session, key_id)
     
     if not key:
         raise HTTPException(
@@ -49,13 +50,14 @@ async def get_key_config(
 
 @router.put("/{key_id}/config", response_model=APIKeyConfigResponse)
 async def update_key_config(
+    request: Request,
     key_id: int,
     config_data: APIKeyConfigUpdate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:write"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:write"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Update API key configuration"""
-    key = await api_key_repository.get_by_id(session, key_id)
+    key = await get_request_key(request, session, key_id)
     
     if not key:
         raise HTTPException(
@@ -82,17 +84,20 @@ async def update_key_config(
             detail="Failed to update configuration"
         )
     
+    invalidate_api_key(key_id)
+    
     return updated.config
 
 
 @router.delete("/{key_id}/config", status_code=status.HTTP_204_NO_CONTENT)
 async def reset_key_config(
+    request: Request,
     key_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:write"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:write"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Reset API key configuration to defaults"""
-    key = await api_key_repository.get_by_id(session, key_id)
+    key = await get_request_key(request, session, key_id)
     
     if not key:
         raise HTTPException(
@@ -113,19 +118,22 @@ async def reset_key_config(
         allowed_time_end=None
     )
     
+    invalidate_api_key(key_id)
+    
     return None
 
 
 @router.get("/{key_id}/usage", response_model=UsageStatsResponse)
 async def get_key_usage_stats(
+    request: Request,
     key_id: int,
     start_date: Optional[datetime] = Query(None, description="Start date for usage stats"),
     end_date: Optional[datetime] = Query(None, description="End date for usage stats"),
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Get API key usage statistics"""
-    key = await api_key_repository.get_by_id(session, key_id)
+    key = await get_request_key(request, session, key_id)
     
     if not key:
         raise HTTPException(
@@ -21,8 +21,8 @@ from src.database.connection import get_session
 from src.database.repositories.api_key_repository import api_key_repository
 from src.database.repositories.scope_repository import scope_repository
 from src.database.repositories.project_repository import project_repository
-from src.database.models import AKMAPIKey
-from src.api.auth_middleware import PermissionChecker
+from src.api.auth_middleware import AuthIdentity, PermissionChecker
+from src.api.cache import invalidate_api_key
 
 import os
 from src.utils.project_info import get_project_info
@@ -50,7 +50,7 @@ async def list_all_api_keys(
     active_only: bool = True,
     skip: int = 0,
     limit: int = 100,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:*", "akm:*"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:*", "akm:*"])),
     session: AsyncSession = Depends(get_session)
 ):
     """List all API keys across projects (admin only)"""
@@ -68,7 +68,7 @@ async def list_all_api_keys(
         result.append(
             APIKeyDetailedResponse(
                 **key_dict,
-                scopes=[s.scope.scope_name for s in key.scopes],
+                scopes=[s.scope_name for s in key.scopes],
                 project=ProjectInfo(**key.project.__dict__) if key.project else None
             )
         )
@@ -81,7 +81,7 @@ async def list_all_api_keys(
 async def create_api_key(
     project_id: int,
     key_data: APIKeyCreate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:write"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:write"])),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -132,7 +132,7 @@ async def create_api_key(
     created_key = await api_key_repository.get_by_id(session, created_key_id)
     
     key_dict = {k: v for k, v in created_key.__dict__.items() if k not in ['scopes', 'project']}
-    scopes_list = [s.scope.scope_name for s in created_key.scopes] if created_key and getattr(created_key, "scopes", None) else []
+    scopes_list = [s.scope_name for s in created_key.scopes] if created_key and getattr(created_key, "scopes", None) else []
     return APIKeyCreateResponse(
         **key_dict,
         scopes=scopes_list,
@@ -146,7 +146,7 @@ async def list_project_api_keys(
     active_only: bool = True,
     skip: int = 0,
     limit: int = 100,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """List API keys for a specific project"""
@@ -172,7 +172,7 @@ async def list_project_api_keys(
         result.append(
             APIKeyDetailedResponse(
                 **key_dict,
-                #scopes=[s.scope.scope_name for s in key.scopes],
+                #scopes=[s.scope_name for s in key.scopes],
                 project=ProjectInfo(**key.project.__dict__) if key.project else None
             )
         )
@@ -184,7 +184,7 @@ async def list_project_api_keys(
 async def get_api_key(
     project_id: int,
     key_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:read"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Get API key by ID"""
@@ -199,7 +199,7 @@ async def get_api_key(
     key_dict = {k: v for k, v in key.__dict__.items() if k not in ['scopes', 'project']}
     return APIKeyDetailedResponse(
         **key_dict,
-        scopes=[s.scope.scope_name for s in key.scopes],
+        scopes=[s.scope_name for s in key.scopes],
         project=ProjectInfo(**key.project.__dict__) if key.project else None
     )
 
@@ -209,7 +209,7 @@ async def update_api_key(
     project_id: int,
     key_id: int,
     key_data: APIKeyUpdate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:write"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:write"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Update API key metadata"""
@@ -236,11 +236,13 @@ async def update_api_key(
             detail=f"API key {key_id} not found"
         )
     
+    invalidate_api_key(key_id)
+    
     # Reload with scopes
     updated = await api_key_repository.get_by_id(session, key_id)
     
     key_dict = {k: v for k, v in updated.__dict__.items() if k not in ['scopes', 'project']}
-    scopes_list = [s.scope.scope_name for s in updated.scopes] if updated and getattr(updated, "scopes", None) else []
+    scopes_list = [s.scope_name for s in updated.scopes] if updated and getattr(updated, "scopes", None) else []
     return APIKeyDetailedResponse(
         **key_dict,
         scopes=scopes_list
@@ -252,7 +254,7 @@ async def update_api_key_scopes(
     project_id: int,
     key_id: int,
     scope_data: APIKeyScopesUpdate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:write"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:write"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Replace all scopes for an API key"""
@@ -281,11 +283,13 @@ async def update_api_key_scopes(
             detail=f"API key {key_id} not found"
         )
     
+    invalidate_api_key(key_id)
+    
     # Reload with new scopes
     updated = await api_key_repository.get_by_id(session, key_id)
     
     key_dict = {k: v for k, v in updated.__dict__.items() if k not in ['scopes', 'project']}
-    scopes_list = [s.scope.scope_name for s in updated.scopes] if updated and getattr(updated, "scopes", None) else []
+    scopes_list = [s.scope_name for s in updated.scopes] if updated and getattr(updated, "scopes", None) else []
     return APIKeyResponse(
         **key_dict,
         scopes=scopes_list
@@ -296,7 +300,7 @@ async def update_api_key_scopes(
 async def delete_api_key(
     project_id: int,
     key_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:delete"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:delete"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Permanently delete an API key (cascades to scopes and config)"""
@@ -316,6 +320,8 @@ async def delete_api_key(
             detail=f"API key {key_id} not found"
         )
     
+    invalidate_api_key(key_id)
+    
     return None
 
 
@@ -323,7 +329,7 @@ async def delete_api_key(
 async def revoke_api_key(
     project_id: int,
     key_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:write"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:write"])),
     session: AsyncSession = Depends(get_session)
 ):
     """Revoke (deactivate) an API key without deleting it"""
@@ -343,11 +349,13 @@ async def revoke_api_key(
             detail=f"API key {key_id} not found"
         )
     
+    invalidate_api_key(key_id)
+    
     # Return updated key
     updated = await api_key_repository.get_by_id(session, key_id)
     
     key_dict = {k: v for k, v in updated.__dict__.items() if k not in ['scopes', 'project']}
-    scopes_list = [s.scope.scope_name for s in updated.scopes] if updated and getattr(updated, "scopes", None) else []
+    scopes_list = [s.scope_name for s in updated.scopes] if updated and getattr(updated, "scopes", None) else []
     return APIKeyResponse(
         **key_dict,
         scopes=scopes_list
@@ -356,7 +364,7 @@ async def revoke_api_key(
 @router.post("/keys/validate", summary="Validate Key Access", response_description="Validation API Key Info", response_model=APIKeyValidationResponse)
 async def validate_key_access(
     key_data: APIKeyValidationRequest,    
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:keys:read"])),
+    api_key: AuthIdentity = Depends(PermissionChecker(["akm:keys:read"])),
     session: AsyncSession = Depends(get_session)
 ):
         """
@@ -386,7 +394,7 @@ async def validate_key_access(
         
         # Check required scopes
         if key_data.required_scopes:
-            key_scopes = [s.scope.scope_name for s in valid_key.scopes]
+            key_scopes = [s.scope_name for s in valid_key.scopes]
             missing_scopes = [s for s in key_data.required_scopes if s not in key_scopes]
             if len(missing_scopes)>0:
                 raise HTTPException(
@@ -403,5 +411,5 @@ async def validate_key_access(
             version=version,
             docs_url=docs_url,
             message="API Key is valid. Access granted.",
-            scopes_granted=[s.scope.scope_name for s in valid_key.scopes]
+            scopes_granted=[s.scope_name for s in valid_key.scopes]
         )
\ No newline at end of file
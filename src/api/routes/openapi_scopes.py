@@ -2,17 +2,28 @@
 API routes for OpenAPI/Swagger scope generation.
 """
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+import asyncio
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Union
+
+import yaml
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_session
-from src.database.repositories.scope_repository import scope_repository
-from src.database.models import AKMAPIKey
-from src.api.auth_middleware import PermissionChecker
+from src.database.repositories.scope_repository import ScopeRow, scope_repository
+from src.api.auth_middleware import AuthIdentity, PermissionChecker
+from src.api.cache import invalidate_scope_export
+from src.config import settings
 from src.api.models import (
     OpenAPISourceType,
     ScopeGenerationStrategy,
+    ScopeNamingConfig,
     OpenAPISourceRequest,
     OpenAPIScopeGenerationResponse,
     OpenAPIAnalysisResponse,
@@ -20,31 +31,236 @@ from src.api.models import (
 )
 from src.services import openapi_scope_generator
 
+try:
+    from yaml import CSafeLoader as YAMLSafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YAMLSafeLoader
+
 router = APIRouter(prefix="/scopes/openapi", tags=["OpenAPI Scope Generation"])
 
+# Permission dependencies shared by the routes below
+_READ_SCOPES = PermissionChecker(frozenset({"akm:scopes:read"}))
+_WRITE_SCOPES = PermissionChecker(frozenset({"akm:scopes:write"}))
+
+# Results are deterministic per request body; let clients reuse them briefly
+CACHE_CONTROL = "private, max-age=300"
+
+# Uploads are consumed in fixed-size chunks rather than one unbounded read
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Uploaded specs larger than this are rejected before parsing
+MAX_SPEC_BYTES = 10 * 1024 * 1024
+
+# YAML with anchors and more alias markers than this is rejected (alias-expansion bombs)
+MAX_YAML_ALIASES = 100
+
+# Whitespace JSON allows before the first value
+_LEADING_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+
+# Most specs accepted by one batch request
+MAX_BATCH_SOURCES = 20
+
+# Worker processes for CPU-bound scope generation in batch imports (created lazily)
+_generation_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _compute_etag(request: OpenAPISourceRequest, version: str) -> str:
+    """
+    Compute a strong ETag from the canonical JSON of the request body and
+    the version of the loaded spec (see load_spec_with_version)
+    """
+    canonical = json.dumps(request.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return f'"{hashlib.sha256(f"{version}:{canonical}".encode("utf-8")).hexdigest()}"'
+
+
+def _inline_etag(request: OpenAPISourceRequest) -> Optional[str]:
+    """ETag known before loading: only inline JSON specs are fully described by the body"""
+    if request.source_type == OpenAPISourceType.JSON:
+        return _compute_etag(request, "inline")
+    return None
+
+
+def _not_modified(http_request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response when the client already holds this ETag"""
+    if http_request.headers.get("If-None-Match") == etag:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    return None
+
+
+async def _read_upload(file: UploadFile, max_bytes: int = MAX_SPEC_BYTES) -> bytearray:
+    """
+    Read an uploaded file in UPLOAD_CHUNK_SIZE chunks.
+    
+    The buffer is returned as is: converting it to bytes would hold a
+    second copy of the whole upload.
+    
+    Raises:
+        HTTPException: 413 as soon as the upload exceeds max_bytes
+    """
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds maximum size of {max_bytes} bytes"
+            )
+    return buffer
+
+
+class _BufferReader:
+    """
+    Read-only stream over a bytearray without copying it whole.
+    
+    PyYAML only takes str, bytes or file-like objects, so a bytearray is
+    handed over through this and consumed chunk by chunk.
+    """
+    __slots__ = ("_view", "_pos")
+    
+    def __init__(self, buffer: bytearray):
+        self._view = memoryview(buffer)
+        self._pos = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size < 0 else self._pos + size
+        chunk = self._view[self._pos:end].tobytes()
+        self._pos += len(chunk)
+        return chunk
+
+
+def _yaml_input(content: Union[bytes, bytearray]):
+    """Hand content to PyYAML without copying a bytearray"""
+    return _BufferReader(content) if isinstance(content, bytearray) else content
+
+
+def _check_yaml_aliases(content: Union[bytes, bytearray]) -> None:
+    """
+    Reject YAML that could expand into a huge document through aliases.
+    
+    Counts real alias tokens from the scanner, so '*/*' media types or
+    markdown inside quoted or block scalars are not mistaken for aliases.
+    Scanner errors are left for the loader to report.
+    """
+    if b"&" not in content:
+        return  # Nothing is anchored, so nothing can be aliased
+    aliases = 0
+    try:
+        for token in yaml.scan(_yaml_input(content), Loader=YAMLSafeLoader):
+            if isinstance(token, yaml.AliasToken):
+                aliases += 1
+                if aliases > MAX_YAML_ALIASES:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"YAML uses more than {MAX_YAML_ALIASES} aliases"
+                    )
+    except yaml.YAMLError:
+        return
+
+
+def _looks_like_json(content: Union[bytes, bytearray], filename: Optional[str], content_type: Optional[str]) -> bool:
+    """
+    Guess whether an uploaded spec is JSON without parsing it.
+    
+    YAML filenames/content types win; otherwise the first non-whitespace
+    byte decides (JSON documents start with '{' or '[').
+    """
+    if filename and filename.lower().endswith(('.yaml', '.yml')):
+        return False
+    if content_type and 'yaml' in content_type:
+        return False
+    # Match the leading whitespace instead of lstrip(), which copies the content
+    start = _LEADING_WHITESPACE.match(content).end()
+    return content[start:start + 1] in (b'{', b'[')
+
+
+def _get_generation_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Return the shared process pool, creating it on first use.
+    
+    None on Vercel, where worker processes can't be forked; callers then
+    run generation on the event loop's default thread pool.
+    """
+    global _generation_pool
+    if settings.is_vercel:
+        return None
+    if _generation_pool is None:
+        _generation_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _generation_pool
+
+
+def shutdown_generation_pool() -> None:
+    """Stop the worker processes (called from the app lifespan)"""
+    global _generation_pool
+    if _generation_pool is not None:
+        _generation_pool.shutdown(cancel_futures=True)
+        _generation_pool = None
+
+
+def _generate_for_source(
+    spec: dict,
+    request: OpenAPISourceRequest
+) -> OpenAPIScopeGenerationResponse:
+    """Generate scopes for one loaded spec (runs in a worker process)"""
+    return openapi_scope_generator.generate_scopes(
+        spec,
+        request.strategy,
+        request.naming_config,
+        request.category,
+        request.generate_wildcards,
+        request.ignore_unknown_resources
+    )
+
 
 @router.post("/analyze", response_model=OpenAPIAnalysisResponse)
 async def analyze_openapi_spec(
     request: OpenAPISourceRequest,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:read"]))
+    http_request: Request,
+    response: Response,
+    api_key: AuthIdentity = Depends(_READ_SCOPES)
 ):
     """
     Analyze OpenAPI/Swagger specification and preview scope generation.
     
     This endpoint analyzes the spec and returns statistics about what scopes
     would be generated for each strategy, without actually generating them.
+    
+    Responses carry an ETag when the spec's version is known (inline JSON,
+    or a URL whose server sends ETag/Last-Modified); send it back in
+    If-None-Match to get a 304.
     """
+    etag = _inline_etag(request)
+    not_modified = etag and _not_modified(http_request, etag)
+    if not_modified:
+        return not_modified
+    
     try:
         # Load spec
-        spec = await openapi_scope_generator.load_spec(
+        spec, version = await openapi_scope_generator.load_spec_with_version(
             request.source_type,
             request.source,
             request.spec_data
         )
         
+        # Remote specs are revalidated upstream first, so a changed spec gets a new ETag
+        if etag is None and version is not None:
+            etag = _compute_etag(request, version)
+            not_modified = _not_modified(http_request, etag)
+            if not_modified:
+                return not_modified
+        
         # Analyze
         analysis = openapi_scope_generator.analyze_spec(spec)
         
+        if etag is not None:
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = CACHE_CONTROL
+        
         return analysis
         
     except Exception as e:
@@ -54,10 +270,12 @@ async def analyze_openapi_spec(
         )
 
 
-@router.post("/generate", response_model=OpenAPIScopeGenerationResponse)
+@router.post("/generate", response_model=OpenAPIScopeGenerationResponse, response_class=ORJSONResponse)
 async def generate_scopes_from_openapi(
     request: OpenAPISourceRequest,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:read"]))
+    http_request: Request,
+    response: Response,
+    api_key: AuthIdentity = Depends(_READ_SCOPES)
 ):
     """
     Generate scopes from OpenAPI/Swagger specification.
@@ -72,15 +290,31 @@ async def generate_scopes_from_openapi(
     - path_method: One scope per path + HTTP method combination
     - tag_based: One scope per OpenAPI tag + action
     - operation_id: One scope per operationId
+    
+    Responses carry an ETag when the spec's version is known (inline JSON,
+    or a URL whose server sends ETag/Last-Modified); send it back in
+    If-None-Match to get a 304.
     """
+    etag = _inline_etag(request)
+    not_modified = etag and _not_modified(http_request, etag)
+    if not_modified:
+        return not_modified
+    
     try:
         # Load spec
-        spec = await openapi_scope_generator.load_spec(
+        spec, version = await openapi_scope_generator.load_spec_with_version(
             request.source_type,
             request.source,
             request.spec_data
         )
         
+        # Remote specs are revalidated upstream first, so a changed spec gets a new ETag
+        if etag is None and version is not None:
+            etag = _compute_etag(request, version)
+            not_modified = _not_modified(http_request, etag)
+            if not_modified:
+                return not_modified
+        
         # Generate scopes
         result = openapi_scope_generator.generate_scopes(
             spec,
@@ -91,6 +325,10 @@ async def generate_scopes_from_openapi(
             request.ignore_unknown_resources
         )
         
+        if etag is not None:
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = CACHE_CONTROL
+        
         return result
         
     except Exception as e:
@@ -100,7 +338,7 @@ async def generate_scopes_from_openapi(
         )
 
 
-@router.post("/generate/file", response_model=OpenAPIScopeGenerationResponse)
+@router.post("/generate/file", response_model=OpenAPIScopeGenerationResponse, response_class=ORJSONResponse)
 async def generate_scopes_from_file(
     file: UploadFile = File(..., description="OpenAPI spec file (JSON or YAML)"),
     strategy: ScopeGenerationStrategy = ScopeGenerationStrategy.PATH_RESOURCE,
@@ -108,7 +346,7 @@ async def generate_scopes_from_file(
     category: str = "api",
     generate_wildcards: bool = True,
     ignore_unknown_resources: bool = True,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:read"]))
+    api_key: AuthIdentity = Depends(_READ_SCOPES)
 ):
     """
     Generate scopes from uploaded OpenAPI/Swagger file.
@@ -117,17 +355,21 @@ async def generate_scopes_from_file(
     """
     try:
         # Read file content
-        content = await file.read()
+        content = await _read_upload(file)
         
-        # Try to parse as JSON or YAML
-        import json
-        import yaml
+        # Parse as JSON or YAML based on the detected format
+        spec = None
+        if _looks_like_json(content, file.filename, file.content_type):
+            try:
+                spec = json.loads(content)
+            except json.JSONDecodeError:
+                # Flow-style YAML also starts with '{' - fall through to YAML
+                pass
         
-        try:
-            spec = json.loads(content)
-        except json.JSONDecodeError:
+        if spec is None:
+            _check_yaml_aliases(content)
             try:
-                spec = yaml.safe_load(content)
+                spec = yaml.load(_yaml_input(content), Loader=YAMLSafeLoader)
             except yaml.YAMLError as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -135,8 +377,6 @@ async def generate_scopes_from_file(
                 )
         
         # Generate scopes
-        from src.api.models.openapi_scopes import ScopeNamingConfig
-        
         naming_config = ScopeNamingConfig(namespace=namespace)
         
         result = openapi_scope_generator.generate_scopes(
@@ -159,7 +399,7 @@ async def generate_scopes_from_file(
         )
 
 
-@router.post("/generate/url", response_model=OpenAPIScopeGenerationResponse)
+@router.post("/generate/url", response_model=OpenAPIScopeGenerationResponse, response_class=ORJSONResponse)
 async def generate_scopes_from_url(
     url: str,
     strategy: ScopeGenerationStrategy = ScopeGenerationStrategy.PATH_RESOURCE,
@@ -167,7 +407,7 @@ async def generate_scopes_from_url(
     category: str = "api",
     generate_wildcards: bool = True,
     ignore_unknown_resources: bool = True,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:read"]))
+    api_key: AuthIdentity = Depends(_READ_SCOPES)
 ):
     """
     Generate scopes from OpenAPI spec URL.
@@ -185,8 +425,6 @@ async def generate_scopes_from_url(
         )
         
         # Generate scopes
-        from src.api.models.openapi_scopes import ScopeNamingConfig
-        
         naming_config = ScopeNamingConfig(namespace=namespace)
         
         result = openapi_scope_generator.generate_scopes(
@@ -207,18 +445,20 @@ async def generate_scopes_from_url(
         )
 
 
-@router.post("/generate-and-import", response_model=BulkScopesResponse)
+@router.post("/generate-and-import", response_model=BulkScopesResponse, response_class=ORJSONResponse)
 async def generate_and_import_scopes(
     request: OpenAPISourceRequest,
     import_to_db: bool = True,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:write"])),
+    include_names: bool = False,
+    api_key: AuthIdentity = Depends(_WRITE_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
     """
     Generate scopes from OpenAPI spec and optionally import them to database.
     
     This is a convenience endpoint that combines generation and import in one call.
-    Set import_to_db=false to only generate without importing.
+    Set import_to_db=false to only generate without importing; the preview
+    only lists scope_names when include_names=true.
     """
     try:
         # Load spec
@@ -246,18 +486,11 @@ async def generate_and_import_scopes(
                 updated=0,
                 skipped=generation_result.total_scopes,
                 errors=[],
-                scope_names=[s.scope_name for s in generation_result.scopes]
+                scope_names=[s.scope_name for s in generation_result.scopes] if include_names else []
             )
         
-        # Convert to bulk format and import
-        scopes_data = [
-            {
-                "scope_name": scope.scope_name,
-                "description": scope.description,
-                "is_active": scope.is_active
-            }
-            for scope in generation_result.scopes
-        ]
+        # Generated scopes are passed through as-is; bulk_upsert reads their attributes
+        scopes_data = generation_result.scopes
         
         # Perform bulk upsert
         # You need to provide the correct project_id here, for example from request or api_key
@@ -268,6 +501,7 @@ async def generate_and_import_scopes(
                 detail="Missing required parameter: project_id"
             )
         result = await scope_repository.bulk_upsert(session=session, scopes_data=scopes_data, project_id=project_id)
+        await invalidate_scope_export(project_id)
         
         # Add warnings as errors if any
         if generation_result.warnings:
@@ -287,3 +521,125 @@ async def generate_and_import_scopes(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to generate and import scopes: {str(e)}"
         )
+
+
+@router.post("/generate-and-import/batch", response_model=BulkScopesResponse, response_class=ORJSONResponse)
+async def generate_and_import_scopes_batch(
+    sources: List[OpenAPISourceRequest],
+    import_to_db: bool = True,
+    include_names: bool = False,
+    api_key: AuthIdentity = Depends(_WRITE_SCOPES),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Generate scopes from several OpenAPI specs and optionally import them.
+    
+    Specs are loaded concurrently and scope generation runs in a process
+    pool, one spec per worker (in a thread on Vercel). Results are merged
+    and imported with a single bulk upsert per project, all in one
+    transaction: if any project fails, nothing is imported. As with the
+    single-spec endpoint, a preview (import_to_db=false) lists scope_names
+    only when include_names=true. At most MAX_BATCH_SOURCES specs are
+    accepted per request.
+    """
+    if not sources:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one source is required"
+        )
+    if len(sources) > MAX_BATCH_SOURCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_SOURCES} sources are accepted per batch"
+        )
+    
+    try:
+        specs = await asyncio.gather(*(
+            openapi_scope_generator.load_spec(
+                source.source_type,
+                source.source,
+                source.spec_data
+            )
+            for source in sources
+        ))
+        
+        loop = asyncio.get_running_loop()
+        pool = _get_generation_pool()
+        generation_results = await asyncio.gather(*(
+            loop.run_in_executor(pool, _generate_for_source, spec, source)
+            for spec, source in zip(specs, sources)
+        ))
+        
+        # Merge per project; later sources win on duplicate scope names
+        scopes_by_project: Dict[int, Dict[str, ScopeRow]] = {}
+        warnings: List[str] = []
+        for source, generation_result in zip(sources, generation_results):
+            project_scopes = scopes_by_project.setdefault(source.project_id, {})
+            for scope in generation_result.scopes:
+                project_scopes[scope.scope_name] = ScopeRow(
+                    scope.scope_name, scope.description, scope.is_active
+                )
+            warnings.extend(
+                f"{generation_result.api_title}: {warning}"
+                for warning in generation_result.warnings
+            )
+        
+        total = sum(len(project_scopes) for project_scopes in scopes_by_project.values())
+        
+        if not import_to_db:
+            return BulkScopesResponse(
+                total_processed=total,
+                created=0,
+                updated=0,
+                skipped=total,
+                errors=warnings,
+                scope_names=[
+                    scope_name
+                    for project_scopes in scopes_by_project.values()
+                    for scope_name in project_scopes
+                ] if include_names else []
+            )
+        
+        created = updated = skipped = 0
+        errors: List[str] = []
+        scope_names: List[str] = []
+        for project_id, project_scopes in scopes_by_project.items():
+            try:
+                result = await scope_repository.bulk_upsert(
+                    session=session,
+                    scopes_data=list(project_scopes.values()),
+                    project_id=project_id,
+                    commit=False
+                )
+            except Exception as e:
+                await session.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Import failed for project {project_id}; no scopes were imported: {str(e)}"
+                )
+            created += result["created"]
+            updated += result["updated"]
+            skipped += result["skipped"]
+            errors.extend(result["errors"])
+            scope_names.extend(result["scope_names"])
+        
+        await session.commit()
+        for project_id in scopes_by_project:
+            await invalidate_scope_export(project_id)
+        
+        return BulkScopesResponse(
+            total_processed=total,
+            created=created,
+            updated=updated,
+            skipped=skipped,
+            errors=errors + warnings,
+            scope_names=scope_names
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to generate and import scopes: {str(e)}"
+        )
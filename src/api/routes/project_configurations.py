@@ -4,14 +4,15 @@ API endpoints for Project Configuration management.
 Handles dynamic configuration for CORS, rate limits, IP allowlists, and custom settings.
 """
 
-from typing import Optional
+from typing import Iterable, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_session
 from src.database.repositories.project_configuration_repository import project_configuration_repository
-from src.database.models import AKMAPIKey
-from src.api.auth_middleware import PermissionChecker
+from src.api.auth_middleware import AuthIdentity, PermissionChecker
+from src.api.cache import invalidate_project_keys
 from src.api.models.project_configuration import (
     ProjectConfigurationCreate,
     ProjectConfigurationUpdate,
@@ -24,6 +25,37 @@ logger = get_logger(__name__)
 
 router = APIRouter(tags=["Project Configurations"])
 
+# Built once at import so ORM rows are converted through the prebuilt core validator
+_config_adapter = TypeAdapter(ProjectConfigurationResponse)
+
+
+def ensure_project_access(required_scopes: Iterable[str]):
+    """
+    Build a dependency that authenticates the key and checks project access.
+    
+    The key must belong to the project in the path, or hold 'akm:admin'
+    for cross-project access.
+    """
+    permission_checker = PermissionChecker(required_scopes)
+
+    async def dependency(
+        project_id: int,
+        api_key: AuthIdentity = Depends(permission_checker)
+    ) -> AuthIdentity:
+        if api_key.project_id != project_id and "akm:admin" not in api_key.scope_names:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="API key does not have access to this project"
+            )
+        return api_key
+
+    return dependency
+
+
+# Permission dependencies shared by the routes below
+_READ_CONFIGURATION = ensure_project_access(frozenset({"akm:projects:read"}))
+_WRITE_CONFIGURATION = ensure_project_access(frozenset({"akm:projects:write"}))
+
 
 @router.put(
     "/projects/{project_id}/configuration",
@@ -35,7 +67,7 @@ router = APIRouter(tags=["Project Configurations"])
 async def upsert_project_configuration(
     project_id: int,
     config: ProjectConfigurationCreate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_CONFIGURATION),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -56,19 +88,6 @@ async def upsert_project_configuration(
     Changes apply immediately without restart.
     """
     try:
-        # Verify API key belongs to this project or has admin access
-        # api_key is already authenticated by PermissionChecker
-        
-        # Check if API key has access to this project
-        if api_key.project_id != project_id:
-            # Check if API key has admin scope for cross-project access
-            scopes = [scope.scope_name for scope in api_key.scopes]
-            if "akm:admin" not in scopes:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="API key does not have access to this project"
-                )
-        
         # Convert Pydantic model to dict (only non-None values)
         config_data = config.model_dump(exclude_none=True)
         
@@ -78,6 +97,8 @@ async def upsert_project_configuration(
             project_id=project_id,
             config_data=config_data
         )
+        # Keys without their own config authenticate with these defaults
+        invalidate_project_keys(project_id)
         
         log_with_context(
             logger, "info", "Project configuration updated via API",
@@ -86,7 +107,7 @@ async def upsert_project_configuration(
             updated_fields=list(config_data.keys())
         )
         
-        return ProjectConfigurationResponse.model_validate(db_config)
+        return _config_adapter.validate_python(db_config, from_attributes=True)
         
     except ValueError as e:
         # Validation errors from repository
@@ -114,7 +135,7 @@ async def upsert_project_configuration(
 )
 async def get_project_configuration(
     project_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:read"])),
+    api_key: AuthIdentity = Depends(_READ_CONFIGURATION),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -124,19 +145,6 @@ async def get_project_configuration(
     If no custom configuration exists, returns null (project uses global defaults).
     """
     try:
-        # Verify API key belongs to this project or has admin access
-        # api_key is already authenticated by PermissionChecker
-        
-        # Check if API key has access to this project
-        if api_key.project_id != project_id:
-            # Check if API key has admin scope for cross-project access
-            scopes = [scope.scope_name for scope in api_key.scopes]
-            if "akm:admin" not in scopes:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="API key does not have access to this project"
-                )
-        
         # Get configuration
         config = await project_configuration_repository.get_by_project_id(
             session=session,
@@ -146,7 +154,7 @@ async def get_project_configuration(
         if not config:
             return None
         
-        return ProjectConfigurationResponse.model_validate(config)
+        return _config_adapter.validate_python(config, from_attributes=True)
         
     except HTTPException:
         raise
@@ -170,7 +178,7 @@ async def get_project_configuration(
 )
 async def delete_project_configuration(
     project_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_CONFIGURATION),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -180,19 +188,6 @@ async def delete_project_configuration(
     Project will use global defaults after deletion.
     """
     try:
-        # Verify API key belongs to this project or has admin access
-        # api_key is already authenticated by PermissionChecker
-        
-        # Check if API key has access to this project
-        if api_key.project_id != project_id:
-            # Check if API key has admin scope for cross-project access
-            scopes = [scope.scope_name for scope in api_key.scopes]
-            if "akm:admin" not in scopes:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="API key does not have access to this project"
-                )
-        
         # Delete configuration
         deleted = await project_configuration_repository.delete(
             session=session,
@@ -205,6 +200,8 @@ async def delete_project_configuration(
                 detail="Project configuration not found"
             )
         
+        invalidate_project_keys(project_id)
+        
         log_with_context(
             logger, "info", "Project configuration deleted via API",
             project_id=project_id,
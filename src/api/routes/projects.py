@@ -8,8 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_session
 from src.database.repositories.project_repository import project_repository
-from src.database.models import AKMAPIKey
-from src.api.auth_middleware import PermissionChecker
+from src.api.auth_middleware import AuthIdentity, PermissionChecker
+from src.api.cache import invalidate_project, invalidate_project_keys, invalidate_scope_export
 from src.api.models import (
     ProjectCreate,
     ProjectUpdate,
@@ -19,22 +19,19 @@ from src.api.models import (
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+# Permission dependencies shared by the routes below
+_READ_PROJECTS = PermissionChecker(frozenset({"akm:projects:read"}))
+_WRITE_PROJECTS = PermissionChecker(frozenset({"akm:projects:write"}))
+_DELETE_PROJECTS = PermissionChecker(frozenset({"akm:projects:delete"}))
+
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_PROJECTS),
     session: AsyncSession = Depends(get_session)
 ):
     """Create a new project"""
-    # Check if project with same name exists
-    existing = await project_repository.get_by_name(session, project_data.name)
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Project with name '{project_data.name}' already exists"
-        )
-    
     project = await project_repository.create(
         session,
         name=project_data.name,
@@ -42,6 +39,15 @@ async def create_project(
         description=project_data.description
     )
     
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Project with name '{project_data.name}' already exists"
+        )
+    
+    # Clear any negative existence entry cached for this id
+    await invalidate_project(project.id)
+    
     return project
 
 
@@ -50,7 +56,7 @@ async def list_projects(
     active_only: bool = True,
     skip: int = 0,
     limit: int = 100,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:read"])),
+    api_key: AuthIdentity = Depends(_READ_PROJECTS),
     session: AsyncSession = Depends(get_session)
 ):
     """List all projects"""
@@ -66,34 +72,26 @@ async def list_projects(
 @router.get("/{project_id}", response_model=ProjectWithStats)
 async def get_project(
     project_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:read"])),
+    api_key: AuthIdentity = Depends(_READ_PROJECTS),
     session: AsyncSession = Depends(get_session)
 ):
     """Get project by ID with statistics"""
-    project = await project_repository.get_by_id(session, project_id)
+    row = await project_repository.get_with_key_counts(session, project_id)
     
-    if not project:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Project {project_id} not found"
         )
     
-    # Get key counts
-    active_count = await project_repository.get_api_key_count(session, project_id, active_only=True)
-    total_count = await project_repository.get_api_key_count(session, project_id, active_only=False)
-    
-    return ProjectWithStats(
-        **project.__dict__,
-        active_keys_count=active_count,
-        total_keys_count=total_count
-    )
+    return ProjectWithStats.model_validate(row)
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_PROJECTS),
     session: AsyncSession = Depends(get_session)
 ):
     """Update project"""
@@ -111,6 +109,9 @@ async def update_project(
             detail=f"Project {project_id} not found"
         )
     
+    await invalidate_project(project_id)
+    invalidate_project_keys(project_id)
+    
     return updated
 
 
@@ -118,7 +119,7 @@ async def update_project(
 async def delete_project(
     project_id: int,
     hard_delete: bool = False,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:projects:delete"])),
+    api_key: AuthIdentity = Depends(_DELETE_PROJECTS),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -138,4 +139,8 @@ async def delete_project(
             detail=f"Project {project_id} not found"
         )
     
+    await invalidate_project(project_id)
+    invalidate_project_keys(project_id)
+    await invalidate_scope_export(project_id)
+    
     return None
@@ -1,28 +1,40 @@
-from typing import List
+from typing import List, Optional
 from pathlib import Path
-import json
+import asyncio
+import hashlib
 
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Request,
+    Response,
     status,
     UploadFile,
     File,
 )
 
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_session
-from src.database.models import AKMAPIKey
 from src.database.repositories.scope_repository import scope_repository
-from src.database.repositories.project_repository import project_repository
 
-from src.api.auth_middleware import PermissionChecker
+from src.api.auth_middleware import AuthIdentity, PermissionChecker
+from src.api.cache import (
+    ensure_project_exists,
+    not_modified,
+    get_scope_export,
+    store_scope_export,
+    invalidate_scope_export,
+    invalidate_project_keys,
+)
 from src.api.models import (
     ScopeCreate,
     ScopeUpdate,
     ScopeResponse,
+    BulkScopeItem,
     BulkScopesRequest,
     BulkScopesResponse,
 )
@@ -45,26 +57,83 @@ Scopes are now project-scoped following RESTful hierarchy:
 
 router = APIRouter(tags=["Scopes"])
 
+# Permission dependencies shared by the routes below
+_READ_SCOPES = PermissionChecker(frozenset({"akm:scopes:read"}))
+_WRITE_SCOPES = PermissionChecker(frozenset({"akm:scopes:write"}))
+_DELETE_SCOPES = PermissionChecker(frozenset({"akm:scopes:delete"}))
+_BULK_JSON_SCOPES = PermissionChecker(frozenset({"akm:scopes:bulk:json"}))
+_BULK_FILE_SCOPES = PermissionChecker(frozenset({"akm:scopes:bulk:file"}))
+_DELETE_ALL_SCOPES = PermissionChecker(frozenset({"akm:scopes:delete_all"}))
+
+# Bulk upload files above this size are parsed in a worker thread
+BULK_FILE_THREAD_THRESHOLD = 1024 * 1024
+
+# Scopes handed to each bulk_upsert call; the event loop gets a turn between chunks
+BULK_UPSERT_CHUNK_SIZE = 500
+
+# Largest bulk upload accepted; bigger files get 413 before being read
+MAX_BULK_FILE_BYTES = 10 * 1024 * 1024
+
+
+def _bulk_file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds maximum size of {MAX_BULK_FILE_BYTES} bytes"
+    )
+
+
+async def _bulk_upsert_in_chunks(
+    session: AsyncSession,
+    project_id: int,
+    scopes: List[BulkScopeItem]
+) -> dict:
+    """
+    Run bulk_upsert over bounded chunks and merge the per-chunk results.
+    
+    Names are deduplicated across the whole input first (later items win),
+    so a scope repeated in two chunks is counted once. All chunks share one
+    transaction, committed after the last one: a failure imports nothing.
+    """
+    totals = {"created": 0, "updated": 0, "skipped": 0, "errors": [], "scope_names": []}
+    
+    # Validated items go straight to the repository, which reads their attributes
+    unique = list({item.scope_name: item for item in scopes}.values())
+    
+    for start in range(0, len(unique), BULK_UPSERT_CHUNK_SIZE):
+        chunk = unique[start:start + BULK_UPSERT_CHUNK_SIZE]
+        partial = await scope_repository.bulk_upsert(session, project_id, chunk, commit=False)
+        
+        for key in ("created", "updated", "skipped"):
+            totals[key] += partial[key]
+        totals["errors"].extend(partial["errors"])
+        totals["scope_names"].extend(partial["scope_names"])
+        
+        await asyncio.sleep(0)
+    
+    await session.commit()
+    return totals
+
 
 @router.post("/projects/{project_id}/scopes", response_model=ScopeResponse, status_code=status.HTTP_201_CREATED)
 async def create_scope(
     project_id: int,
     scope_data: ScopeCreate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
     """Create a new scope for a project"""
-    # Verify project exists
-    project = await project_repository.get_by_id(session, project_id)
-    if not project:
+    # Verify project exists and the name is free in one round trip. Don't
+    # split this into two asyncio.gather'd lookups: an AsyncSession cannot
+    # run statements concurrently on its single connection.
+    project_exists, duplicate = await scope_repository.check_project_and_duplicate(
+        session, project_id, scope_data.scope_name
+    )
+    if not project_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Project {project_id} not found"
         )
-    
-    # Check if scope exists in this project
-    existing = await scope_repository.get_by_project_and_name(session, project_id, scope_data.scope_name)
-    if existing:
+    if duplicate:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Scope '{scope_data.scope_name}' already exists in project {project_id}"
@@ -77,41 +146,53 @@ async def create_scope(
         scope_name=scope_data.scope_name,
         description=scope_data.description
     )
+    await invalidate_scope_export(project_id)
     
     return scope
 
 
-@router.get("/projects/{project_id}/scopes", response_model=List[ScopeResponse])
+@router.get("/projects/{project_id}/scopes", response_model=List[ScopeResponse], response_class=ORJSONResponse)
 async def list_scopes(
     project_id: int,
+    response: Response,
     active_only: bool = True,
     skip: int = 0,
     limit: int = 100,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:read"])),
+    after: Optional[str] = None,
+    api_key: AuthIdentity = Depends(_READ_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
-    """List all scopes for a project"""
+    """
+    List all scopes for a project.
+    
+    Pages are ordered by scope_name. When another page exists, the
+    X-Next-Cursor header carries the value to pass as ``after`` for it.
+    A cursor past the last scope returns an empty page.
+    """
     # Verify project exists
-    project = await project_repository.get_by_id(session, project_id)
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Project {project_id} not found"
-        )
+    await ensure_project_exists(session, project_id)
     
     scopes = await scope_repository.list_by_project(
         session,
         project_id=project_id,
         active_only=active_only,
         skip=skip,
-        limit=limit
+        limit=limit + 1,
+        after=after
     )
 
-    if scopes is None or len(scopes) == 0:
+    if not scopes:
+        if after is not None:
+            return []
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No scopes found for project {project_id}"
         )
+    # The extra row only tells whether another page exists
+    if len(scopes) > limit:
+        scopes = scopes[:limit]
+        if scopes:
+            response.headers["X-Next-Cursor"] = scopes[-1].scope_name
     return scopes
 
 
@@ -119,10 +200,12 @@ async def list_scopes(
 async def get_scope(
     project_id: int,
     scope_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:read"])),
+    request: Request,
+    response: Response,
+    api_key: AuthIdentity = Depends(_READ_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
-    """Get scope by ID"""
+    """Get scope by ID (honours If-Modified-Since)"""
     scope = await scope_repository.get_by_id(session, scope_id)
     
     if scope is None or (getattr(scope, "project_id", None) is not None and getattr(scope, "project_id", None) != project_id):
@@ -131,6 +214,9 @@ async def get_scope(
             detail=f"Scope {scope_id} not found in project {project_id}"
         )
     
+    cached = not_modified(request, response, scope.updated_at or scope.created_at)
+    if cached is not None:
+        return cached
     return scope
 
 
@@ -139,34 +225,36 @@ async def update_scope(
     project_id: int,
     scope_id: int,
     scope_data: ScopeUpdate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
     """Update scope"""
-    scope = await scope_repository.get_by_id(session, scope_id)
-    
-    if scope is None or (getattr(scope, "project_id", None) != project_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Scope {scope_id} not found in project {project_id}"
-        )
-    
     updated = await scope_repository.update_by_id(
         session,
         scope_id,
         description=scope_data.description,
-        is_active=scope_data.is_active
+        is_active=scope_data.is_active,
+        project_id=project_id
     )
     
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Scope {scope_id} not found in project {project_id}"
+        )
+    await invalidate_scope_export(project_id)
+    # Cached keys hold their scope set; drop them when a scope is deactivated or removed
+    invalidate_project_keys(project_id)
+    
     return updated
 
 
-@router.delete("/projects/{project_id}/scopes/{scope_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/projects/{project_id}/scopes/{scope_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
 async def delete_scope(
     project_id: int,
     scope_id: int,
     hard_delete: bool = False,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:delete"])),
+    api_key: AuthIdentity = Depends(_DELETE_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -174,33 +262,28 @@ async def delete_scope(
         
     """
 
-    scope = await scope_repository.get_by_id(session, scope_id)
-    
-    if scope is None or (getattr(scope, "project_id", None) != project_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Scope {scope_id} not found in project {project_id}"
-        )
-    
     if hard_delete:
-        success = await scope_repository.hard_delete_by_id(session, scope_id)
+        success = await scope_repository.hard_delete_by_id(session, scope_id, project_id=project_id)
     else:
-        success = await scope_repository.delete_by_id(session, scope_id)
+        success = await scope_repository.delete_by_id(session, scope_id, project_id=project_id)
     
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Scope {scope_id} not found"
+            detail=f"Scope {scope_id} not found in project {project_id}"
         )
+    await invalidate_scope_export(project_id)
+    # Cached keys hold their scope set; drop them when a scope is deactivated or removed
+    invalidate_project_keys(project_id)
     
-    return None
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.post("/projects/{project_id}/scopes/bulk/json", response_model=BulkScopesResponse, status_code=status.HTTP_200_OK)
+@router.post("/projects/{project_id}/scopes/bulk/json", response_model=BulkScopesResponse, status_code=status.HTTP_200_OK, response_class=ORJSONResponse)
 async def bulk_upsert_scopes(
     project_id: int,
     request: BulkScopesRequest,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:bulk:json"])),
+    api_key: AuthIdentity = Depends(_BULK_JSON_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
     """📦 Bulk upsert scopes from JSON data for a project
@@ -231,18 +314,12 @@ async def bulk_upsert_scopes(
     📚 **[Full Documentation & Examples](https://github.com/ideiasfactory/akm/blob/main/docs/SCOPES_BULK_INSERT.md)**
     """
     # Verify project exists
-    project = await project_repository.get_by_id(session, project_id)
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Project {project_id} not found"
-        )
-    
-    # Convert Pydantic models to dicts for repository
-    scopes_data = [scope.model_dump() for scope in request.scopes]
+    await ensure_project_exists(session, project_id)
     
     # Perform bulk upsert
-    result = await scope_repository.bulk_upsert(session, project_id, scopes_data)
+    result = await _bulk_upsert_in_chunks(session, project_id, request.scopes)
+    await invalidate_scope_export(project_id)
+    invalidate_project_keys(project_id)
     
     # Build response
     return BulkScopesResponse(
@@ -255,11 +332,11 @@ async def bulk_upsert_scopes(
     )
 
 
-@router.post("/projects/{project_id}/scopes/bulk/file", response_model=BulkScopesResponse, status_code=status.HTTP_200_OK)
+@router.post("/projects/{project_id}/scopes/bulk/file", response_model=BulkScopesResponse, status_code=status.HTTP_200_OK, response_class=ORJSONResponse)
 async def bulk_upsert_scopes_from_file(
     project_id: int,
     file: UploadFile = File(..., description="JSON file with scopes data"),
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:bulk:file"])),
+    api_key: AuthIdentity = Depends(_BULK_FILE_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
     """📄 Bulk upsert scopes from uploaded JSON file for a project
@@ -271,33 +348,40 @@ async def bulk_upsert_scopes_from_file(
     
     📚 **[Full Documentation & Examples](https://github.com/ideiasfactory/akm/blob/main/docs/SCOPES_BULK_INSERT.md)**
     """
-    # Verify project exists
-    project = await project_repository.get_by_id(session, project_id)
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Project {project_id} not found"
-        )
-    
-    # Validate file extension
-    if not file.filename or not file.filename.endswith('.json'):
+    # Cheap rejections first: extension, then the size the multipart parser recorded
+    if not file.filename or Path(file.filename).suffix.lower() != ".json":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File must be a JSON file (.json extension)"
         )
+    if file.size is not None and file.size > MAX_BULK_FILE_BYTES:
+        raise _bulk_file_too_large()
+    
+    # Verify project exists
+    await ensure_project_exists(session, project_id)
+    
+    # Never buffer more than one byte past the limit, even if size was unknown
+    content = await file.read(MAX_BULK_FILE_BYTES + 1)
+    if len(content) > MAX_BULK_FILE_BYTES:
+        raise _bulk_file_too_large()
     
     try:
-        # Read file content
-        content = await file.read()
-        data = json.loads(content)
-        
-        # Validate against Pydantic model (which validates against schema rules)
-        request = BulkScopesRequest(**data)
+        # Parse straight into the Pydantic model (no intermediate dict tree);
+        # large uploads are parsed off the event loop
+        if len(content) > BULK_FILE_THREAD_THRESHOLD:
+            request = await asyncio.to_thread(BulkScopesRequest.model_validate_json, content)
+        else:
+            request = BulkScopesRequest.model_validate_json(content)
         
-    except json.JSONDecodeError as e:
+    except ValidationError as e:
+        if any(error["type"] == "json_invalid" for error in e.errors()):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid JSON format: {str(e)}"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid JSON format: {str(e)}"
+            detail=f"Validation error: {str(e)}"
         )
     except Exception as e:
         raise HTTPException(
@@ -305,11 +389,10 @@ async def bulk_upsert_scopes_from_file(
             detail=f"Validation error: {str(e)}"
         )
     
-    # Convert Pydantic models to dicts for repository
-    scopes_data = [scope.model_dump() for scope in request.scopes]
-    
     # Perform bulk upsert
-    result = await scope_repository.bulk_upsert(session, project_id, scopes_data)
+    result = await _bulk_upsert_in_chunks(session, project_id, request.scopes)
+    await invalidate_scope_export(project_id)
+    invalidate_project_keys(project_id)
     
     # Build response
     return BulkScopesResponse(
@@ -325,57 +408,68 @@ async def bulk_upsert_scopes_from_file(
 @router.get("/projects/{project_id}/scopes/export/json", response_model=BulkScopesRequest)
 async def export_scopes_json(
     project_id: int,
+    http_request: Request,
     active_only: bool = True,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:read"])),
+    api_key: AuthIdentity = Depends(_READ_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
-    """Export all scopes to JSON format compatible with bulk import"""
-    # Verify project exists
-    project = await project_repository.get_by_id(session, project_id)
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Project {project_id} not found"
-        )
+    """Export all scopes to JSON format compatible with bulk import
     
-    scopes = await scope_repository.list_by_project(
-        session,
-        project_id=project_id,
-        active_only=active_only,
-        skip=0,
-        limit=1000  # High limit to get all scopes
-    )
-    
-    # Convert to bulk format
-    scope_items = []
-    for scope in scopes:
-        # Infer category from scope name
-        parts = scope.scope_name.split(':')
-        category = parts[1] if len(parts) > 1 else 'system'
+    The serialized export is cached in Redis (when configured) and carries
+    an ETag, so clients sending If-None-Match get a 304 for unchanged scopes.
+    """
+    # The generation is read before the scopes, so a concurrent write
+    # keeps this fill from being served once it is invalidated
+    cached, generation = await get_scope_export(project_id, active_only)
+    if cached:
+        etag, body = cached
+    else:
+        # Verify project exists
+        await ensure_project_exists(session, project_id)
         
-        scope_items.append({
-            "scope_name": scope.scope_name,
-            "description": scope.description or "",
-            "category": category,
-            "is_active": scope.is_active
-        })
-    
-    if not scope_items or len(scope_items) == 0:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No scopes found for project {project_id}"
+        scopes = await scope_repository.list_by_project(
+            session,
+            project_id=project_id,
+            active_only=active_only,
+            skip=0,
+            limit=1000  # High limit to get all scopes
         )
+        
+        # Convert to bulk format
+        scope_items = [
+            {
+                "scope_name": s.scope_name,
+                "description": s.description or "",
+                "category": s.category or "system",
+                "is_active": s.is_active,
+            }
+            for s in scopes
+        ]
+        
+        if not scope_items or len(scope_items) == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No scopes found for project {project_id}"
+            )
+        
+        body = BulkScopesRequest(
+            version="1.0.0",
+            scopes=scope_items
+        ).model_dump_json()
+        etag = f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+        await store_scope_export(project_id, active_only, generation, etag, body)
     
-    return BulkScopesRequest(
-        version="1.0.0",
-        scopes=scope_items
-    )
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if http_request.headers.get("If-None-Match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
 
-@router.delete("/projects/{project_id}/scopes", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/projects/{project_id}/scopes", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
 async def delete_all_scopes(
     project_id: int,
     request: BulkDeleteScopesRequest,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:scopes:delete_all"])),
+    api_key: AuthIdentity = Depends(_DELETE_ALL_SCOPES),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -418,15 +512,12 @@ async def delete_all_scopes(
         )
 
     # Check if the project exists
-    project = await project_repository.get_by_id(session, project_id)
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Project {project_id} not found"
-        )
+    await ensure_project_exists(session, project_id)
 
     # Perform deletion
     deleted_count = await scope_repository.delete_all_by_project(session, project_id)
+    await invalidate_scope_export(project_id)
+    invalidate_project_keys(project_id)
 
     if deleted_count == 0:
         raise HTTPException(
@@ -434,4 +525,4 @@ async def delete_all_scopes(
             detail=f"No scopes found for project {project_id}"
         )
 
-    return None
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -5,13 +5,16 @@ Sensitive fields support both global (project_id=NULL) and project-specific conf
 - Project: /projects/{project_id}/sensitive-fields (project_id = X in database)
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.connection import get_async_session as get_db
+from src.database.connection import get_session as get_db
 from src.database.repositories.sensitive_fields_repository import SensitiveFieldRepository
-from src.database.repositories.project_repository import project_repository
 from src.api.auth_middleware import PermissionChecker
+from src.api.cache import ensure_project_exists, not_modified
+from src.api.routing import JiterRoute
+from src.sensitive_field_manager import invalidate_shared_fields
 from src.api.models.sensitive_fields import (
     SensitiveFieldCreate,
     SensitiveFieldUpdate,
@@ -21,7 +24,7 @@ from src.api.models.sensitive_fields import (
 from src.logging_config import get_logger
 
 logger = get_logger(__name__)
-router = APIRouter(tags=["Sensitive Fields"])
+router = APIRouter(tags=["Sensitive Fields"], default_response_class=ORJSONResponse, route_class=JiterRoute)
 
 READ_SCOPE = "akm:sensitive-fields:read"
 CREATE_SCOPE = "akm:sensitive-fields:create"
@@ -29,46 +32,92 @@ UPDATE_SCOPE = "akm:sensitive-fields:update"
 DELETE_SCOPE = "akm:sensitive-fields:delete"
 ANY_SCOPE = "akm:sensitive-fields:*"
 
-
-def scope_checker(required: str):
-    return PermissionChecker([required, ANY_SCOPE])
+# One checker per scope, built at import. PermissionChecker already grants
+# ANY_SCOPE through wildcard matching; listing it as a second required
+# scope would demand both.
+READ_CHECKER = PermissionChecker(frozenset({READ_SCOPE}))
+CREATE_CHECKER = PermissionChecker(frozenset({CREATE_SCOPE}))
+UPDATE_CHECKER = PermissionChecker(frozenset({UPDATE_SCOPE}))
+DELETE_CHECKER = PermissionChecker(frozenset({DELETE_SCOPE}))
+
+
+async def _commit_and_invalidate(db: AsyncSession) -> None:
+    """
+    Commit the change before dropping the shared field cache.
+
+    get_session only commits after the route returns; invalidating first
+    would let a concurrent request reload the old rows and cache them for
+    the full TTL.
+    """
+    await db.commit()
+    invalidate_shared_fields()
+
+
+async def _list_response(
+    repo: SensitiveFieldRepository,
+    project_id: Optional[int],
+    active: Optional[bool],
+    after: Optional[str],
+    limit: Optional[int],
+) -> Response:
+    """
+    Encode a field list straight to JSON, bypassing FastAPI's second
+    response_model validation pass; ``response_model`` stays for the docs.
+
+    One extra row is fetched so the keyset cursor for the next page is only
+    exposed when that page exists. ``total`` counts every matching field,
+    not just this page.
+    """
+    items = await repo.list_fields(
+        project_id=project_id, active=active, after=after,
+        limit=None if limit is None else limit + 1
+    )
+    headers = {}
+    if limit is not None and len(items) > limit:
+        items = items[:limit]
+        headers["X-Next-Cursor"] = items[-1].field_name
+    if limit is None and after is None:
+        total = len(items)
+    else:
+        total = await repo.count_fields(project_id=project_id, active=active)
+    body = SensitiveFieldListResponse(total=total, items=items).model_dump_json()
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # Global sensitive fields (project_id = NULL)
 @router.get("/sensitive-fields", response_model=SensitiveFieldListResponse, summary="List global sensitive fields")
 async def list_sensitive_fields(
     active: Optional[bool] = Query(None, description="Filter by active status"),
+    after: Optional[str] = Query(None, description="Return fields named after this cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of fields to return"),
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(READ_SCOPE)),
+    _: dict = Depends(READ_CHECKER),
 ):
-    repo = SensitiveFieldRepository(db)
-    items = await repo.list_fields(project_id=None, active=active)
-    return SensitiveFieldListResponse(total=len(items), items=items)
+    return await _list_response(SensitiveFieldRepository(db), None, active, after, limit)
 
 
 @router.get("/sensitive-fields/{field_id}", response_model=SensitiveFieldResponse, summary="Get global sensitive field by ID")
 async def get_sensitive_field(
     field_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(READ_SCOPE)),
+    _: dict = Depends(READ_CHECKER),
 ):
     repo = SensitiveFieldRepository(db)
     field = await repo.get_by_id(field_id)
     if not field or field.project_id is not None:
         raise HTTPException(status_code=404, detail="Global sensitive field not found")
-    return field
+    return not_modified(request, response, field.updated_at or field.created_at) or field
 
 
 @router.post("/sensitive-fields", response_model=SensitiveFieldResponse, summary="Create global sensitive field")
 async def create_sensitive_field(
     payload: SensitiveFieldCreate,
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(CREATE_SCOPE)),
+    _: dict = Depends(CREATE_CHECKER),
 ):
     repo = SensitiveFieldRepository(db)
-    existing = await repo.get_by_name(payload.field_name.lower(), project_id=None)
-    if existing:
-        raise HTTPException(status_code=400, detail="Global field already exists")
     field = await repo.create(
         project_id=None,
         field_name=payload.field_name,
@@ -79,6 +128,9 @@ async def create_sensitive_field(
         mask_char=payload.mask_char,
         replacement=payload.replacement,
     )
+    if field is None:
+        raise HTTPException(status_code=400, detail="Global field already exists")
+    await _commit_and_invalidate(db)
     return field
 
 
@@ -87,34 +139,28 @@ async def update_sensitive_field(
     field_id: int,
     payload: SensitiveFieldUpdate,
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(UPDATE_SCOPE)),
+    _: dict = Depends(UPDATE_CHECKER),
 ):
     repo = SensitiveFieldRepository(db)
-    field = await repo.get_by_id(field_id)
-    if not field or field.project_id is not None:
-        raise HTTPException(status_code=404, detail="Global sensitive field not found")
-    
     updated = await repo.update(field_id, **payload.model_dump(exclude_unset=True))
     if not updated:
-        raise HTTPException(status_code=404, detail="Sensitive field not found")
+        raise HTTPException(status_code=404, detail="Global sensitive field not found")
+    await _commit_and_invalidate(db)
     return updated
 
 
-@router.delete("/sensitive-fields/{field_id}", summary="Delete global sensitive field", status_code=204)
+@router.delete("/sensitive-fields/{field_id}", summary="Delete global sensitive field", status_code=204, response_class=Response)
 async def delete_sensitive_field(
     field_id: int,
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(DELETE_SCOPE)),
+    _: dict = Depends(DELETE_CHECKER),
 ):
     repo = SensitiveFieldRepository(db)
-    field = await repo.get_by_id(field_id)
-    if not field or field.project_id is not None:
-        raise HTTPException(status_code=404, detail="Global sensitive field not found")
-    
     deleted = await repo.delete(field_id)
     if not deleted:
-        raise HTTPException(status_code=404, detail="Sensitive field not found")
-    return None
+        raise HTTPException(status_code=404, detail="Global sensitive field not found")
+    await _commit_and_invalidate(db)
+    return Response(status_code=204)
 
 
 # Project-specific sensitive fields
@@ -122,33 +168,31 @@ async def delete_sensitive_field(
 async def list_project_sensitive_fields(
     project_id: int,
     active: Optional[bool] = Query(None, description="Filter by active status"),
+    after: Optional[str] = Query(None, description="Return fields named after this cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of fields to return"),
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(READ_SCOPE)),
+    _: dict = Depends(READ_CHECKER),
 ):
     # Verify project exists
-    from src.database.connection import get_session
-    async with get_session() as session:
-        project = await project_repository.get_by_id(session, project_id)
-        if not project:
-            raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    await ensure_project_exists(db, project_id)
     
-    repo = SensitiveFieldRepository(db)
-    items = await repo.list_fields(project_id=project_id, active=active)
-    return SensitiveFieldListResponse(total=len(items), items=items)
+    return await _list_response(SensitiveFieldRepository(db), project_id, active, after, limit)
 
 
 @router.get("/projects/{project_id}/sensitive-fields/{field_id}", response_model=SensitiveFieldResponse, summary="Get project sensitive field by ID")
 async def get_project_sensitive_field(
     project_id: int,
     field_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(READ_SCOPE)),
+    _: dict = Depends(READ_CHECKER),
 ):
     repo = SensitiveFieldRepository(db)
     field = await repo.get_by_id(field_id)
     if not field or field.project_id != project_id:
         raise HTTPException(status_code=404, detail=f"Sensitive field not found in project {project_id}")
-    return field
+    return not_modified(request, response, field.updated_at or field.created_at) or field
 
 
 @router.post("/projects/{project_id}/sensitive-fields", response_model=SensitiveFieldResponse, summary="Create project sensitive field")
@@ -156,19 +200,12 @@ async def create_project_sensitive_field(
     project_id: int,
     payload: SensitiveFieldCreate,
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(CREATE_SCOPE)),
+    _: dict = Depends(CREATE_CHECKER),
 ):
-    # Verify project exists
-    from src.database.connection import get_session
-    async with get_session() as session:
-        project = await project_repository.get_by_id(session, project_id)
-        if not project:
-            raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
-    
     repo = SensitiveFieldRepository(db)
-    existing = await repo.get_by_name(payload.field_name.lower(), project_id=project_id)
-    if existing:
-        raise HTTPException(status_code=400, detail=f"Field already exists in project {project_id}")
+    
+    # Unknown projects get a 404 (cached) before the insert would trip the foreign key
+    await ensure_project_exists(db, project_id)
     
     field = await repo.create(
         project_id=project_id,
@@ -180,6 +217,9 @@ async def create_project_sensitive_field(
         mask_char=payload.mask_char,
         replacement=payload.replacement,
     )
+    if field is None:
+        raise HTTPException(status_code=400, detail=f"Field already exists in project {project_id}")
+    await _commit_and_invalidate(db)
     return field
 
 
@@ -189,32 +229,26 @@ async def update_project_sensitive_field(
     field_id: int,
     payload: SensitiveFieldUpdate,
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(UPDATE_SCOPE)),
+    _: dict = Depends(UPDATE_CHECKER),
 ):
     repo = SensitiveFieldRepository(db)
-    field = await repo.get_by_id(field_id)
-    if not field or field.project_id != project_id:
-        raise HTTPException(status_code=404, detail=f"Sensitive field not found in project {project_id}")
-    
-    updated = await repo.update(field_id, **payload.model_dump(exclude_unset=True))
+    updated = await repo.update(field_id, project_id=project_id, **payload.model_dump(exclude_unset=True))
     if not updated:
-        raise HTTPException(status_code=404, detail="Sensitive field not found")
+        raise HTTPException(status_code=404, detail=f"Sensitive field not found in project {project_id}")
+    await _commit_and_invalidate(db)
     return updated
 
 
-@router.delete("/projects/{project_id}/sensitive-fields/{field_id}", summary="Delete project sensitive field", status_code=204)
+@router.delete("/projects/{project_id}/sensitive-fields/{field_id}", summary="Delete project sensitive field", status_code=204, response_class=Response)
 async def delete_project_sensitive_field(
     project_id: int,
     field_id: int,
     db: AsyncSession = Depends(get_db),
-    _: dict = Depends(scope_checker(DELETE_SCOPE)),
+    _: dict = Depends(DELETE_CHECKER),
 ):
     repo = SensitiveFieldRepository(db)
-    field = await repo.get_by_id(field_id)
-    if not field or field.project_id != project_id:
-        raise HTTPException(status_code=404, detail=f"Sensitive field not found in project {project_id}")
-    
-    deleted = await repo.delete(field_id)
+    deleted = await repo.delete(field_id, project_id=project_id)
     if not deleted:
-        raise HTTPException(status_code=404, detail="Sensitive field not found")
-    return None
+        raise HTTPException(status_code=404, detail=f"Sensitive field not found in project {project_id}")
+    await _commit_and_invalidate(db)
+    return Response(status_code=204)
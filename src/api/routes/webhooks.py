@@ -9,15 +9,20 @@ Webhooks are now key-scoped following RESTful hierarchy:
 - DELETE /projects/{project_id}/keys/{key_id}/webhooks/{webhook_id}
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import hashlib
+import time
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_session
 from src.database.repositories.webhook_repository import webhook_repository
-from src.database.repositories.api_key_repository import api_key_repository
-from src.database.models import AKMAPIKey
-from src.api.auth_middleware import PermissionChecker
+from src.database.models import AKMWebhook
+from src.api.auth_middleware import AuthIdentity, PermissionChecker, ensure_key_in_project
+from src.api.cache import not_modified
+from src.api.routing import JiterRoute
 from src.api.models import (
     WebhookCreate,
     WebhookUpdate,
@@ -26,26 +31,63 @@ from src.api.models import (
     WebhookDeliveryResponse
 )
 
-router = APIRouter(tags=["Webhooks"])
+router = APIRouter(tags=["Webhooks"], default_response_class=ORJSONResponse, route_class=JiterRoute)
+
+# Permission dependencies shared by the routes below
+_READ_WEBHOOKS = PermissionChecker(frozenset({"akm:webhooks:read"}))
+_WRITE_WEBHOOKS = PermissionChecker(frozenset({"akm:webhooks:write"}))
+_DELETE_WEBHOOKS = PermissionChecker(frozenset({"akm:webhooks:delete"}))
+
+# Event type catalog cached per process as encoded JSON: (monotonic deadline, body, ETag)
+EVENT_TYPES_TTL = 300
+_event_types_adapter = TypeAdapter(List[WebhookEventResponse])
+_event_types_cache: Optional[Tuple[float, bytes, str]] = None
+
+# List routes encode rows through these directly instead of FastAPI's
+# response_model pass; response_model stays on the routes for the docs
+_webhooks_adapter = TypeAdapter(List[WebhookResponse])
+_deliveries_adapter = TypeAdapter(List[WebhookDeliveryResponse])
+
+
+def _json_list(adapter: TypeAdapter, rows) -> Response:
+    """Validate ORM rows and encode them to JSON in one pydantic-core pass"""
+    body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+    return Response(content=body, media_type="application/json")
+
+
+def _webhook_not_found(webhook_id: int, key_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Webhook {webhook_id} not found for key {key_id}"
+    )
+
+
+async def _get_webhook_or_404(
+    session: AsyncSession,
+    project_id: int,
+    key_id: int,
+    webhook_id: int
+) -> AKMWebhook:
+    """Load a webhook with key and project ownership checked in one query"""
+    webhook = await webhook_repository.get_webhook_scoped(session, project_id, key_id, webhook_id)
+    if not webhook:
+        raise _webhook_not_found(webhook_id, key_id)
+    return webhook
 
 
 # Webhook CRUD - Key-scoped
 @router.post("/projects/{project_id}/keys/{key_id}/webhooks", response_model=WebhookResponse, status_code=status.HTTP_201_CREATED)
 async def create_webhook(
+    request: Request,
     project_id: int,
     key_id: int,
     webhook_data: WebhookCreate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """Create a new webhook for an API key"""
     # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
+    await ensure_key_in_project(request, session, project_id, key_id)
     
     webhook = await webhook_repository.create_webhook(
         session,
@@ -65,26 +107,20 @@ async def list_webhooks(
     active_only: bool = True,
     skip: int = 0,
     limit: int = 100,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:read"])),
+    api_key: AuthIdentity = Depends(_READ_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """List webhooks for an API key"""
-    # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
-    
-    webhooks = await webhook_repository.list_webhooks(
+    # Key ownership is part of the query; an unknown key yields an empty list
+    webhooks = await webhook_repository.list_webhooks_scoped(
         session,
+        project_id=project_id,
         api_key_id=key_id,
         active_only=active_only,
         skip=skip,
         limit=limit
     )
-    return webhooks
+    return _json_list(_webhooks_adapter, webhooks)
 
 
 @router.get("/projects/{project_id}/keys/{key_id}/webhooks/{webhook_id}", response_model=WebhookResponse)
@@ -92,27 +128,14 @@ async def get_webhook(
     project_id: int,
     key_id: int,
     webhook_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:read"])),
+    request: Request,
+    response: Response,
+    api_key: AuthIdentity = Depends(_READ_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """Get webhook by ID"""
-    # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
-    
-    webhook = await webhook_repository.get_webhook(session, webhook_id)
-    
-    if not webhook or webhook.api_key_id != key_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Webhook {webhook_id} not found for key {key_id}"
-        )
-    
-    return webhook
+    webhook = await _get_webhook_or_404(session, project_id, key_id, webhook_id)
+    return not_modified(request, response, webhook.updated_at or webhook.created_at) or webhook
 
 
 @router.put("/projects/{project_id}/keys/{key_id}/webhooks/{webhook_id}", response_model=WebhookResponse)
@@ -121,32 +144,23 @@ async def update_webhook(
     key_id: int,
     webhook_id: int,
     webhook_data: WebhookUpdate,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """Update webhook"""
-    # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
-    
-    webhook = await webhook_repository.get_webhook(session, webhook_id)
-    if not webhook or webhook.api_key_id != key_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Webhook {webhook_id} not found for key {key_id}"
-        )
-    
+    # Webhook, key and project ownership checked by the UPDATE itself
     updated = await webhook_repository.update_webhook(
         session,
         webhook_id,
         url=webhook_data.url,
-        secret=webhook_data.secret,
-        is_active=webhook_data.is_active
+        is_active=webhook_data.is_active,
+        timeout_seconds=webhook_data.timeout_seconds,
+        retry_policy=webhook_data.retry_policy,
+        project_id=project_id,
+        api_key_id=key_id
     )
+    if not updated:
+        raise _webhook_not_found(webhook_id, key_id)
     
     return updated
 
@@ -156,24 +170,11 @@ async def delete_webhook(
     project_id: int,
     key_id: int,
     webhook_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:delete"])),
+    api_key: AuthIdentity = Depends(_DELETE_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """Delete webhook"""
-    # Verify key exists and belongs to project
-    key = await api_key_repository.get_by_id(session, key_id)
-    if not key or key.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"API key {key_id} not found in project {project_id}"
-        )
-    
-    webhook = await webhook_repository.get_webhook(session, webhook_id)
-    if not webhook or webhook.api_key_id != key_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Webhook {webhook_id} not found for key {key_id}"
-        )
+    await _get_webhook_or_404(session, project_id, key_id, webhook_id)
     
     success = await webhook_repository.delete_webhook(session, webhook_id)
     
@@ -193,11 +194,13 @@ async def subscribe_to_event(
     key_id: int,
     webhook_id: int,
     event_type: str,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """Subscribe webhook to an event"""
-    subscription = await webhook_repository.subscribe_webhook(
+    await _get_webhook_or_404(session, project_id, key_id, webhook_id)
+    
+    subscription = await webhook_repository.subscribe_to_event(
         session,
         webhook_id,
         event_type
@@ -218,11 +221,13 @@ async def unsubscribe_from_event(
     key_id: int,
     webhook_id: int,
     event_type: str,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """Unsubscribe webhook from an event"""
-    success = await webhook_repository.unsubscribe_webhook(
+    await _get_webhook_or_404(session, project_id, key_id, webhook_id)
+    
+    success = await webhook_repository.unsubscribe_from_event(
         session,
         webhook_id,
         event_type
@@ -231,7 +236,7 @@ async def unsubscribe_from_event(
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Subscription not found"
+            detail="Subscription not found"
         )
     
     return None
@@ -240,12 +245,28 @@ async def unsubscribe_from_event(
 # Webhook Events (global)
 @router.get("/webhooks/events/types", response_model=List[WebhookEventResponse])
 async def list_event_types(
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:read"])),
+    request: Request,
+    api_key: AuthIdentity = Depends(_READ_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """List all available webhook event types"""
-    events = await webhook_repository.list_event_types(session)
-    return events
+    global _event_types_cache
+    
+    # The catalog only changes through migrations; serve the encoded body from memory
+    if _event_types_cache is None or _event_types_cache[0] <= time.monotonic():
+        events = await webhook_repository.list_event_types(session)
+        body = _event_types_adapter.dump_json(
+            _event_types_adapter.validate_python(events, from_attributes=True)
+        )
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        _event_types_cache = (time.monotonic() + EVENT_TYPES_TTL, body, etag)
+    
+    _, body, etag = _event_types_cache
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={EVENT_TYPES_TTL}"}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # Webhook Deliveries
@@ -257,7 +278,7 @@ async def list_deliveries(
     success_only: Optional[bool] = None,
     skip: int = 0,
     limit: int = 100,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:read"])),
+    api_key: AuthIdentity = Depends(_READ_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """List webhook deliveries"""
@@ -268,13 +289,13 @@ async def list_deliveries(
         skip=skip,
         limit=limit
     )
-    return deliveries
+    return _json_list(_deliveries_adapter, deliveries)
 
 
 @router.get("/webhooks/deliveries/{delivery_id}", response_model=WebhookDeliveryResponse)
 async def get_delivery(
     delivery_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:read"])),
+    api_key: AuthIdentity = Depends(_READ_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """Get delivery details"""
@@ -292,7 +313,7 @@ async def get_delivery(
 @router.post("/webhooks/deliveries/{delivery_id}/retry", response_model=WebhookDeliveryResponse)
 async def retry_delivery(
     delivery_id: int,
-    api_key: AKMAPIKey = Depends(PermissionChecker(["akm:webhooks:write"])),
+    api_key: AuthIdentity = Depends(_WRITE_WEBHOOKS),
     session: AsyncSession = Depends(get_session)
 ):
     """Retry failed webhook delivery"""
@@ -304,15 +325,11 @@ async def retry_delivery(
             detail=f"Delivery {delivery_id} not found"
         )
     
-    if delivery.success:
+    if delivery.status == 'success':
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot retry successful delivery"
         )
     
-    # Retry the delivery
-    await webhook_repository.process_retries(session)
-    
-    # Get updated delivery
-    updated = await webhook_repository.get_delivery(session, delivery_id)
-    return updated
+    # Retry only this delivery; the loaded row is updated in place
+    return await webhook_repository.retry_delivery(session, delivery)
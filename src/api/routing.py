@@ -0,0 +1,46 @@
+"""
+Custom route class that parses JSON request bodies with pydantic-core.
+
+FastAPI decodes bodies through ``Request.json()`` (stdlib ``json.loads``)
+before validating them. ``JiterRoute`` swaps in a request whose ``json()``
+uses pydantic-core's jiter parser instead; validation and error handling
+are left to FastAPI as usual.
+"""
+
+import json
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic_core import from_json
+
+
+class JiterRequest(Request):
+    """Request whose JSON body is decoded by jiter"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            try:
+                self._json = from_json(body)
+            except ValueError:
+                # Let json.loads raise the JSONDecodeError FastAPI turns into a 422
+                self._json = json.loads(body)
+        return self._json
+
+
+class JiterRoute(APIRoute):
+    """
+    APIRoute that hands FastAPI a JiterRequest.
+
+    Usage:
+        router = APIRouter(route_class=JiterRoute)
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await original_route_handler(JiterRequest(request.scope, request.receive))
+
+        return route_handler
@@ -16,23 +16,30 @@ from .routes import (
     project_configurations_router,
 )
 
+# Routers served under /v1, in registration order (also mounted unversioned by main)
+V1_ROUTERS = (
+    projects_router,
+    keys_router,
+    scopes_router,
+    webhooks_router,
+    configs_router,
+    alerts_router,
+    openapi_scopes_router,
+    audit_router,
+    sensitive_fields_router,
+    project_configurations_router,
+)
+
 # Create v1 API router
 v1_router = APIRouter(prefix="/v1")
 
 # Include all v1 routes
-v1_router.include_router(projects_router)
-v1_router.include_router(keys_router)
-v1_router.include_router(scopes_router)
-v1_router.include_router(webhooks_router)
-v1_router.include_router(configs_router)
-v1_router.include_router(alerts_router)
-v1_router.include_router(openapi_scopes_router)
-v1_router.include_router(audit_router)
-v1_router.include_router(sensitive_fields_router)
-v1_router.include_router(project_configurations_router)
+for router in V1_ROUTERS:
+    v1_router.include_router(router)
 
 __all__ = [
     "v1_router",
+    "V1_ROUTERS",
     "projects_router",
     "keys_router",
     "scopes_router",
@@ -25,6 +25,12 @@ DEPRECATED_VERSIONS: set[APIVersion] = set()
 # Sunset versions (no longer supported)
 SUNSET_VERSIONS: set[APIVersion] = set()
 
+# Lookup tables built once at import (v1 -> 1, v2 -> 2)
+_VERSION_NUM = {v: int(v.value[1:]) for v in APIVersion}
+_BY_STR = {v.value: v for v in APIVersion}
+_SUPPORTED_STR = [v.value for v in APIVersion]
+_INVALID_MSG_TMPL = "Invalid API version: {}. Supported versions: " + repr(_SUPPORTED_STR)
+
 
 def get_api_version_from_header(
     x_api_version: Optional[str] = Header(None, alias="X-API-Version")
@@ -47,12 +53,11 @@ def get_api_version_from_header(
     if not x_api_version:
         return DEFAULT_VERSION
     
-    try:
-        version = APIVersion(x_api_version.lower())
-    except ValueError:
+    version = _BY_STR.get(x_api_version.lower())
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid API version: {x_api_version}. Supported versions: {[v.value for v in APIVersion]}"
+            detail=_INVALID_MSG_TMPL.format(x_api_version)
         )
     
     if version in SUNSET_VERSIONS:
@@ -96,9 +101,5 @@ def validate_version_compatibility(
     Returns:
         True if compatible, False otherwise
     """
-    # Extract version numbers (v1 -> 1, v2 -> 2)
-    required_num = int(required_version.value[1:])
-    current_num = int(current_version.value[1:])
-    
     # Current version must be >= required version
-    return current_num >= required_num
+    return _VERSION_NUM[current_version] >= _VERSION_NUM[required_version]
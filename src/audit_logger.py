@@ -3,23 +3,36 @@ Enhanced Audit Logging System with Integrity Protection.
 
 This module provides a comprehensive audit logging system with:
 - Correlation IDs for tracking related operations
-- SHA-256 hash for integrity verification
+- SHA-256 hash chain for integrity verification
 - Microsecond precision timestamps
 - Structured logging to console and database
 - Automatic sanitization of sensitive data
 """
 
+import asyncio
+import itertools
+import os
 import uuid
 import hashlib
 import json
+import logging
+import re
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List, Tuple
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
 from fastapi import Request
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import AKMAuditLog
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is an optional dependency
+    ahocorasick = None
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.database.connection import get_async_session
+from src.database.models import AUDIT_CHAIN_GENESIS, AKMAuditLog
 from src.sensitive_field_manager import SensitiveFieldManager
 from src.config import settings
 from src.logging_config import get_logger
@@ -27,6 +40,117 @@ from src.logging_config import get_logger
 # Console logger for audit events
 audit_logger = get_logger("audit")
 
+# Leaf values copied into sanitized output as-is
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# Advisory lock key serializing chain appends across workers (PostgreSQL)
+_CHAIN_LOCK_KEY = 0x414B4D41
+
+# Correlation IDs: random per-process prefix + counter, laid out like a UUID
+_correlation_prefix = uuid.uuid4().hex[:16]
+_correlation_counter = itertools.count()
+
+
+def _reseed_correlation_ids() -> None:
+    """Give forked workers their own prefix so IDs stay unique"""
+    global _correlation_prefix, _correlation_counter
+    _correlation_prefix = uuid.uuid4().hex[:16]
+    _correlation_counter = itertools.count()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_correlation_ids)
+
+# Entries waiting for the background writer (None while it is not running)
+_audit_queue: Optional["asyncio.Queue[Any]"] = None
+_audit_flusher_task: Optional["asyncio.Task[None]"] = None
+
+# Queued by stop_audit_flusher(): the writer flushes its batch and exits
+_STOP_FLUSHER = object()
+
+
+# Last substring matcher built, keyed by the field names it covers
+_substr_search_cache: Optional[Tuple[Tuple[str, ...], Callable[[str], Any]]] = None
+
+
+def _substr_search_for(names: Tuple[str, ...]) -> Callable[[str], Any]:
+    """
+    Return a search function finding any of ``names`` inside a key (None if absent).
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, which
+    stays linear in the key length however many names there are; otherwise
+    one compiled alternation. The last build is reused while names match.
+    """
+    global _substr_search_cache
+    if _substr_search_cache is not None and _substr_search_cache[0] == names:
+        return _substr_search_cache[1]
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for name in names:
+            automaton.add_word(name, name)
+        automaton.make_automaton()
+        
+        def search(key: str) -> Any:
+            return next(automaton.iter(key), None)
+    else:
+        search = re.compile("|".join(map(re.escape, names))).search
+    
+    _substr_search_cache = (names, search)
+    return search
+
+
+@dataclass(frozen=True, slots=True)
+class _ResolvedStrategy:
+    """Sanitization settings for one field, global fallbacks already applied"""
+    strategy: str
+    replacement: str
+    show_start: int
+    show_end: int
+    mask_char: str
+
+
+def _resolve_strategy(field_cfg: Dict[str, Any], global_strategy: Dict[str, Any]) -> _ResolvedStrategy:
+    return _ResolvedStrategy(
+        strategy=field_cfg.get("strategy") or global_strategy.get("strategy", "redact"),
+        replacement=field_cfg.get("replacement") or global_strategy.get("replacement", "[REDACTED]"),
+        show_start=field_cfg.get("mask_show_start") or global_strategy.get("mask_show_start", 3),
+        show_end=field_cfg.get("mask_show_end") or global_strategy.get("mask_show_end", 2),
+        mask_char=field_cfg.get("mask_char") or global_strategy.get("mask_char", "*"),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _SanitizerConfig:
+    """Everything sanitize_data needs, derived from one merged field snapshot"""
+    fields: Dict[str, Dict[str, Any]]
+    global_strategy: Dict[str, Any]
+    resolved: Dict[str, _ResolvedStrategy]
+    default_strategy: _ResolvedStrategy
+    substr_search: Optional[Callable[[str], Any]]
+
+
+def _build_sanitizer_config(
+    fields: Dict[str, Dict[str, Any]],
+    global_strategy: Dict[str, Any]
+) -> _SanitizerConfig:
+    return _SanitizerConfig(
+        fields=fields,
+        global_strategy=global_strategy,
+        resolved={name: _resolve_strategy(cfg, global_strategy) for name, cfg in fields.items()},
+        # Keys matched only by substring fall back to the global strategy
+        default_strategy=_resolve_strategy({}, global_strategy),
+        # One matcher finds any field name inside a key
+        substr_search=_substr_search_for(tuple(fields)) if fields else None,
+    )
+
+
+# Used until a logger loads its fields
+_UNLOADED_CONFIG = _build_sanitizer_config({}, {})
+
+# Last config built; reused while the manager hands out the same shared snapshot
+_sanitizer_config: _SanitizerConfig = _UNLOADED_CONFIG
+
 
 class AuditLogger:
     """Advanced audit logger with integrity protection and database persistence.
@@ -38,75 +162,136 @@ class AuditLogger:
     Merge order (lowest precedence first): file < db < per-call overrides.
     """
 
+    # Created per request; no per-instance __dict__
+    __slots__ = ("db", "correlation_id", "_sf_manager", "_config", "_fields_loaded")
+
     def __init__(self, db: AsyncSession, sensitive_field_manager: Optional[SensitiveFieldManager] = None):
         self.db = db
         self.correlation_id: Optional[str] = None
-        self._sf_manager = sensitive_field_manager or SensitiveFieldManager(db)
-        self._cached_fields: Dict[str, Dict[str, Any]] = {}
-        self._global_strategy: Dict[str, Any] = {}
+        # Created on first load; calls without payloads never need one
+        self._sf_manager = sensitive_field_manager
+        self._config = _UNLOADED_CONFIG
+        self._fields_loaded = False
 
     async def _ensure_sensitive_fields_loaded(self) -> None:
+        # Instances are request-scoped; later log_operation calls reuse the first load
+        if self._fields_loaded:
+            return
+        global _sanitizer_config
+        if self._sf_manager is None:
+            self._sf_manager = SensitiveFieldManager(self.db)
         # Load merged fields + global strategy
-        self._cached_fields = await self._sf_manager.get_fields()
-        self._global_strategy = self._sf_manager.get_global_strategy()
+        fields = await self._sf_manager.get_fields()
+        global_strategy = self._sf_manager.get_global_strategy()
+        config = _sanitizer_config
+        if config.fields is not fields or config.global_strategy != global_strategy:
+            config = _sanitizer_config = _build_sanitizer_config(fields, global_strategy)
+        self._config = config
+        self._fields_loaded = True
     
     @staticmethod
     def generate_correlation_id() -> str:
-        """Generate unique correlation ID for tracking related operations."""
-        return str(uuid.uuid4())
+        """
+        Generate unique correlation ID for tracking related operations.
+        
+        Same 36-character shape as a UUID, without a urandom call per ID.
+        """
+        prefix = _correlation_prefix
+        counter = f"{next(_correlation_counter):016x}"
+        return f"{prefix[:8]}-{prefix[8:12]}-{prefix[12:]}-{counter[:4]}-{counter[4:]}"
     
     def _apply_sanitization(self, key: str, value: Any) -> Any:
-        """Apply sanitization strategy for a sensitive field value."""
-        field_cfg = self._cached_fields.get(key.lower(), {})
-        strategy = field_cfg.get("strategy") or self._global_strategy.get("strategy", "redact")
+        """Apply sanitization strategy for a sensitive field value (key already lowercased)."""
+        config = self._config
+        resolved = config.resolved.get(key, config.default_strategy)
+        strategy = resolved.strategy
         if strategy == "redact":
-            replacement = field_cfg.get("replacement") or self._global_strategy.get("replacement", "[REDACTED]")
-            return replacement
+            return resolved.replacement
         if strategy == "mask" and isinstance(value, str):
-            show_start = field_cfg.get("mask_show_start") or self._global_strategy.get("mask_show_start", 3)
-            show_end = field_cfg.get("mask_show_end") or self._global_strategy.get("mask_show_end", 2)
-            mask_char = field_cfg.get("mask_char") or self._global_strategy.get("mask_char", "*")
+            show_start = resolved.show_start
+            show_end = resolved.show_end
+            mask_char = resolved.mask_char
             if len(value) <= show_start + show_end:
                 return mask_char * len(value)
             middle_len = len(value) - (show_start + show_end)
-            return value[:show_start] + (mask_char * middle_len) + value[-show_end:]
+            # One f-string joins the parts in a single allocation
+            return f"{value[:show_start]}{mask_char * middle_len}{value[-show_end:]}"
         # Fallback
         return "[REDACTED]"
 
-    def sanitize_data(self, data: Any, max_depth: int = 5) -> Any:
+    def sanitize_data(
+        self,
+        data: Any,
+        max_depth: int = 5,
+        seen: Optional[Dict[Tuple[int, int], Any]] = None
+    ) -> Any:
         """
         Recursively sanitize sensitive data from logs.
         
+        Walks the structure with an explicit worklist instead of recursive
+        calls; each container's copy is allocated up front and its slots are
+        filled as the worklist drains.
+        
         Args:
             data: Data to sanitize (dict, list, or primitive)
             max_depth: Maximum recursion depth to prevent infinite loops
+            seen: Copies already made, keyed by (id(container), depth); share
+                one dict across calls to sanitize common subtrees once
         
         Returns:
             Sanitized copy of data with sensitive fields redacted
         """
-        if max_depth <= 0:
-            return "[MAX_DEPTH_REACHED]"
-        
-        if isinstance(data, dict):
-            sanitized: Dict[str, Any] = {}
-            for key, value in data.items():
-                key_lower = str(key).lower()
-                is_sensitive = key_lower in self._cached_fields or any(part in key_lower for part in self._cached_fields.keys())
-                if is_sensitive:
-                    sanitized[key] = self._apply_sanitization(key_lower, value)
-                else:
-                    sanitized[key] = self.sanitize_data(value, max_depth - 1)
-            return sanitized
+        fields = self._config.fields
+        substr_search = self._config.substr_search
+        if seen is None:
+            seen = {}
+        root: List[Any] = [None]
+        stack = [(root, 0, data, max_depth)]
         
-        elif isinstance(data, list):
-            return [self.sanitize_data(item, max_depth - 1) for item in data]
-        
-        elif isinstance(data, (str, int, float, bool, type(None))):
-            return data
+        while stack:
+            parent, slot, value, depth = stack.pop()
+            
+            if depth <= 0:
+                parent[slot] = "[MAX_DEPTH_REACHED]"
+            
+            elif (id(value), depth) in seen:
+                parent[slot] = seen[id(value), depth]
+            
+            elif isinstance(value, dict):
+                sanitized: Dict[str, Any] = {}
+                parent[slot] = seen[id(value), depth] = sanitized
+                for key, item in value.items():
+                    # No configured fields: only copying, depth and str() apply
+                    if fields:
+                        key_lower = str(key).lower()
+                        if key_lower in fields or (
+                            substr_search is not None and substr_search(key_lower) is not None
+                        ):
+                            sanitized[key] = self._apply_sanitization(key_lower, item)
+                            continue
+                    if depth > 1 and isinstance(item, _SCALAR_TYPES):
+                        sanitized[key] = item
+                    else:
+                        sanitized[key] = None  # Placeholder keeps key order
+                        stack.append((sanitized, key, item, depth - 1))
+            
+            elif isinstance(value, list):
+                items: List[Any] = [None] * len(value)
+                parent[slot] = seen[id(value), depth] = items
+                for index, item in enumerate(value):
+                    if depth > 1 and isinstance(item, _SCALAR_TYPES):
+                        items[index] = item
+                    else:
+                        stack.append((items, index, item, depth - 1))
+            
+            elif isinstance(value, _SCALAR_TYPES):
+                parent[slot] = value
+            
+            else:
+                # For other types, convert to string
+                parent[slot] = str(value)
         
-        else:
-            # For other types, convert to string
-            return str(data)
+        return root[0]
     
     @staticmethod
     def extract_client_ip(request: Request) -> Optional[str]:
@@ -115,14 +300,16 @@ class AuditLogger:
         
         Checks X-Forwarded-For, X-Real-IP headers for proxied requests.
         """
+        get_header = request.headers.get
+        
         # Check X-Forwarded-For (proxy/load balancer)
-        forwarded_for = request.headers.get("X-Forwarded-For")
+        forwarded_for = get_header("x-forwarded-for")
         if forwarded_for:
-            # Get first IP (client)
-            return forwarded_for.split(",")[0].strip()
+            # Get first IP (client) without splitting the whole chain
+            return forwarded_for.partition(",")[0].strip()
         
         # Check X-Real-IP (nginx proxy)
-        real_ip = request.headers.get("X-Real-IP")
+        real_ip = get_header("x-real-ip")
         if real_ip:
             return real_ip.strip()
         
@@ -169,7 +356,10 @@ class AuditLogger:
             correlation_id: Optional correlation ID (generated if not provided)
         
         Returns:
-            Created audit log entry
+            Created audit log entry. When the entry is queued for the
+            background writer it is returned unsaved: id, prev_hash and
+            entry_hash are still None. Otherwise it has been committed in
+            its own transaction, independent of the caller's session.
         """
         # Generate or use provided correlation ID
         if correlation_id is None:
@@ -181,16 +371,20 @@ class AuditLogger:
         ip_address = self.extract_client_ip(request) if request else None
         user_agent = request.headers.get("User-Agent") if request else None
         
-        # Sanitize payloads
-        await self._ensure_sensitive_fields_loaded()
-        sanitized_request = self.sanitize_data(request_payload) if request_payload else None
-        sanitized_response = self.sanitize_data(response_payload) if response_payload else None
+        # Sanitize payloads; calls without any (auth checks) skip loading the field config
+        if request_payload or response_payload:
+            await self._ensure_sensitive_fields_loaded()
+            seen: Dict[Tuple[int, int], Any] = {}
+            sanitized_request = self.sanitize_data(request_payload, seen=seen) if request_payload else None
+            sanitized_response = self.sanitize_data(response_payload, seen=seen) if response_payload else None
+        else:
+            sanitized_request = sanitized_response = None
         
         # Create timestamp with microsecond precision
         timestamp = datetime.now(timezone.utc)
         
         # Create audit log entry
-        audit_entry = AKMAuditLog(
+        row: Dict[str, Any] = dict(
             correlation_id=correlation_id,
             api_key_id=api_key_id,
             project_id=project_id,
@@ -210,41 +404,58 @@ class AuditLogger:
             timestamp=timestamp,
             status=status
         )
-        
-        # Calculate integrity hash
-        audit_entry.entry_hash = audit_entry.calculate_hash()
+        audit_entry = AKMAuditLog(**row)
         
         # Log to console (structured JSON)
-        audit_logger.info(
-            f"AUDIT: {operation}",
-            extra={
-                "audit_type": "operation",
-                "correlation_id": correlation_id,
-                "operation": operation,
-                "resource_type": resource_type,
-                "resource_id": resource_id,
-                "action": action,
-                "status": status,
-                "api_key_id": api_key_id,
-                "project_id": project_id,
-                "ip_address": ip_address,
-                "endpoint": endpoint,
-                "http_method": http_method,
-                "response_status": response_status,
-                "timestamp": timestamp.isoformat(),
-                "entry_hash": audit_entry.entry_hash,
-                "metadata": metadata
-            }
-        )
+        if audit_logger.isEnabledFor(logging.INFO):
+            audit_logger.info(
+                f"AUDIT: {operation}",
+                extra={
+                    "audit_type": "operation",
+                    "correlation_id": correlation_id,
+                    "operation": operation,
+                    "resource_type": resource_type,
+                    "resource_id": resource_id,
+                    "action": action,
+                    "status": status,
+                    "api_key_id": api_key_id,
+                    "project_id": project_id,
+                    "ip_address": ip_address,
+                    "endpoint": endpoint,
+                    "http_method": http_method,
+                    "response_status": response_status,
+                    "timestamp": timestamp,  # JSON formatters render datetimes as ISO 8601
+                    "metadata": metadata
+                }
+            )
+        
+        # Hand off to the background writer when it runs; it links and
+        # hashes the entry, which gets no id or hash here. A full queue
+        # falls through to the inline write below.
+        if _audit_queue is not None:
+            try:
+                _audit_queue.put_nowait(row)
+                return audit_entry
+            except asyncio.QueueFull:
+                audit_logger.warning(
+                    "Audit queue full, writing entry inline",
+                    extra={"correlation_id": correlation_id}
+                )
         
-        # Persist to database
+        # Persist in a short transaction of its own: the chain lock must not
+        # be held for the rest of the caller's transaction
         try:
-            self.db.add(audit_entry)
-            await self.db.flush()  # Get ID without committing
+            audit_entry.id = await _insert_audit_row(self.db.bind, row)
+            audit_entry.prev_hash = row["prev_hash"]
+            audit_entry.entry_hash = row["entry_hash"]
             
             audit_logger.debug(
                 f"Audit log persisted: {audit_entry.id}",
-                extra={"correlation_id": correlation_id, "audit_id": audit_entry.id}
+                extra={
+                    "correlation_id": correlation_id,
+                    "audit_id": audit_entry.id,
+                    "entry_hash": audit_entry.entry_hash
+                }
             )
         
         except Exception as e:
@@ -377,3 +588,148 @@ async def log_audit(
         action=action,
         **kwargs
     )
+
+
+# Hash chain
+
+async def _link_chain(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Append rows to the hash chain, setting their prev_hash and entry_hash.
+    
+    The tail hash is read in the caller's transaction. On PostgreSQL an
+    advisory lock held until that transaction ends keeps concurrent
+    workers from linking onto the same tail and forking the chain.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(_CHAIN_LOCK_KEY)))
+    
+    prev_hash = await db.scalar(
+        select(AKMAuditLog.entry_hash).order_by(AKMAuditLog.id.desc()).limit(1)
+    )
+    prev_hash = prev_hash or AUDIT_CHAIN_GENESIS
+    for row in rows:
+        row["prev_hash"] = prev_hash
+        row["entry_hash"] = prev_hash = AKMAuditLog.hash_row(row)
+
+
+# Background audit writer
+
+async def _insert_audit_rows(rows: List[Dict[str, Any]]) -> None:
+    """Link rows onto the chain and insert them with one executemany INSERT."""
+    async with get_async_session() as db:
+        await _link_chain(db, rows)
+        await db.execute(insert(AKMAuditLog), rows)
+
+
+async def _insert_audit_row(bind: AsyncEngine, row: Dict[str, Any]) -> int:
+    """
+    Link one row onto the chain and insert it in its own transaction.
+    
+    Used by the inline path. The advisory lock taken by _link_chain is
+    released when this transaction commits, right after the insert,
+    instead of at the end of the request's transaction.
+    """
+    async with AsyncSession(bind, expire_on_commit=False) as db:
+        async with db.begin():
+            await _link_chain(db, [row])
+            return await db.scalar(insert(AKMAuditLog).returning(AKMAuditLog.id), row)
+
+
+async def _write_audit_batch(batch: List[Dict[str, Any]]) -> None:
+    """
+    Persist a batch of queued entries.
+    
+    If the batch INSERT fails (a key or project deleted before the flush,
+    an unserializable payload), the rows are retried one by one so only
+    the offending entries are lost.
+    """
+    try:
+        await _insert_audit_rows(batch)
+        return
+    except Exception as e:
+        if len(batch) == 1:
+            audit_logger.error(
+                f"Failed to persist audit log: {e}",
+                extra={"correlation_id": batch[0]["correlation_id"], "error": str(e)},
+                exc_info=True
+            )
+            return
+        audit_logger.warning(
+            f"Failed to persist {len(batch)} audit logs, retrying one by one: {e}",
+            extra={"correlation_ids": [row["correlation_id"] for row in batch]}
+        )
+    
+    for row in batch:
+        try:
+            await _insert_audit_rows([row])
+        except Exception as e:
+            audit_logger.error(
+                f"Failed to persist audit log: {e}",
+                extra={"correlation_id": row["correlation_id"], "error": str(e)},
+                exc_info=True
+            )
+
+
+async def _audit_flusher(queue: "asyncio.Queue[Any]") -> None:
+    """
+    Write queued entries in batches of up to audit_batch_size.
+    
+    Returns after writing its current batch once _STOP_FLUSHER is dequeued.
+    The batch is also written if the task is cancelled while collecting it.
+    """
+    loop = asyncio.get_running_loop()
+    interval = settings.audit_flush_interval_ms / 1000
+    batch_size = settings.audit_batch_size
+    stopping = False
+    while not stopping:
+        item = await queue.get()
+        if item is _STOP_FLUSHER:
+            return
+        batch = [item]
+        try:
+            deadline = loop.time() + interval
+            while len(batch) < batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP_FLUSHER:
+                    stopping = True
+                    break
+                batch.append(item)
+        finally:
+            await _write_audit_batch(batch)
+
+
+def start_audit_flusher() -> None:
+    """
+    Start batching audit writes in the background.
+    
+    Skipped on Vercel, where a frozen instance would strand queued
+    entries, and when audit_batch_size is 1 or less.
+    """
+    global _audit_queue, _audit_flusher_task
+    if settings.is_vercel or settings.audit_batch_size <= 1 or _audit_flusher_task is not None:
+        return
+    _audit_queue = asyncio.Queue(maxsize=settings.audit_queue_max_size)
+    _audit_flusher_task = asyncio.create_task(_audit_flusher(_audit_queue))
+
+
+async def stop_audit_flusher() -> None:
+    """
+    Stop the background writer once everything queued so far is written.
+    
+    Entries logged after this point are written inline.
+    """
+    global _audit_queue, _audit_flusher_task
+    if _audit_flusher_task is None:
+        return
+    queue, task = _audit_queue, _audit_flusher_task
+    _audit_queue = _audit_flusher_task = None
+    
+    if not task.done():
+        await queue.put(_STOP_FLUSHER)
+    await task
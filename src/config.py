@@ -3,7 +3,7 @@ Configuration module for API Key Management Service.
 Loads and validates environment variables from .env files.
 """
 
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -22,9 +22,13 @@ class Settings(BaseSettings):
 
     # Database configuration
     database_url: Optional[str] = None
-    db_pool_size: int = 10
-    db_max_overflow: int = 20
-    db_pool_timeout: int = 30
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout: int = 10  # Seconds to wait for a pooled connection before failing fast
+    db_pool_recycle: int = 1800
+    db_pool_warmup: int = 0  # Connections opened at startup (0 = lazy)
+    db_query_cache_size: int = 1200  # Compiled statements kept per engine
+    db_statement_cache_size: int = 500  # asyncpg prepared statements kept per connection (0 disables; forced to 0 behind -pooler URLs)
 
     # Security
     secret_key: str = "insecure-default-key-change-this"
@@ -38,6 +42,9 @@ class Settings(BaseSettings):
     betterstack_source_token: Optional[str] = None
     betterstack_ingesting_host: str = "in.logtail.com"
 
+    # Redis (optional; enables cached project existence checks)
+    redis_url: Optional[str] = None
+
     # Monitoring & Health
     health_check_enabled: bool = True
     db_health_check_timeout: int = 5
@@ -49,31 +56,36 @@ class Settings(BaseSettings):
     sanitization_mask_show_end: int = 2
     sanitization_mask_char: str = "*"
 
+    # Audit log persistence (batched by a background writer; not used on Vercel)
+    audit_batch_size: int = 100  # Entries per INSERT (1 = write each entry inline)
+    audit_flush_interval_ms: int = 200  # Max wait before a partial batch is written
+    audit_queue_max_size: int = 10_000  # Entries beyond this are written inline
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="ignore"
     )
 
-    @property
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production environment."""
         return self.environment.lower() == "production"
 
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development environment."""
         return self.environment.lower() == "development"
 
-    @property
+    @cached_property
     def is_vercel(self) -> bool:
         """Check if running on Vercel platform."""
         return self.vercel is not None
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> list[str]:
         """Get CORS origins as a list."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
-    @property
+    @cached_property
     def betterstack_enabled(self) -> bool:
         """Check if BetterStack logging is enabled."""
         return (
@@ -5,9 +5,13 @@ Provides async and sync database engines and sessions with connection pooling.
 """
 
 from typing import AsyncGenerator, Generator, Optional
+import asyncio
+from uuid import uuid4
 from contextlib import asynccontextmanager, contextmanager
 
 from sqlalchemy import create_engine, Engine, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
@@ -15,7 +19,7 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
 )
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from src.config import get_settings
 from src.logging_config import get_logger
@@ -88,12 +92,12 @@ def get_engine(force_new: bool = False) -> Engine:
         db_url = get_database_url(async_mode=False)
 
         # Connection pool settings
-        pool_size = settings.db_pool_size if hasattr(settings, "db_pool_size") else 10
+        pool_size = settings.db_pool_size if hasattr(settings, "db_pool_size") else 20
         max_overflow = (
-            settings.db_max_overflow if hasattr(settings, "db_max_overflow") else 20
+            settings.db_max_overflow if hasattr(settings, "db_max_overflow") else 40
         )
         pool_timeout = (
-            settings.db_pool_timeout if hasattr(settings, "db_pool_timeout") else 30
+            settings.db_pool_timeout if hasattr(settings, "db_pool_timeout") else 10
         )
 
         _sync_engine = create_engine(
@@ -102,7 +106,9 @@ def get_engine(force_new: bool = False) -> Engine:
             pool_size=pool_size,
             max_overflow=max_overflow,
             pool_timeout=pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
             pool_pre_ping=True,  # Verify connections before using
+            query_cache_size=settings.db_query_cache_size,
             echo=False,  # Set to True for SQL debugging
         )
 
@@ -111,6 +117,11 @@ def get_engine(force_new: bool = False) -> Engine:
     return _sync_engine
 
 
+def _unique_statement_name() -> str:
+    """Name asyncpg prepared statements uniquely so they never collide behind PgBouncer"""
+    return f"__asyncpg_{uuid4()}__"
+
+
 def get_async_engine(force_new: bool = False) -> AsyncEngine:
     """
     Get or create asynchronous SQLAlchemy engine.
@@ -132,17 +143,43 @@ def get_async_engine(force_new: bool = False) -> AsyncEngine:
             # asyncpg SSL configuration
             connect_args["ssl"] = "require"
 
-        # Use NullPool for async to avoid pool issues
-        #         #         from sqlalchemy.pool import NullPool
+        if "-pooler." in db_url:
+            # Transaction-mode PgBouncer may run each transaction on a different
+            # server connection, where a statement prepared earlier does not
+            # exist: cache nothing, and give the per-query statements unique
+            # names so they cannot collide on a shared server connection
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = _unique_statement_name
+        else:
+            # Hot queries are parsed and planned once per connection, then reused
+            connect_args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+
+        if settings.is_vercel:
+            # Serverless instances freeze between invocations, so pooled
+            # connections would go stale; connect per session instead
+            pool_args = {"poolclass": NullPool}
+        else:
+            pool_args = {
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_size": settings.db_pool_size,
+                "max_overflow": settings.db_max_overflow,
+                "pool_timeout": settings.db_pool_timeout,
+                "pool_recycle": settings.db_pool_recycle,
+                "pool_pre_ping": True,
+            }
 
         _async_engine = create_async_engine(
             db_url,
-            poolclass=NullPool,  # NullPool for async
             connect_args=connect_args,
+            query_cache_size=settings.db_query_cache_size,
             echo=False,  # Set to True for SQL debugging
+            **pool_args,
         )
 
-        logger.info("Asynchronous database engine created with NullPool")
+        logger.info(
+            f"Asynchronous database engine created with {pool_args['poolclass'].__name__}"
+        )
 
     return _async_engine
 
@@ -256,6 +293,50 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
+def dialect_insert(session: AsyncSession):
+    """
+    Return the dialect-specific insert() for the session's bind.
+
+    Both variants support on_conflict_do_* clauses, so repositories can
+    express upserts once for PostgreSQL and the SQLite test database.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return pg_insert
+
+
+async def warm_up_pool(connections: int) -> None:
+    """
+    Open and release pooled connections so the first requests find them ready.
+
+    Connection failures are logged rather than raised; the pool still fills
+    lazily.
+
+    Args:
+        connections: Connections to open, capped at the configured pool size
+    """
+    count = min(connections, settings.db_pool_size)
+    if count <= 0:
+        return
+
+    engine = get_async_engine()
+    if isinstance(engine.pool, NullPool):
+        return
+
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(count)), return_exceptions=True
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+
+    if len(opened) < count:
+        error = next(r for r in results if isinstance(r, BaseException))
+        logger.warning(f"Database pool warm-up opened {len(opened)}/{count} connections: {error}")
+    else:
+        logger.info(f"Database pool warmed up with {count} connections")
+
+
 async def close_database_connections():
     """
     Close all database connections and dispose of engines.
@@ -6,7 +6,8 @@ rate limiting, webhooks, and alerting capabilities.
 """
 
 from datetime import datetime, time
-from typing import Optional
+from functools import cached_property, partial
+from typing import Any, Callable, FrozenSet, Mapping, Optional
 import hashlib
 import json
 
@@ -22,6 +23,8 @@ from sqlalchemy import (
     Date,
     Time,
     JSON,
+    LargeBinary,
+    TypeDecorator,
     UniqueConstraint,
 )
 from sqlalchemy.ext.declarative import declarative_base
@@ -31,6 +34,23 @@ from sqlalchemy.sql import func
 Base = declarative_base()
 
 
+class HexDigest(TypeDecorator):
+    """
+    SHA-256 digest stored as 32 raw bytes, exposed as its 64-char hex string.
+
+    Halves the column and its indexes compared with String(64) while
+    callers, API models and the audit hash chain keep working in hex.
+    """
+    impl = LargeBinary(32)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        return None if value is None else bytes.fromhex(value)
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Optional[str]:
+        return None if value is None else bytes(value).hex()
+
+
 class AKMProject(Base):
     """
     Model for projects in multi-tenant API key management.
@@ -50,14 +70,26 @@ class AKMProject(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
     
-    # Relationships
+    # Relationships (collections load only when a query asks via selectinload)
     api_keys = relationship("AKMAPIKey", back_populates="project", cascade="all, delete-orphan")
     scopes = relationship("AKMScope", back_populates="project", cascade="all, delete-orphan")
+    sensitive_fields = relationship("AKMSensitiveField", back_populates="project")
+    configuration = relationship("AKMProjectConfiguration", back_populates="project", uselist=False)
     
     def __repr__(self) -> str:
         return f"<AKMProject(id={self.id}, name='{self.name}', prefix='{self.prefix}')>"
 
 
+def scope_category(scope_name: str) -> str:
+    """Category segment of a scope name (``akm:projects:read`` -> ``projects``)."""
+    parts = scope_name.split(":")
+    return (parts[1] if len(parts) > 1 else "") or "system"
+
+
+def _scope_category_default(context) -> str:
+    return scope_category(context.get_current_parameters()["scope_name"])
+
+
 class AKMScope(Base):
     """
     Model for permission scopes with project isolation.
@@ -72,16 +104,26 @@ class AKMScope(Base):
     scope_name = Column(String(100), nullable=False)  # Not globally unique anymore
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Derived from scope_name on insert so exports don't re-split every row
+    category = Column(String(100), nullable=False, default=_scope_category_default, server_default="system")
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
     
     # Relationships
     project = relationship("AKMProject", back_populates="scopes")
     
     # Constraints - scope_name is unique per project, not globally
     __table_args__ = (
-        UniqueConstraint("project_id", "scope_name", name="uq_project_scope"),
+        # Covering unique index: name lookups and ON CONFLICT (project_id,
+        # scope_name) are answered from the index. description is unbounded
+        # Text and stays out of it (B-tree tuples max out around 2.7 KB)
+        Index(
+            "uq_project_scope", "project_id", "scope_name",
+            unique=True,
+            postgresql_include=["id", "is_active"],
+        ),
         Index("idx_scopes_project_active", "project_id", "is_active"),
     )
     
@@ -101,7 +143,7 @@ class AKMAPIKey(Base):
     project_id = Column(Integer, ForeignKey("akm_projects.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # API Key (hashed with SHA-256)
-    key_hash = Column(String(64), unique=True, nullable=False, index=True)
+    key_hash = Column(HexDigest, unique=True, nullable=False, index=True)
     
     # Key metadata
     name = Column(String(100), nullable=False)
@@ -126,13 +168,20 @@ class AKMAPIKey(Base):
     
     # Indexes
     __table_args__ = (
-        Index("idx_akm_key_hash_active", key_hash, is_active),
+        # Equality-only probe for authentication; the unique B-tree stays
+        # because hash indexes cannot enforce uniqueness
+        Index("idx_akm_key_hash_hash", key_hash, postgresql_using="hash"),
         Index("idx_akm_key_project", project_id, is_active),
     )
     
     def __repr__(self) -> str:
         return f"<AKMAPIKey(id={self.id}, name='{self.name}', project_id={self.project_id})>"
     
+    @cached_property
+    def _scope_set(self) -> FrozenSet[str]:
+        """Scope names granted to this key, built once per loaded instance."""
+        return frozenset(key_scope.scope_name for key_scope in self.scopes)
+    
     def is_expired(self) -> bool:
         """Check if the API key is expired."""
         if self.expires_at is None:
@@ -154,18 +203,22 @@ class AKMAPIKeyScope(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     api_key_id = Column(Integer, ForeignKey("akm_api_keys.id", ondelete="CASCADE"), nullable=False)
     scope_id = Column(Integer, ForeignKey("akm_scopes.id", ondelete="CASCADE"), nullable=False)
+    # Copy of akm_scopes.scope_name so authentication needs no join; a
+    # trigger on akm_scopes keeps it in step when a scope is renamed
+    scope_name = Column(String(100), nullable=False)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     api_key = relationship("AKMAPIKey", back_populates="scopes")
-    scope = relationship("AKMScope")
+    # Every reader wants scope.scope_name; load it with the key scopes in one IN query
+    scope = relationship("AKMScope", lazy="selectin")
     
     # Constraints
     __table_args__ = (
         UniqueConstraint("api_key_id", "scope_id", name="uq_api_key_scope"),
-        Index("idx_akm_key_scope", api_key_id, scope_id),
+        Index("idx_akm_key_scope", api_key_id, scope_id, postgresql_include=["scope_name"]),
     )
     
     def __repr__(self) -> str:
@@ -228,8 +281,9 @@ class AKMRateLimitBucket(Base):
     
     # Constraints
     __table_args__ = (
+        # Per-key lookups use the unique index; the expiry sweep filters on window_end alone
         UniqueConstraint("api_key_id", "window_start", name="uq_rate_bucket"),
-        Index("idx_akm_rate_bucket_window", api_key_id, window_start, window_end),
+        Index("idx_akm_rate_bucket_window_end", window_end),
     )
     
     def __repr__(self) -> str:
@@ -259,8 +313,8 @@ class AKMUsageMetric(Base):
     
     # Constraints
     __table_args__ = (
+        # Also serves per-key date-range scans (api_key_id, date prefix)
         UniqueConstraint("api_key_id", "date", "hour", name="uq_usage_metric"),
-        Index("idx_akm_usage_key_date", api_key_id, date),
     )
     
     def __repr__(self) -> str:
@@ -437,6 +491,13 @@ class AKMAlertHistory(Base):
         return f"<AKMAlertHistory(id={self.id}, alert_rule_id={self.alert_rule_id})>"
 
 
+# prev_hash of the first chained audit entry when the log is empty
+AUDIT_CHAIN_GENESIS = "0" * 64
+
+# Same output as json.dumps(..., sort_keys=True, default=str), built once
+_AUDIT_HASH_ENCODER = json.JSONEncoder(sort_keys=True, default=str)
+
+
 class AKMAuditLog(Base):
     """
     Model for audit logging of all sensitive operations with integrity protection.
@@ -454,7 +515,8 @@ class AKMAuditLog(Base):
     
     # Correlation and integrity
     correlation_id = Column(String(36), nullable=False, unique=True, index=True)  # UUID
-    entry_hash = Column(String(64), nullable=False, index=True)  # SHA-256 hash for integrity
+    entry_hash = Column(HexDigest, nullable=False, index=True)  # SHA-256 hash for integrity
+    prev_hash = Column(HexDigest, nullable=True)  # entry_hash of the preceding row; NULL on pre-chain rows
     
     # Authentication context
     api_key_id = Column(Integer, ForeignKey("akm_api_keys.id"), nullable=True, index=True)  # Nullable for unauthenticated attempts
@@ -495,8 +557,21 @@ class AKMAuditLog(Base):
     # Indexes for efficient querying
     __table_args__ = (
         Index("idx_audit_timestamp", timestamp.desc()),  # Most common: recent first
-        Index("idx_audit_project_time", project_id, timestamp.desc()),
-        Index("idx_audit_key_time", api_key_id, timestamp.desc()),
+        # Covering: summary lists filtered by project or key run as index-only scans
+        Index(
+            "idx_audit_project_time", project_id, timestamp.desc(),
+            postgresql_include=[
+                "id", "correlation_id", "operation", "resource_type", "resource_id",
+                "status", "ip_address", "api_key_id", "response_status",
+            ],
+        ),
+        Index(
+            "idx_audit_key_time", api_key_id, timestamp.desc(),
+            postgresql_include=[
+                "id", "correlation_id", "operation", "resource_type", "resource_id",
+                "status", "ip_address", "project_id", "response_status",
+            ],
+        ),
         Index("idx_audit_operation", operation, timestamp.desc()),
         Index("idx_audit_resource", resource_type, resource_id, timestamp.desc()),
         Index("idx_audit_status", status, timestamp.desc()),
@@ -507,35 +582,55 @@ class AKMAuditLog(Base):
     def __repr__(self) -> str:
         return f"<AKMAuditLog(id={self.id}, correlation_id='{self.correlation_id}', operation='{self.operation}', status='{self.status}')>"
     
-    def calculate_hash(self) -> str:
-        """
-        Calculate SHA-256 hash of audit entry for integrity verification.
-        
-        Hash includes all immutable fields to detect tampering.
-        """
+    @staticmethod
+    def _hash_from(get: Callable[[str], Any]) -> str:
+        """SHA-256 over the immutable fields, read through ``get(column_name)``"""
+        timestamp = get("timestamp")
         hash_data = {
-            "correlation_id": self.correlation_id,
-            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
-            "operation": self.operation,
-            "action": self.action,
-            "resource_type": self.resource_type,
-            "resource_id": self.resource_id,
-            "endpoint": self.endpoint,
-            "http_method": self.http_method,
-            "api_key_id": self.api_key_id,
-            "project_id": self.project_id,
-            "ip_address": self.ip_address,
-            "request_payload": self.request_payload,
-            "response_status": self.response_status,
-            "status": self.status,
+            "correlation_id": get("correlation_id"),
+            "timestamp": timestamp.isoformat() if timestamp else None,
+            "operation": get("operation"),
+            "action": get("action"),
+            "resource_type": get("resource_type"),
+            "resource_id": get("resource_id"),
+            "endpoint": get("endpoint"),
+            "http_method": get("http_method"),
+            "api_key_id": get("api_key_id"),
+            "project_id": get("project_id"),
+            "ip_address": get("ip_address"),
+            "request_payload": get("request_payload"),
+            "response_status": get("response_status"),
+            "status": get("status"),
         }
         
         # Create deterministic JSON string
-        hash_string = json.dumps(hash_data, sort_keys=True, default=str)
+        hash_string = _AUDIT_HASH_ENCODER.encode(hash_data)
+        prev_hash = get("prev_hash")
+        if prev_hash is not None:
+            hash_string += prev_hash
         
         # Calculate SHA-256 hash
         return hashlib.sha256(hash_string.encode('utf-8')).hexdigest()
     
+    def calculate_hash(self) -> str:
+        """
+        Calculate SHA-256 hash of audit entry for integrity verification.
+        
+        Hash includes all immutable fields to detect tampering. Chained
+        entries also append ``prev_hash``, so deleting or reordering rows
+        breaks the link to the next entry.
+        """
+        return self._hash_from(partial(getattr, self))
+    
+    @classmethod
+    def hash_row(cls, row: Mapping[str, Any]) -> str:
+        """
+        Hash a column-name -> value mapping exactly as calculate_hash would.
+        
+        Lets batch writers hash plain row dicts without building ORM instances.
+        """
+        return cls._hash_from(row.get)
+    
     def verify_integrity(self) -> bool:
         """
         Verify the integrity of this audit log entry.
@@ -583,14 +678,20 @@ class AKMSensitiveField(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
 
     # Relationships
-    project = relationship("AKMProject", backref="sensitive_fields")
+    project = relationship("AKMProject", back_populates="sensitive_fields")
 
     __table_args__ = (
         # Global fields: field_name must be unique when project_id IS NULL
         # Project fields: field_name must be unique per project
         UniqueConstraint("project_id", "field_name", name="uq_project_sensitive_field"),
+        # NULLs are distinct in the constraint above, so globals need their own index
+        Index(
+            "uq_global_sensitive_field", "field_name",
+            unique=True,
+            postgresql_where=project_id.is_(None),
+            sqlite_where=project_id.is_(None),
+        ),
         Index("idx_sensitive_field_active", "is_active"),
-        Index("idx_sensitive_field_project", "project_id", "field_name"),
     )
 
     def __repr__(self) -> str:  # pragma: no cover
@@ -637,7 +738,7 @@ class AKMProjectConfiguration(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
     
     # Relationships
-    project = relationship("AKMProject", backref="configuration", uselist=False)
+    project = relationship("AKMProject", back_populates="configuration")
     
     def __repr__(self) -> str:
         return f"<AKMProjectConfiguration(project_id={self.project_id})>"
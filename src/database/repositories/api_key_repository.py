@@ -10,7 +10,7 @@ from typing import Optional, List
 import hashlib
 import secrets
 
-from sqlalchemy import select, and_
+from sqlalchemy import Row, select, and_, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, Session
 
@@ -19,6 +19,7 @@ from src.database.models import (
     AKMAPIKeyScope,
     AKMAPIKeyConfig,
     AKMProject,
+    AKMProjectConfiguration,
     AKMScope
 )
 
@@ -77,7 +78,8 @@ class APIKeyRepository:
                 AKMAPIKey.is_active.is_(True)
             )
         ).options(
-            selectinload(AKMAPIKey.scopes).selectinload(AKMAPIKeyScope.scope),
+            # Scope names are stored on the assignment rows; skip the scopes table
+            selectinload(AKMAPIKey.scopes).lazyload(AKMAPIKeyScope.scope),
             selectinload(AKMAPIKey.config),
             selectinload(AKMAPIKey.project)
         )
@@ -102,6 +104,56 @@ class APIKeyRepository:
 
         return api_key_record
     
+    async def record_use(
+        self,
+        session: AsyncSession,
+        key_id: int
+    ) -> Optional[Row]:
+        """
+        Bump last_used_at and request_count of an already validated key in one UPDATE.
+        
+        The same statement returns what authorization depends on, so a
+        cached identity can be checked without another round-trip.
+        
+        Returns:
+            Row with expires_at, scope_names (space separated),
+            config_version and defaults_version; None when the key no
+            longer exists or has been revoked
+        """
+        # Filter on key_id rather than correlating: SQLite renders RETURNING
+        # columns unqualified, so "api_key_id = id" would match the scope row's id
+        scope_names = select(
+            func.aggregate_strings(AKMAPIKeyScope.scope_name, " ")
+        ).where(AKMAPIKeyScope.api_key_id == key_id).scalar_subquery()
+        config_version = select(
+            func.coalesce(AKMAPIKeyConfig.updated_at, AKMAPIKeyConfig.created_at)
+        ).where(AKMAPIKeyConfig.api_key_id == key_id).scalar_subquery()
+        defaults_version = select(
+            func.coalesce(AKMProjectConfiguration.updated_at, AKMProjectConfiguration.created_at)
+        ).where(
+            AKMProjectConfiguration.project_id == select(AKMAPIKey.project_id).where(
+                AKMAPIKey.id == key_id
+            ).scalar_subquery()
+        ).scalar_subquery()
+        
+        result = await session.execute(
+            update(AKMAPIKey).where(
+                AKMAPIKey.id == key_id,
+                AKMAPIKey.is_active.is_(True)
+            ).values(
+                last_used_at=datetime.utcnow(),
+                request_count=AKMAPIKey.request_count + 1
+            ).returning(
+                AKMAPIKey.expires_at,
+                scope_names.label("scope_names"),
+                config_version.label("config_version"),
+                defaults_version.label("defaults_version"),
+            )
+        )
+        state = result.one_or_none()
+        await session.commit()
+        return state
+    
     def get_key_by_value_sync(
         self,
         session: Session,
@@ -198,7 +250,8 @@ class APIKeyRepository:
             
             key_scope = AKMAPIKeyScope(
                 api_key_id=api_key.id,
-                scope_id=scope.id
+                scope_id=scope.id,
+                scope_name=scope.scope_name
             )
             session.add(key_scope)
 
@@ -315,7 +368,7 @@ class APIKeyRepository:
             return False
         
         # Get existing scopes (through relationship)
-        existing_scopes = {scope.scope.scope_name for scope in api_key.scopes}
+        existing_scopes = {scope.scope_name for scope in api_key.scopes}
         
         # Add new scopes
         for scope_name in scope_names:
@@ -330,7 +383,8 @@ class APIKeyRepository:
                 
                 key_scope = AKMAPIKeyScope(
                     api_key_id=key_id,
-                    scope_id=scope.id
+                    scope_id=scope.id,
+                    scope_name=scope.scope_name
                 )
                 session.add(key_scope)
         
@@ -409,7 +463,8 @@ class APIKeyRepository:
             if not existing_assignment:
                 key_scope = AKMAPIKeyScope(
                     api_key_id=key_id,
-                    scope_id=scope_obj.id
+                    scope_id=scope_obj.id,
+                    scope_name=scope_obj.scope_name
                 )
                 session.add(key_scope)
         
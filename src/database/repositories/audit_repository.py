@@ -4,13 +4,30 @@ Audit Log Repository for querying audit trail.
 Provides read-only access to audit logs with advanced filtering and integrity verification.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Union
 from datetime import datetime
 
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import Row, select, func, and_, or_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import AKMAuditLog, AKMAPIKey, AKMProject
+from src.database.models import AUDIT_CHAIN_GENESIS, AKMAuditLog, AKMAPIKey, AKMProject
+
+
+# Columns behind AuditLogSummary; the (project_id|api_key_id, timestamp)
+# indexes INCLUDE them so summary lists can be index-only scans
+SUMMARY_COLUMNS = (
+    AKMAuditLog.id,
+    AKMAuditLog.correlation_id,
+    AKMAuditLog.operation,
+    AKMAuditLog.resource_type,
+    AKMAuditLog.resource_id,
+    AKMAuditLog.status,
+    AKMAuditLog.timestamp,
+    AKMAuditLog.ip_address,
+    AKMAuditLog.api_key_id,
+    AKMAuditLog.project_id,
+    AKMAuditLog.response_status,
+)
 
 
 class AuditLogRepository:
@@ -75,8 +92,9 @@ class AuditLogRepository:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> List[AKMAuditLog]:
+        offset: int = 0,
+        summary_only: bool = False
+    ) -> Union[List[AKMAuditLog], Sequence[Row]]:
         """
         List audit logs with advanced filtering.
         
@@ -92,12 +110,13 @@ class AuditLogRepository:
             end_date: Filter logs before this timestamp
             limit: Maximum number of results (max 1000)
             offset: Number of results to skip
+            summary_only: Select only SUMMARY_COLUMNS (rows instead of entities)
         
         Returns:
             List of audit log entries ordered by timestamp (newest first)
         """
         # Build query with filters
-        query = select(AKMAuditLog)
+        query = select(*SUMMARY_COLUMNS) if summary_only else select(AKMAuditLog)
         
         # Apply filters
         filters = []
@@ -138,6 +157,8 @@ class AuditLogRepository:
         query = query.limit(min(limit, 1000)).offset(offset)
         
         result = await self.db.execute(query)
+        if summary_only:
+            return result.all()
         return list(result.scalars().all())
     
     async def count_logs(
@@ -325,14 +346,15 @@ class AuditLogRepository:
                 "error": "Audit log not found"
             }
         
-        is_valid = audit_log.verify_integrity()
+        calculated_hash = audit_log.calculate_hash()
+        is_valid = audit_log.entry_hash == calculated_hash
         
         return {
             "verified": is_valid,
             "audit_id": audit_id,
             "correlation_id": audit_log.correlation_id,
             "stored_hash": audit_log.entry_hash,
-            "calculated_hash": audit_log.calculate_hash(),
+            "calculated_hash": calculated_hash,
             "timestamp": audit_log.timestamp.isoformat(),
             "message": "Integrity verified" if is_valid else "INTEGRITY VIOLATION: Hash mismatch detected"
         }
@@ -360,7 +382,8 @@ class AuditLogRepository:
         violations = []
         
         for log in logs:
-            if log.verify_integrity():
+            calculated_hash = log.calculate_hash()
+            if log.entry_hash == calculated_hash:
                 verified += 1
             else:
                 violations.append({
@@ -369,7 +392,7 @@ class AuditLogRepository:
                     "operation": log.operation,
                     "timestamp": log.timestamp.isoformat(),
                     "stored_hash": log.entry_hash,
-                    "calculated_hash": log.calculate_hash()
+                    "calculated_hash": calculated_hash
                 })
         
         return {
@@ -379,3 +402,71 @@ class AuditLogRepository:
             "integrity_score": (verified / total * 100) if total > 0 else 0,
             "violations": violations
         }
+    
+    async def verify_chain(
+        self,
+        after_id: Optional[int] = None,
+        limit: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Replay the hash chain in id order.
+        
+        Each entry's own hash is recomputed and its prev_hash must equal
+        the entry_hash of the row before it, so deleted or reordered rows
+        show up as chain breaks. Entries written before chaining (NULL
+        prev_hash) are only checked against their own hash.
+        
+        Args:
+            after_id: Resume after this audit ID (its hash seeds the replay)
+            limit: Maximum number of logs to verify
+        
+        Returns:
+            Summary of verification results
+        """
+        query = select(AKMAuditLog).order_by(AKMAuditLog.id).limit(limit)
+        expected_prev = AUDIT_CHAIN_GENESIS
+        if after_id is not None:
+            query = query.where(AKMAuditLog.id > after_id)
+            expected_prev = await self.db.scalar(
+                select(AKMAuditLog.entry_hash).where(AKMAuditLog.id == after_id)
+            )
+        
+        result = await self.db.execute(query)
+        logs = list(result.scalars().all())
+        
+        verified = 0
+        violations = []
+        
+        for log in logs:
+            calculated_hash = log.calculate_hash()
+            if log.entry_hash != calculated_hash:
+                reason = "hash_mismatch"
+            elif log.prev_hash is not None and log.prev_hash != expected_prev:
+                reason = "chain_break"
+            else:
+                reason = None
+            
+            if reason is None:
+                verified += 1
+            else:
+                violations.append({
+                    "audit_id": log.id,
+                    "correlation_id": log.correlation_id,
+                    "operation": log.operation,
+                    "timestamp": log.timestamp.isoformat(),
+                    "reason": reason,
+                    "stored_hash": log.entry_hash,
+                    "calculated_hash": calculated_hash,
+                    "prev_hash": log.prev_hash,
+                    "expected_prev_hash": expected_prev
+                })
+            expected_prev = log.entry_hash
+        
+        total = len(logs)
+        return {
+            "total_verified": total,
+            "passed": verified,
+            "failed": len(violations),
+            "integrity_score": (verified / total * 100) if total > 0 else 0,
+            "violations": violations
+        }
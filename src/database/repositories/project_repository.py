@@ -7,10 +7,12 @@ Handles CRUD operations for projects in the multi-tenant API key management syst
 from typing import List, Optional
 from datetime import datetime
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.database.connection import dialect_insert
 from src.database.models import AKMProject, AKMAPIKey
 
 
@@ -23,17 +25,30 @@ class ProjectRepository:
         name: str,
         prefix: str,
         description: Optional[str] = None
-    ) -> AKMProject:
-        """Create a new project"""
-        project = AKMProject(
-            name=name,
-            prefix=prefix,
-            description=description,
-            is_active=True
+    ) -> Optional[AKMProject]:
+        """
+        Create a new project.
+        
+        Uses INSERT ... ON CONFLICT (name) DO NOTHING RETURNING so the
+        duplicate check and the insert share one round trip.
+        
+        Returns:
+            The created project, or None if the name is already taken
+        """
+        stmt = (
+            dialect_insert(session)(AKMProject)
+            .values(
+                name=name,
+                prefix=prefix,
+                description=description,
+                is_active=True
+            )
+            .on_conflict_do_nothing(index_elements=[AKMProject.name])
+            .returning(AKMProject)
         )
-        session.add(project)
+        result = await session.execute(stmt)
+        project = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(project)
         return project
     
     async def get_by_id(
@@ -149,6 +164,34 @@ class ProjectRepository:
         result = await session.execute(stmt)
         return len(list(result.scalars().all()))
     
+    async def get_with_key_counts(
+        self,
+        session: AsyncSession,
+        project_id: int
+    ) -> Optional[Row]:
+        """
+        Get project columns together with its API key counts in one query.
+        
+        Returns:
+            Row exposing the project columns plus active_keys_count and
+            total_keys_count as attributes, or None if not found
+        """
+        stmt = (
+            select(
+                *AKMProject.__table__.columns,
+                func.count(AKMAPIKey.id).filter(
+                    AKMAPIKey.is_active == True
+                ).label("active_keys_count"),
+                func.count(AKMAPIKey.id).label("total_keys_count")
+            )
+            .outerjoin(AKMAPIKey, AKMAPIKey.project_id == AKMProject.id)
+            .where(AKMProject.id == project_id)
+            .group_by(AKMProject.id)
+        )
+        
+        result = await session.execute(stmt)
+        return result.one_or_none()
+    
     async def get_with_keys(
         self,
         session: AsyncSession,
@@ -7,9 +7,10 @@ Handles rate limiting buckets, usage metrics, and limit checking.
 from typing import Optional, Dict
 from datetime import datetime, timedelta, date
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, case, delete, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.database.connection import dialect_insert
 from src.database.models import (
     AKMRateLimitBucket,
     AKMUsageMetric,
@@ -29,6 +30,9 @@ class RateLimitRepository:
         """
         Check rate limit and increment counter atomically.
         
+        The check and the increment are a single upsert, so concurrent
+        requests never hold a bucket row across round-trips.
+        
         Returns: {
             "allowed": bool,
             "current": int,
@@ -55,40 +59,33 @@ class RateLimitRepository:
         window_start = datetime.utcfromtimestamp(window_start_seconds)
         window_end = window_start + timedelta(seconds=window_seconds)
         
-        # Find or create bucket
-        stmt = select(AKMRateLimitBucket).where(
-            and_(
-                AKMRateLimitBucket.api_key_id == api_key_id,
-                AKMRateLimitBucket.window_start == window_start
-            )
-        )
-        result = await session.execute(stmt)
-        bucket = result.scalar_one_or_none()
-        
-        if not bucket:
-            bucket = AKMRateLimitBucket(
-                api_key_id=api_key_id,
-                window_start=window_start,
-                window_end=window_end,
-                request_count=0
-            )
-            session.add(bucket)
-            await session.flush()
-        
-        # Check limit
-        current_count = bucket.request_count
         limit = config.rate_limit_requests
-        allowed = current_count < limit
         
-        if allowed:
-            # Increment counter
-            bucket.request_count += 1
-            bucket.updated_at = now
-            await session.commit()
+        # One INSERT ... ON CONFLICT DO UPDATE creates the window's bucket or
+        # takes a slot in it. A full bucket fails the WHERE and is left alone,
+        # in which case no row comes back.
+        stmt = dialect_insert(session)(AKMRateLimitBucket).values(
+            api_key_id=api_key_id,
+            window_start=window_start,
+            window_end=window_end,
+            request_count=1,
+            updated_at=now
+        ).on_conflict_do_update(
+            index_elements=["api_key_id", "window_start"],
+            set_={
+                "request_count": AKMRateLimitBucket.request_count + 1,
+                "updated_at": now,
+            },
+            where=AKMRateLimitBucket.request_count < limit
+        ).returning(AKMRateLimitBucket.request_count)
+        current = (await session.execute(stmt)).scalar_one_or_none()
+        await session.commit()
+        
+        allowed = current is not None
         
         return {
             "allowed": allowed,
-            "current": current_count + (1 if allowed else 0),
+            "current": current if allowed else limit,
             "limit": limit,
             "reset_at": window_end,
             "retry_after": int((window_end - now).total_seconds())
@@ -170,50 +167,41 @@ class RateLimitRepository:
         success: bool,
         response_time_ms: int
     ):
-        """Record request in usage metrics"""
+        """
+        Record request in usage metrics.
+        
+        One INSERT ... ON CONFLICT DO UPDATE on (api_key_id, date, hour)
+        creates the hourly row or bumps its counters in place, so
+        concurrent requests neither lose increments nor race the insert.
+        """
         now = datetime.utcnow()
-        today = now.date()
-        hour = now.hour
         
-        # Find or create metric
-        stmt = select(AKMUsageMetric).where(
-            and_(
-                AKMUsageMetric.api_key_id == api_key_id,
-                AKMUsageMetric.date == today,
-                AKMUsageMetric.hour == hour
-            )
+        count = AKMUsageMetric.request_count
+        avg = AKMUsageMetric.avg_response_time_ms
+        stmt = dialect_insert(session)(AKMUsageMetric).values(
+            api_key_id=api_key_id,
+            date=now.date(),
+            hour=now.hour,
+            request_count=1,
+            successful_requests=1 if success else 0,
+            failed_requests=0 if success else 1,
+            avg_response_time_ms=response_time_ms,
+            updated_at=now
+        ).on_conflict_do_update(
+            index_elements=["api_key_id", "date", "hour"],
+            set_={
+                "request_count": count + 1,
+                "successful_requests": AKMUsageMetric.successful_requests + (1 if success else 0),
+                "failed_requests": AKMUsageMetric.failed_requests + (0 if success else 1),
+                # Moving average over the previous count, truncated like int()
+                "avg_response_time_ms": case(
+                    (or_(avg.is_(None), avg == 0), response_time_ms),
+                    else_=(avg * count + response_time_ms) // (count + 1)
+                ),
+                "updated_at": now,
+            }
         )
-        result = await session.execute(stmt)
-        metric = result.scalar_one_or_none()
-        
-        if not metric:
-            metric = AKMUsageMetric(
-                api_key_id=api_key_id,
-                date=today,
-                hour=hour,
-                request_count=0,
-                successful_requests=0,
-                failed_requests=0,
-                avg_response_time_ms=0
-            )
-            session.add(metric)
-        
-        # Update counters
-        metric.request_count += 1
-        
-        if success:
-            metric.successful_requests += 1
-        else:
-            metric.failed_requests += 1
-        
-        # Update average response time (moving average)
-        if metric.avg_response_time_ms:
-            total_time = metric.avg_response_time_ms * (metric.request_count - 1)
-            metric.avg_response_time_ms = int((total_time + response_time_ms) / metric.request_count)
-        else:
-            metric.avg_response_time_ms = response_time_ms
-        
-        metric.updated_at = now
+        await session.execute(stmt)
         
         await session.commit()
     
@@ -296,17 +284,13 @@ class RateLimitRepository:
         """Clean up old rate limit buckets"""
         cutoff = datetime.utcnow() - timedelta(days=days_to_keep)
         
-        stmt = select(AKMRateLimitBucket).where(
-            AKMRateLimitBucket.window_end < cutoff
+        # One set-based DELETE driven by idx_akm_rate_bucket_window_end
+        result = await session.execute(
+            delete(AKMRateLimitBucket).where(AKMRateLimitBucket.window_end < cutoff)
         )
-        result = await session.execute(stmt)
-        old_buckets = result.scalars().all()
-        
-        for bucket in old_buckets:
-            await session.delete(bucket)
         
         await session.commit()
-        return len(old_buckets)
+        return result.rowcount
 
 
 # Singleton instance
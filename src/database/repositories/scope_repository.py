@@ -4,12 +4,26 @@ Repository for Scope operations.
 Handles CRUD operations for permission scopes in the API key management system.
 """
 
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple, Union
 
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, exists, func, literal_column, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import AKMScope
+from src.database.connection import dialect_insert
+from src.database.models import AKMProject, AKMScope
+
+# Rows per INSERT ... ON CONFLICT statement (keeps bind params well below driver limits)
+BULK_UPSERT_BATCH_SIZE = 1000
+
+
+
+@dataclass(slots=True)
+class ScopeRow:
+    """Lightweight scope input for bulk_upsert (no per-row dict)"""
+    scope_name: str
+    description: str = ""
+    is_active: bool = True
 
 
 class ScopeRepository:
@@ -21,7 +35,6 @@ class ScopeRepository:
         project_id: int
     ) -> int:
         """Delete all scopes for a given project (hard delete). Returns number deleted."""
-        from sqlalchemy import delete
         stmt = delete(AKMScope).where(AKMScope.project_id == project_id)
         result = await session.execute(stmt)
         await session.commit()
@@ -82,20 +95,47 @@ class ScopeRepository:
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
     
+    async def check_project_and_duplicate(
+        self,
+        session: AsyncSession,
+        project_id: int,
+        scope_name: str
+    ) -> Tuple[bool, bool]:
+        """Return (project_exists, scope_name_taken) from a single query"""
+        stmt = select(
+            exists().where(AKMProject.id == project_id),
+            exists().where(
+                AKMScope.project_id == project_id,
+                AKMScope.scope_name == scope_name
+            )
+        )
+        project_exists, duplicate = (await session.execute(stmt)).one()
+        return bool(project_exists), bool(duplicate)
+    
     async def list_by_project(
         self,
         session: AsyncSession,
         project_id: int,
         active_only: bool = True,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[str] = None
     ) -> List[AKMScope]:
-        """List scopes for a specific project with pagination"""
+        """
+        List scopes for a specific project ordered by scope_name.
+        
+        Pass the last scope_name of the previous page as ``after`` to seek
+        straight to the next page through uq_project_scope instead of
+        scanning and discarding ``skip`` rows.
+        """
         stmt = select(AKMScope).where(AKMScope.project_id == project_id)
         
         if active_only:
             stmt = stmt.where(AKMScope.is_active == True)
         
+        if after is not None:
+            stmt = stmt.where(AKMScope.scope_name > after)
+        
         stmt = stmt.offset(skip).limit(limit).order_by(AKMScope.scope_name)
         
         result = await session.execute(stmt)
@@ -147,21 +187,32 @@ class ScopeRepository:
         session: AsyncSession,
         scope_id: int,
         description: Optional[str] = None,
-        is_active: Optional[bool] = None
+        is_active: Optional[bool] = None,
+        project_id: Optional[int] = None
     ) -> Optional[AKMScope]:
-        """Update scope by ID"""
-        scope = await self.get_by_id(session, scope_id)
+        """Update scope by ID in one UPDATE ... RETURNING
         
-        if not scope:
-            return None
+        When project_id is given the scope must also belong to that project,
+        so ownership is checked by the same statement that applies the change.
+        """
+        where = [AKMScope.id == scope_id]
+        if project_id is not None:
+            where.append(AKMScope.project_id == project_id)
         
+        values = {}
         if description is not None:
-            setattr(scope, "description", description)
+            values["description"] = description
         if is_active is not None:
-            setattr(scope, "is_active", is_active)
+            values["is_active"] = is_active
+        
+        if not values:
+            result = await session.execute(select(AKMScope).where(*where))
+            return result.scalar_one_or_none()
         
+        stmt = update(AKMScope).where(*where).values(**values).returning(AKMScope)
+        result = await session.execute(stmt)
+        scope = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(scope)
         
         return scope
     
@@ -183,17 +234,13 @@ class ScopeRepository:
     async def delete_by_id(
         self,
         session: AsyncSession,
-        scope_id: int
+        scope_id: int,
+        project_id: Optional[int] = None
     ) -> bool:
-        """Delete scope by ID (soft delete - deactivate)"""
-        scope = await self.get_by_id(session, scope_id)
-        
-        if not scope:
-            return False
-        
-        setattr(scope, "is_active", False)
-        await session.commit()
-        return True
+        """Delete scope by ID (soft delete - deactivate), optionally scoped to a project"""
+        return await self.update_by_id(
+            session, scope_id, is_active=False, project_id=project_id
+        ) is not None
     
     async def hard_delete(
         self,
@@ -213,17 +260,18 @@ class ScopeRepository:
     async def hard_delete_by_id(
         self,
         session: AsyncSession,
-        scope_id: int
+        scope_id: int,
+        project_id: Optional[int] = None
     ) -> bool:
-        """Hard delete scope by ID (cascades to API key scopes)"""
-        scope = await self.get_by_id(session, scope_id)
-        
-        if not scope:
-            return False
+        """Hard delete scope by ID (cascades to API key scopes), optionally scoped to a project"""
+        stmt = delete(AKMScope).where(AKMScope.id == scope_id)
+        if project_id is not None:
+            stmt = stmt.where(AKMScope.project_id == project_id)
         
-        await session.delete(scope)
+        result = await session.execute(stmt.returning(AKMScope.id))
+        deleted = result.scalar_one_or_none() is not None
         await session.commit()
-        return True
+        return deleted
     
     async def exists(
         self,
@@ -256,13 +304,24 @@ class ScopeRepository:
         self,
         session: AsyncSession,
         project_id: int,
-        scopes_data: List[dict]
+        scopes_data: Sequence[Union[ScopeRow, dict, Any]],
+        commit: bool = True
     ) -> dict:
         """Bulk upsert scopes for a project (create new or update existing)
         
+        Rows are written with batched INSERT ... ON CONFLICT (project_id,
+        scope_name) DO UPDATE statements instead of one round-trip per scope.
+        On PostgreSQL the upsert's RETURNING (xmax = 0) classifies rows as
+        created or updated; other dialects fetch existing scopes in one query
+        first.
+        
         Args:
             project_id: Project ID to associate scopes with
-            scopes_data: List of dicts with keys: scope_name, description, category, is_active
+            scopes_data: dicts with keys scope_name, description, is_active, or
+                objects with those attributes (ScopeRow, or validated request
+                models such as BulkScopeItem, passed through without copying)
+            commit: Commit when done; pass False to keep several calls in
+                one transaction that the caller commits
             
         Returns:
             dict with keys: created, updated, skipped, errors, scope_names
@@ -275,53 +334,121 @@ class ScopeRepository:
             "scope_names": []
         }
         
+        # Normalize input; later duplicates of a scope_name win
+        rows = {}
         for scope_data in scopes_data:
             try:
+                if not isinstance(scope_data, dict):
+                    rows[scope_data.scope_name] = {
+                        "project_id": project_id,
+                        "scope_name": scope_data.scope_name,
+                        "description": scope_data.description,
+                        "is_active": scope_data.is_active,
+                    }
+                    continue
                 scope_name = scope_data["scope_name"]
-                description = scope_data.get("description", "")
-                is_active = scope_data.get("is_active", True)
-                
-                # Check if scope exists in this project
-                existing = await self.get_by_project_and_name(session, project_id, scope_name)
-                
-                if existing:
-                    # Check if update is needed
-                    needs_update = False
-                    
-                    if existing.description != description:
-                        existing.description = description
-                        needs_update = True
-                    
-                    if existing.is_active != is_active:
-                        existing.is_active = is_active
-                        needs_update = True
-                    
-                    if needs_update:
-                        result["updated"] += 1
-                        result["scope_names"].append(scope_name)
-                    else:
-                        result["skipped"] += 1
-                else:
-                    # Create new scope
-                    new_scope = AKMScope(
-                        project_id=project_id,
-                        scope_name=scope_name,
-                        description=description,
-                        is_active=is_active
-                    )
-                    session.add(new_scope)
-                    result["created"] += 1
-                    result["scope_names"].append(scope_name)
-                
+                rows[scope_name] = {
+                    "project_id": project_id,
+                    "scope_name": scope_name,
+                    "description": scope_data.get("description", ""),
+                    "is_active": scope_data.get("is_active", True),
+                }
             except Exception as e:
-                result["errors"].append(f"Error processing scope '{scope_data.get('scope_name', 'unknown')}': {str(e)}")
+                name = scope_data.get("scope_name") if isinstance(scope_data, dict) else getattr(scope_data, "scope_name", None)
+                result["errors"].append(f"Error processing scope '{name or 'unknown'}': {str(e)}")
+        
+        if not rows:
+            return result
+        
+        insert = dialect_insert(session)
+        if session.get_bind().dialect.name == "postgresql":
+            return await self._bulk_upsert_returning(session, insert, rows, result, commit)
+        
+        # Fetch current state of the affected scopes in a single query
+        stmt = select(AKMScope.scope_name, AKMScope.description, AKMScope.is_active).where(
+            AKMScope.project_id == project_id,
+            AKMScope.scope_name.in_(list(rows))
+        )
+        existing = {row.scope_name: row for row in (await session.execute(stmt)).all()}
+        
+        changed = []
+        for scope_name, row in rows.items():
+            current = existing.get(scope_name)
+            if current is None:
+                result["created"] += 1
+            elif current.description != row["description"] or current.is_active != row["is_active"]:
+                result["updated"] += 1
+            else:
+                result["skipped"] += 1
                 continue
+            changed.append(row)
+            result["scope_names"].append(scope_name)
+        
+        if changed:
+            connection = await session.connection()
+            upsert = self._upsert_statement(insert)
+            for start in range(0, len(changed), BULK_UPSERT_BATCH_SIZE):
+                await connection.execute(upsert, changed[start:start + BULK_UPSERT_BATCH_SIZE])
+            if commit:
+                await session.commit()
         
-        # Commit all changes
-        if result["created"] > 0 or result["updated"] > 0:
+        return result
+    
+    async def _bulk_upsert_returning(
+        self,
+        session: AsyncSession,
+        insert,
+        rows: dict,
+        result: dict,
+        commit: bool
+    ) -> dict:
+        """
+        Upsert and classify in the same statement (PostgreSQL).
+        
+        xmax is 0 only on freshly inserted tuples. Unchanged rows are filtered
+        by the DO UPDATE ... WHERE clause, so they are not returned at all.
+        """
+        values = list(rows.values())
+        connection = await session.connection()
+        upsert = self._upsert_statement(insert).returning(
+            AKMScope.scope_name,
+            literal_column("xmax = 0").label("inserted"),
+        )
+        for start in range(0, len(values), BULK_UPSERT_BATCH_SIZE):
+            for row in (await connection.execute(upsert, values[start:start + BULK_UPSERT_BATCH_SIZE])).all():
+                result["created" if row.inserted else "updated"] += 1
+                result["scope_names"].append(row.scope_name)
+        
+        result["skipped"] = len(values) - result["created"] - result["updated"]
+        if commit:
             await session.commit()
         
         return result
+    
+    @staticmethod
+    def _upsert_statement(insert):
+        """
+        INSERT ... ON CONFLICT DO UPDATE that leaves unchanged rows untouched.
+        
+        Rows are passed as executemany parameters rather than baked in with
+        .values(batch): a multi-row VALUES clause compiles to a different
+        statement for every batch length, each taking its own slot in the
+        compiled-statement cache.
+        """
+        upsert = insert(AKMScope)
+        return upsert.on_conflict_do_update(
+            index_elements=[AKMScope.project_id, AKMScope.scope_name],
+            set_={
+                "description": upsert.excluded.description,
+                "is_active": upsert.excluded.is_active,
+                # Column onupdate defaults don't fire for ON CONFLICT DO UPDATE
+                "updated_at": func.now(),
+            },
+            where=or_(
+                AKMScope.description.is_distinct_from(upsert.excluded.description),
+                AKMScope.is_active.is_distinct_from(upsert.excluded.is_active),
+            ),
+        )
 
 
 # Singleton instance
@@ -1,9 +1,10 @@
 """Repository for managing sensitive field configurations."""
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, func
 from sqlalchemy.exc import SQLAlchemyError
 
+from src.database.connection import dialect_insert
 from src.database.models import AKMSensitiveField
 from src.logging_config import get_logger
 
@@ -14,74 +15,136 @@ class SensitiveFieldRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def list_fields(self, active: Optional[bool] = None) -> List[AKMSensitiveField]:
-        stmt = select(AKMSensitiveField)
+    async def list_fields(
+        self,
+        project_id: Optional[int] = None,
+        active: Optional[bool] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[AKMSensitiveField]:
+        """List fields by name; ``after`` is the last field_name of the previous page."""
+        stmt = select(AKMSensitiveField).where(self._owned_by(project_id))
         if active is not None:
             stmt = stmt.where(AKMSensitiveField.is_active == active)
-        result = await self.db.execute(stmt.order_by(AKMSensitiveField.field_name.asc()))
+        if after is not None:
+            stmt = stmt.where(AKMSensitiveField.field_name > after)
+        stmt = stmt.order_by(AKMSensitiveField.field_name.asc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.db.execute(stmt)
         return list(result.scalars().all())
 
+    async def count_fields(self, project_id: Optional[int] = None, active: Optional[bool] = None) -> int:
+        """Count the fields list_fields() pages through."""
+        stmt = select(func.count()).select_from(AKMSensitiveField).where(self._owned_by(project_id))
+        if active is not None:
+            stmt = stmt.where(AKMSensitiveField.is_active == active)
+        return (await self.db.execute(stmt)).scalar_one()
+
     async def get_by_id(self, field_id: int) -> Optional[AKMSensitiveField]:
         result = await self.db.execute(select(AKMSensitiveField).where(AKMSensitiveField.id == field_id))
         return result.scalar_one_or_none()
 
-    async def get_by_name(self, field_name: str) -> Optional[AKMSensitiveField]:
-        result = await self.db.execute(select(AKMSensitiveField).where(AKMSensitiveField.field_name == field_name))
+    async def get_by_name(self, field_name: str, project_id: Optional[int] = None) -> Optional[AKMSensitiveField]:
+        result = await self.db.execute(
+            select(AKMSensitiveField).where(
+                AKMSensitiveField.field_name == field_name, self._owned_by(project_id)
+            )
+        )
         return result.scalar_one_or_none()
 
     async def create(
         self,
         field_name: str,
+        project_id: Optional[int] = None,
         is_active: bool = True,
         strategy: Optional[str] = None,
         mask_show_start: Optional[int] = None,
         mask_show_end: Optional[int] = None,
         mask_char: Optional[str] = None,
         replacement: Optional[str] = None,
-    ) -> AKMSensitiveField:
-        field = AKMSensitiveField(
-            field_name=field_name.lower(),
-            is_active=is_active,
-            strategy=strategy,
-            mask_show_start=mask_show_start,
-            mask_show_end=mask_show_end,
-            mask_char=mask_char,
-            replacement=replacement,
+    ) -> Optional[AKMSensitiveField]:
+        """
+        Create a field; field_name must already be lowercased (SensitiveFieldCreate does it).
+
+        Runs as INSERT ... ON CONFLICT DO NOTHING RETURNING against the
+        unique index for the field's scope, so a name already taken comes
+        back as None instead of racing a separate existence check.
+        """
+        insert = dialect_insert(self.db)
+        if project_id is None:
+            conflict = dict(
+                index_elements=[AKMSensitiveField.field_name],
+                index_where=AKMSensitiveField.project_id.is_(None),
+            )
+        else:
+            conflict = dict(index_elements=[AKMSensitiveField.project_id, AKMSensitiveField.field_name])
+        stmt = (
+            insert(AKMSensitiveField)
+            .values(
+                project_id=project_id,
+                field_name=field_name,
+                is_active=is_active,
+                strategy=strategy,
+                mask_show_start=mask_show_start,
+                mask_show_end=mask_show_end,
+                mask_char=mask_char,
+                replacement=replacement,
+            )
+            .on_conflict_do_nothing(**conflict)
+            .returning(AKMSensitiveField)
         )
-        self.db.add(field)
         try:
-            await self.db.flush()
+            result = await self.db.execute(stmt)
         except SQLAlchemyError as e:
             logger.error("Failed to create sensitive field: %s", e)
             raise
-        return field
+        return result.scalar_one_or_none()
+
+    def _owned_by(self, project_id: Optional[int]):
+        """WHERE clause matching a project's fields, or global fields when None"""
+        if project_id is None:
+            return AKMSensitiveField.project_id.is_(None)
+        return AKMSensitiveField.project_id == project_id
 
     async def update(
         self,
         field_id: int,
+        project_id: Optional[int] = None,
         **updates,
     ) -> Optional[AKMSensitiveField]:
-        field = await self.get_by_id(field_id)
-        if not field:
-            return None
-        for key, value in updates.items():
-            if hasattr(field, key) and value is not None:
-                setattr(field, key, value)
+        """
+        Update a field owned by project_id (global when None).
+
+        The ownership check and the change run as one UPDATE ... RETURNING.
+        """
+        columns = AKMSensitiveField.__table__.columns
+        values = {
+            key: value for key, value in updates.items()
+            if key in columns and value is not None
+        }
+        where = (AKMSensitiveField.id == field_id, self._owned_by(project_id))
+        if values:
+            stmt = update(AKMSensitiveField).where(*where).values(**values).returning(AKMSensitiveField)
+        else:
+            stmt = select(AKMSensitiveField).where(*where)
         try:
-            await self.db.flush()
+            result = await self.db.execute(stmt)
         except SQLAlchemyError as e:
             logger.error("Failed to update sensitive field: %s", e)
             raise
-        return field
+        return result.scalar_one_or_none()
 
-    async def delete(self, field_id: int) -> bool:
-        field = await self.get_by_id(field_id)
-        if not field:
-            return False
-        await self.db.delete(field)
+    async def delete(self, field_id: int, project_id: Optional[int] = None) -> bool:
+        """Delete a field owned by project_id (global when None) in one statement."""
+        stmt = (
+            delete(AKMSensitiveField)
+            .where(AKMSensitiveField.id == field_id, self._owned_by(project_id))
+            .returning(AKMSensitiveField.id)
+        )
         try:
-            await self.db.flush()
+            result = await self.db.execute(stmt)
         except SQLAlchemyError as e:
             logger.error("Failed to delete sensitive field: %s", e)
             raise
-        return True
+        return result.scalar_one_or_none() is not None
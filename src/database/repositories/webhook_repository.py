@@ -4,19 +4,21 @@ Repository for Webhook operations.
 Handles webhook creation, event subscriptions, and delivery management.
 """
 
+import asyncio
 import hmac
 import hashlib
 import json
 import secrets
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterable, Tuple
 from datetime import datetime, timedelta
 
 import httpx
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, update, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.database.models import (
+    AKMAPIKey,
     AKMWebhook,
     AKMWebhookEvent,
     AKMWebhookSubscription,
@@ -76,6 +78,49 @@ class WebhookRepository:
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
     
+    async def get_webhook_scoped(
+        self,
+        session: AsyncSession,
+        project_id: int,
+        api_key_id: int,
+        webhook_id: int
+    ) -> Optional[AKMWebhook]:
+        """Get webhook only if it belongs to the key in the project (single JOIN query)"""
+        stmt = select(AKMWebhook).join(
+            AKMAPIKey, AKMAPIKey.id == AKMWebhook.api_key_id
+        ).where(
+            AKMWebhook.id == webhook_id,
+            AKMWebhook.api_key_id == api_key_id,
+            AKMAPIKey.project_id == project_id
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+    
+    async def list_webhooks_scoped(
+        self,
+        session: AsyncSession,
+        project_id: int,
+        api_key_id: int,
+        active_only: bool = True,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[AKMWebhook]:
+        """List webhooks of a key, restricted to keys of the project (single JOIN query)"""
+        stmt = select(AKMWebhook).join(
+            AKMAPIKey, AKMAPIKey.id == AKMWebhook.api_key_id
+        ).where(
+            AKMWebhook.api_key_id == api_key_id,
+            AKMAPIKey.project_id == project_id
+        )
+        
+        if active_only:
+            stmt = stmt.where(AKMWebhook.is_active == True)
+        
+        stmt = stmt.order_by(AKMWebhook.id).offset(skip).limit(limit)
+        
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+    
     async def get_with_subscriptions(
         self,
         session: AsyncSession,
@@ -113,27 +158,38 @@ class WebhookRepository:
         url: Optional[str] = None,
         is_active: Optional[bool] = None,
         timeout_seconds: Optional[int] = None,
-        retry_policy: Optional[Dict] = None
+        retry_policy: Optional[Dict] = None,
+        project_id: Optional[int] = None,
+        api_key_id: Optional[int] = None
     ) -> Optional[AKMWebhook]:
-        """Update webhook configuration"""
-        webhook = await self.get_by_id(session, webhook_id)
-        
-        if not webhook:
-            return None
-        
-        if url is not None:
-            webhook.url = url
-        if is_active is not None:
-            webhook.is_active = is_active
-        if timeout_seconds is not None:
-            webhook.timeout_seconds = timeout_seconds
-        if retry_policy is not None:
-            webhook.retry_policy = retry_policy
-        
-        webhook.updated_at = datetime.utcnow()
+        """
+        Update webhook configuration in one UPDATE ... RETURNING.
+        
+        When api_key_id/project_id are given the webhook must also belong to
+        that key in that project, so ownership is checked by the same
+        statement that applies the change.
+        """
+        where = [AKMWebhook.id == webhook_id]
+        if api_key_id is not None:
+            where.append(AKMWebhook.api_key_id == api_key_id)
+        if project_id is not None:
+            where.append(AKMWebhook.api_key_id.in_(
+                select(AKMAPIKey.id).where(AKMAPIKey.project_id == project_id)
+            ))
+        
+        changes = {
+            "url": url,
+            "is_active": is_active,
+            "timeout_seconds": timeout_seconds,
+            "retry_policy": retry_policy,
+        }
+        values = {key: value for key, value in changes.items() if value is not None}
+        values["updated_at"] = datetime.utcnow()
         
+        stmt = update(AKMWebhook).where(*where).values(**values).returning(AKMWebhook)
+        result = await session.execute(stmt)
+        webhook = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(webhook)
         
         return webhook
     
@@ -195,6 +251,15 @@ class WebhookRepository:
         await session.commit()
         return True
     
+    async def list_event_types(
+        self,
+        session: AsyncSession
+    ) -> List[AKMWebhookEvent]:
+        """List the webhook event type catalog"""
+        stmt = select(AKMWebhookEvent).order_by(AKMWebhookEvent.event_type)
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+    
     async def dispatch_event(
         self,
         session: AsyncSession,
@@ -230,9 +295,9 @@ class WebhookRepository:
         
         await session.commit()
         
-        # Process deliveries asynchronously
-        for delivery in deliveries:
-            await self._deliver_webhook(session, delivery.id)
+        # Deliveries are independent, so their POSTs overlap
+        await self._attempt_deliveries(zip(deliveries, webhooks))
+        await session.commit()
     
     async def _deliver_webhook(
         self,
@@ -240,19 +305,28 @@ class WebhookRepository:
         delivery_id: int
     ):
         """Deliver a single webhook"""
-        # Get delivery and webhook
-        stmt = select(AKMWebhookDelivery).where(AKMWebhookDelivery.id == delivery_id)
-        result = await session.execute(stmt)
-        delivery = result.scalar_one_or_none()
+        # Get delivery and webhook (identity-map hits when the caller loaded them)
+        delivery = await session.get(AKMWebhookDelivery, delivery_id)
         
         if not delivery:
             return
         
-        webhook = await self.get_by_id(session, delivery.webhook_id)
+        webhook = await session.get(AKMWebhook, delivery.webhook_id)
+        async with httpx.AsyncClient() as client:
+            await self._attempt_delivery(client, delivery, webhook)
+        
+        await session.commit()
+    
+    async def _attempt_delivery(
+        self,
+        client: httpx.AsyncClient,
+        delivery: AKMWebhookDelivery,
+        webhook: Optional[AKMWebhook]
+    ):
+        """Send one delivery and record the outcome on it (no commit)"""
         if not webhook or not webhook.is_active:
             delivery.status = 'failed'
             delivery.response_body = 'Webhook inactive or deleted'
-            await session.commit()
             return
         
         # Prepare payload
@@ -275,22 +349,21 @@ class WebhookRepository:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    webhook.url,
-                    json=payload,
-                    headers=headers,
-                    timeout=webhook.timeout_seconds
-                )
-                
-                delivery.http_status_code = response.status_code
-                delivery.response_body = response.text[:1000]  # Limit size
-                
-                if response.is_success:
-                    delivery.status = 'success'
-                    delivery.delivered_at = datetime.utcnow()
-                else:
-                    delivery.status = 'failed'
+            response = await client.post(
+                webhook.url,
+                json=payload,
+                headers=headers,
+                timeout=webhook.timeout_seconds
+            )
+            
+            delivery.http_status_code = response.status_code
+            delivery.response_body = response.text[:1000]  # Limit size
+            
+            if response.is_success:
+                delivery.status = 'success'
+                delivery.delivered_at = datetime.utcnow()
+            else:
+                delivery.status = 'failed'
                 
         except httpx.TimeoutException:
             delivery.status = 'failed'
@@ -306,29 +379,91 @@ class WebhookRepository:
             backoff_seconds = webhook.retry_policy['backoff_seconds'][delivery.attempt_count - 1]
             delivery.next_retry_at = datetime.utcnow() + timedelta(seconds=backoff_seconds)
             delivery.status = 'retrying'
-        
-        await session.commit()
+    
+    async def _attempt_deliveries(
+        self,
+        pairs: Iterable[Tuple[AKMWebhookDelivery, AKMWebhook]],
+        concurrency: int = 64
+    ):
+        """
+        Send several deliveries concurrently over one client (no commit).
+        
+        At most ``concurrency`` POSTs are in flight at once, so a batch takes
+        about as long as its slowest endpoints rather than the sum of all.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with httpx.AsyncClient() as client:
+            async def attempt(delivery, webhook):
+                async with semaphore:
+                    await self._attempt_delivery(client, delivery, webhook)
+            
+            await asyncio.gather(*(attempt(d, w) for d, w in pairs))
     
     async def process_retries(
         self,
-        session: AsyncSession
+        session: AsyncSession,
+        concurrency: int = 64
     ) -> int:
-        """Process pending webhook retries"""
+        """
+        Process pending webhook retries.
+        
+        Due deliveries are claimed with a single UPDATE ... RETURNING (so a
+        concurrent worker cannot pick them up too) and loaded together with
+        their webhooks in one query. Up to ``concurrency`` POSTs run at once,
+        and outcomes are committed once at the end, which lets the flush send
+        the per-row UPDATEs as one executemany.
+        """
         now = datetime.utcnow()
         
-        stmt = select(AKMWebhookDelivery).where(
-            and_(
-                AKMWebhookDelivery.status == 'retrying',
-                AKMWebhookDelivery.next_retry_at <= now
+        claimed = await session.execute(
+            update(AKMWebhookDelivery)
+            .where(
+                and_(
+                    AKMWebhookDelivery.status == 'retrying',
+                    AKMWebhookDelivery.next_retry_at <= now
+                )
             )
+            .values(status='pending')
+            .returning(AKMWebhookDelivery.id)
         )
-        result = await session.execute(stmt)
-        pending_deliveries = result.scalars().all()
+        delivery_ids = claimed.scalars().all()
+        if not delivery_ids:
+            await session.commit()
+            return 0
         
-        for delivery in pending_deliveries:
-            await self._deliver_webhook(session, delivery.id)
+        stmt = (
+            select(AKMWebhookDelivery, AKMWebhook)
+            .join(AKMWebhook, AKMWebhook.id == AKMWebhookDelivery.webhook_id)
+            .where(AKMWebhookDelivery.id.in_(delivery_ids))
+        )
+        result = await session.execute(stmt)
         
-        return len(pending_deliveries)
+        await self._attempt_deliveries(result.all(), concurrency)
+        await session.commit()
+        return len(delivery_ids)
+    
+    async def get_delivery(
+        self,
+        session: AsyncSession,
+        delivery_id: int
+    ) -> Optional[AKMWebhookDelivery]:
+        """Get delivery by ID"""
+        return await session.get(AKMWebhookDelivery, delivery_id)
+    
+    async def retry_delivery(
+        self,
+        session: AsyncSession,
+        delivery: AKMWebhookDelivery
+    ) -> AKMWebhookDelivery:
+        """
+        Re-deliver one delivery now, regardless of its next_retry_at.
+        
+        The delivery is updated in place, so the caller's object already
+        holds the new state without re-fetching it.
+        """
+        await self._deliver_webhook(session, delivery.id)
+        return delivery
     
     async def get_delivery_history(
         self,
@@ -350,7 +485,7 @@ class WebhookRepository:
         webhook_id: int
     ) -> bool:
         """Delete webhook"""
-        webhook = await self.get_by_id(session, webhook_id)
+        webhook = await session.get(AKMWebhook, webhook_id)
         
         if not webhook:
             return False
@@ -3,9 +3,12 @@ Advanced logging configuration with BetterStack (Logtail) integration.
 Provides structured logging with context and automatic error tracking.
 """
 
+import atexit
 import logging
+import queue
 import sys
 import json
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from typing import Any, Dict
 from pythonjsonlogger.json import JsonFormatter
@@ -16,6 +19,17 @@ from .config import get_settings
 
 settings = get_settings()
 
+# Record fields that never change after import, read from settings once
+_STATIC_LOG_FIELDS: Dict[str, Any] = {
+    "environment": settings.environment,
+    "api_version": settings.api_version,
+}
+if settings.is_vercel:
+    _STATIC_LOG_FIELDS["platform"] = "vercel"
+
+# Thread that runs the real handlers when logging is queued (None otherwise)
+_queue_listener: "QueueListener | None" = None
+
 
 class BetterStackHandler(logging.Handler):
     """
@@ -64,6 +78,18 @@ class BetterStackHandler(logging.Handler):
             print(f"Failed to send log to BetterStack: {e}", file=sys.stderr)
 
 
+class LocalQueueHandler(QueueHandler):
+    """
+    QueueHandler for an in-process queue.
+
+    Records are enqueued untouched; the listener's handlers format them,
+    so exception info and ``extra`` fields reach every formatter intact.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 class StructuredFormatter(JsonFormatter):
     """
     JSON formatter with additional context and metadata.
@@ -84,13 +110,8 @@ class StructuredFormatter(JsonFormatter):
         # Add log level
         log_record["level"] = record.levelname
 
-        # Add environment information
-        log_record["environment"] = settings.environment
-        log_record["api_version"] = settings.api_version
-
-        # Add Vercel information if available
-        if settings.is_vercel:
-            log_record["platform"] = "vercel"
+        # Add environment (and Vercel platform) information
+        log_record.update(_STATIC_LOG_FIELDS)
 
         # Add exception info if present
         if record.exc_info:
@@ -157,6 +178,8 @@ def setup_logging() -> logging.Logger:
     logger.propagate = False  # Don't propagate to root logger
 
     # Remove existing handlers
+    global _queue_listener
+    stop_queue_listener()
     logger.handlers.clear()
 
     # Console handler with structured logging (always enabled)
@@ -223,9 +246,31 @@ def setup_logging() -> logging.Logger:
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
 
+    # Format and write on a listener thread so request handlers only
+    # enqueue records (BetterStack posts over HTTP per record). Vercel
+    # keeps direct handlers: a frozen instance would strand queued records.
+    if not settings.is_vercel:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        _queue_listener = QueueListener(
+            log_queue, *logger.handlers, respect_handler_level=True
+        )
+        logger.handlers = [LocalQueueHandler(log_queue)]
+        _queue_listener.start()
+
     return logger
 
 
+def stop_queue_listener() -> None:
+    """Flush queued records and stop the listener thread, if running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(stop_queue_listener)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance for a specific module.
@@ -1,9 +1,10 @@
 """Manager for merging sensitive field configuration from file, DB and global settings."""
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
 import json
+import time
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -16,6 +17,17 @@ logger = get_logger(__name__)
 
 CONFIG_FILE = Path("data/sensitive_fields.json")
 CACHE_TTL_SECONDS = 300
+SHARED_CACHE_TTL_SECONDS = 30
+
+# Merged fields shared by every manager in this process: (monotonic deadline, fields).
+# Managers are created per request, so without this each request re-reads file + DB.
+_shared_fields: Optional[Tuple[float, Dict[str, Dict[str, Any]]]] = None
+
+
+def invalidate_shared_fields() -> None:
+    """Drop the process-wide snapshot after sensitive fields change."""
+    global _shared_fields
+    _shared_fields = None
 
 
 class SensitiveFieldManager:
@@ -63,13 +75,20 @@ class SensitiveFieldManager:
         return file_map
 
     async def load(self, force: bool = False) -> None:
-        if not force and self._last_loaded and datetime.utcnow() - self._last_loaded < timedelta(seconds=CACHE_TTL_SECONDS):
-            return
+        global _shared_fields
+        if not force:
+            if self._last_loaded and datetime.utcnow() - self._last_loaded < timedelta(seconds=CACHE_TTL_SECONDS):
+                return
+            if _shared_fields is not None and _shared_fields[0] > time.monotonic():
+                self._fields_config = _shared_fields[1]
+                self._last_loaded = datetime.utcnow()
+                return
         file_map = self._load_from_file()
         db_map = await self._load_from_db()
         merged = {**file_map, **db_map}  # DB overrides file
         self._fields_config = merged
         self._last_loaded = datetime.utcnow()
+        _shared_fields = (time.monotonic() + SHARED_CACHE_TTL_SECONDS, merged)
         logger.debug("Sensitive fields loaded: %d entries", len(self._fields_config))
 
     async def get_fields(self) -> Dict[str, Dict[str, Any]]:
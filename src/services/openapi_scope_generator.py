@@ -4,8 +4,10 @@ Service for generating scopes from OpenAPI/Swagger specifications.
 
 import re
 import json
+import pickle
 import yaml
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import httpx
 
@@ -19,6 +21,27 @@ from src.api.models.openapi_scopes import (
 )
 
 
+# HTTP methods that define operations on an OpenAPI path item
+HTTP_METHODS = frozenset({'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'})
+
+# Pre-parsed specs for well-known URLs, built by scripts/build_well_known_specs.py
+WELL_KNOWN_SPECS_DIR = Path(__file__).parent.parent / 'assets' / 'specs'
+_well_known_urls: Optional[Dict[str, str]] = None
+_well_known_specs: Dict[str, Dict[str, Any]] = {}
+
+# Conditional-GET cache for remote specs: url -> (etag, last_modified, parsed_spec).
+# URLs come from callers, so it is an LRU bounded to URL_SPEC_CACHE_MAX_ENTRIES
+URL_SPEC_CACHE_MAX_ENTRIES = 32
+_url_spec_cache: "OrderedDict[str, Tuple[Optional[str], Optional[str], Dict[str, Any]]]" = OrderedDict()
+
+
+def _url_version(etag: Optional[str], last_modified: Optional[str]) -> Optional[str]:
+    """Version string for a remote spec from its validators, None without any"""
+    if not etag and not last_modified:
+        return None
+    return f"{etag or ''}|{last_modified or ''}"
+
+
 class OpenAPIScopeGenerator:
     """Generator for creating scopes from OpenAPI specifications"""
     
@@ -28,37 +51,124 @@ class OpenAPIScopeGenerator:
         source: Optional[str] = None,
         spec_data: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Load OpenAPI spec from various sources"""
+        """
+        Load OpenAPI spec from various sources.
+        
+        Specs for URL sources may be shared with other callers (well-known
+        and conditional-GET caches) and must be treated as read-only.
+        """
+        spec, _ = await self.load_spec_with_version(source_type, source, spec_data)
+        return spec
+    
+    async def load_spec_with_version(
+        self,
+        source_type: OpenAPISourceType,
+        source: Optional[str] = None,
+        spec_data: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Load a spec together with a version string that changes with its content.
+        
+        The version is "inline" for JSON sources (the spec is the input),
+        the catalog name for well-known URLs, and the upstream ETag /
+        Last-Modified for other URLs. It is None when nothing identifies
+        the content (URLs without validators, FILE sources).
+        """
         
         if source_type == OpenAPISourceType.JSON:
             if not spec_data:
                 raise ValueError("spec_data is required for JSON source type")
-            return spec_data
+            return spec_data, "inline"
         
         if source_type == OpenAPISourceType.URL:
             if not source:
                 raise ValueError("source URL is required for URL source type")
+            spec = self._load_well_known(source)
+            if spec is not None:
+                return spec, f"well-known:{_well_known_urls[source]}"
             return await self._load_from_url(source)
         
         if source_type == OpenAPISourceType.FILE:
             if not source:
                 raise ValueError("source path is required for FILE source type")
-            return await self._load_from_file(source)
+            return await self._load_from_file(source), None
         
         raise ValueError(f"Unsupported source type: {source_type}")
     
-    async def _load_from_url(self, url: str) -> Dict[str, Any]:
-        """Load spec from URL"""
+    def _load_well_known(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a pre-parsed spec for a well-known URL, if one was built.
+        
+        Returns None when the URL is not in the catalog or its pickle has
+        not been generated, so the caller falls back to fetching it.
+        """
+        global _well_known_urls
+        
+        if _well_known_urls is None:
+            catalog_path = WELL_KNOWN_SPECS_DIR / 'well_known_specs.json'
+            try:
+                catalog = json.loads(catalog_path.read_text(encoding='utf-8'))
+            except FileNotFoundError:
+                catalog = {}
+            _well_known_urls = {spec_url: name for name, spec_url in catalog.items()}
+        
+        name = _well_known_urls.get(url)
+        if name is None:
+            return None
+        
+        if name not in _well_known_specs:
+            pickle_path = WELL_KNOWN_SPECS_DIR / f'{name}.pickle'
+            if not pickle_path.exists():
+                return None
+            with pickle_path.open('rb') as f:
+                _well_known_specs[name] = pickle.load(f)
+        
+        return _well_known_specs[name]
+    
+    async def _load_from_url(self, url: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Load spec from URL, with its upstream validators as version.
+        
+        Uses conditional GET (If-None-Match / If-Modified-Since) against the
+        validators of the previous response, so an unchanged upstream spec
+        answers 304 and the cached parsed spec is reused without re-parsing.
+        """
+        headers = {}
+        cached = _url_spec_cache.get(url)
+        if cached:
+            _url_spec_cache.move_to_end(url)
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
         async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
+            response = await client.get(url, headers=headers)
+            
+            if response.status_code == 304 and cached:
+                return cached[2], _url_version(cached[0], cached[1])
+            
             response.raise_for_status()
             
             content_type = response.headers.get('content-type', '')
             
             if 'yaml' in content_type or url.endswith(('.yaml', '.yml')):
-                return yaml.safe_load(response.text)
+                spec = yaml.safe_load(response.text)
             else:
-                return response.json()
+                spec = response.json()
+        
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if etag or last_modified:
+            _url_spec_cache[url] = (etag, last_modified, spec)
+            _url_spec_cache.move_to_end(url)
+            while len(_url_spec_cache) > URL_SPEC_CACHE_MAX_ENTRIES:
+                _url_spec_cache.popitem(last=False)
+        else:
+            _url_spec_cache.pop(url, None)
+        
+        return spec, _url_version(etag, last_modified)
     
     async def _load_from_file(self, file_path: str) -> Dict[str, Any]:
         """Load spec from file"""
@@ -92,7 +202,7 @@ class OpenAPIScopeGenerator:
         
         for path, path_item in paths.items():
             for method, operation in path_item.items():
-                if method.upper() in ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS']:
+                if method.upper() in HTTP_METHODS:
                     operations.append({
                         'path': path,
                         'method': method.upper(),
@@ -167,36 +277,18 @@ class OpenAPIScopeGenerator:
         operations = []
         for path, path_item in paths.items():
             for method, operation in path_item.items():
-                if method.upper() in ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS']:
+                if method.upper() in HTTP_METHODS:
                     operations.append({
                         'path': path,
                         'method': method.upper(),
                         'operation': operation,
                         'tags': operation.get('tags', [])
                     })
-        # Generate scopes based on strategy
-        if strategy == ScopeGenerationStrategy.PATH_METHOD:
-            generated_scopes = self._generate_path_method_scopes(
-                operations, naming_config, category
-            )
-        elif strategy == ScopeGenerationStrategy.PATH_RESOURCE:
-            generated_scopes = self._generate_path_resource_scopes(
-                operations, naming_config, category, generate_wildcards
-            )
-        elif strategy == ScopeGenerationStrategy.TAG_BASED:
-            generated_scopes = self._generate_tag_based_scopes(
-                operations, naming_config, category, generate_wildcards
-            )
-        elif strategy == ScopeGenerationStrategy.OPERATION_ID:
-            generated_scopes = self._generate_operation_id_scopes(
-                operations, naming_config, category
-            )
-            # Check for missing operationIds
-            missing_ids = [op for op in operations if not op['operation'].get('operationId')]
-            if missing_ids:
-                warnings.append(
-                    f"{len(missing_ids)} operations missing operationId - these will be skipped"
-                )
+        # Strategy is resolved once; each generator runs its own specialized loop
+        generate = _STRATEGY_DISPATCH[strategy]
+        generated_scopes = generate(
+            self, operations, naming_config, category, generate_wildcards, warnings
+        )
         # Deduplicate by scope_name
         unique_scopes = {}
         for scope in generated_scopes:
@@ -218,7 +310,9 @@ class OpenAPIScopeGenerator:
         self,
         operations: List[Dict],
         naming_config: ScopeNamingConfig,
-        category: str
+        category: str,
+        generate_wildcards: bool,
+        warnings: List[str]
     ) -> List[GeneratedScope]:
         """Generate one scope per path + method combination"""
         scopes = []
@@ -250,7 +344,8 @@ class OpenAPIScopeGenerator:
         operations: List[Dict],
         naming_config: ScopeNamingConfig,
         category: str,
-        generate_wildcards: bool
+        generate_wildcards: bool,
+        warnings: List[str]
     ) -> List[GeneratedScope]:
         """Generate CRUD scopes per resource"""
         scopes = []
@@ -315,7 +410,8 @@ class OpenAPIScopeGenerator:
         operations: List[Dict],
         naming_config: ScopeNamingConfig,
         category: str,
-        generate_wildcards: bool
+        generate_wildcards: bool,
+        warnings: List[str]
     ) -> List[GeneratedScope]:
         """Generate scopes based on OpenAPI tags"""
         scopes = []
@@ -378,15 +474,19 @@ class OpenAPIScopeGenerator:
         self,
         operations: List[Dict],
         naming_config: ScopeNamingConfig,
-        category: str
+        category: str,
+        generate_wildcards: bool,
+        warnings: List[str]
     ) -> List[GeneratedScope]:
         """Generate one scope per operationId"""
         scopes = []
+        missing_ids = 0
         
         for op in operations:
             operation_id = op['operation'].get('operationId')
             
             if not operation_id:
+                missing_ids += 1
                 continue
             
             scope_name = f"{naming_config.namespace}:{operation_id}:execute"
@@ -406,6 +506,11 @@ class OpenAPIScopeGenerator:
                 }
             ))
         
+        if missing_ids:
+            warnings.append(
+                f"{missing_ids} operations missing operationId - these will be skipped"
+            )
+        
         return scopes
     
     def _generate_scope_name_path_method(
@@ -469,5 +574,13 @@ class OpenAPIScopeGenerator:
         return name or 'unknown'
 
 
+# Strategy -> generator, resolved once per generate_scopes() call
+_STRATEGY_DISPATCH = {
+    ScopeGenerationStrategy.PATH_METHOD: OpenAPIScopeGenerator._generate_path_method_scopes,
+    ScopeGenerationStrategy.PATH_RESOURCE: OpenAPIScopeGenerator._generate_path_resource_scopes,
+    ScopeGenerationStrategy.TAG_BASED: OpenAPIScopeGenerator._generate_tag_based_scopes,
+    ScopeGenerationStrategy.OPERATION_ID: OpenAPIScopeGenerator._generate_operation_id_scopes,
+}
+
 # Singleton instance
 openapi_scope_generator = OpenAPIScopeGenerator()
@@ -0,0 +1,83 @@
+"""
+Unit tests for the audit logger.
+"""
+
+import asyncio
+import importlib
+
+import pytest
+
+from src.audit_logger import AuditLogger, start_audit_flusher, stop_audit_flusher
+from src.config import settings
+
+audit_module = importlib.import_module("src.audit_logger")
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Capture batches handed to the database writer"""
+    rows = []
+
+    async def write(batch):
+        rows.extend(batch)
+
+    monkeypatch.setattr(audit_module, "_write_audit_batch", write)
+    # is_vercel is a cached_property stored in the instance dict
+    monkeypatch.setitem(settings.__dict__, "is_vercel", False)
+    monkeypatch.setattr(settings, "audit_batch_size", 100)
+    # Long enough that the flusher is still collecting when it is stopped
+    monkeypatch.setattr(settings, "audit_flush_interval_ms", 60_000)
+    yield rows
+    audit_module._audit_queue = audit_module._audit_flusher_task = None
+
+
+@pytest.mark.unit
+class TestAuditFlusher:
+    """Test suite for the background audit writer"""
+
+    async def test_stop_mid_batch_writes_every_row(self, written):
+        """Rows already taken off the queue are written on shutdown"""
+        start_audit_flusher()
+        queue = audit_module._audit_queue
+        for i in range(5):
+            queue.put_nowait({"correlation_id": str(i)})
+        await asyncio.sleep(0.01)
+
+        assert queue.empty()
+        assert written == []
+
+        await stop_audit_flusher()
+
+        assert [row["correlation_id"] for row in written] == ["0", "1", "2", "3", "4"]
+        assert audit_module._audit_queue is None
+
+    async def test_full_queue_writes_inline(self, test_session, monkeypatch):
+        """An entry that does not fit in the queue is persisted directly"""
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait({"correlation_id": "queued"})
+        monkeypatch.setattr(audit_module, "_audit_queue", queue)
+
+        entry = await AuditLogger(test_session).log_operation(
+            operation="create_scope", resource_type="scope", action="POST"
+        )
+
+        assert entry.id is not None
+        assert entry.entry_hash is not None
+        assert queue.qsize() == 1
+
+    async def test_failed_batch_drops_only_bad_rows(self, monkeypatch):
+        """A batch the database rejects is retried row by row"""
+        inserted = []
+
+        async def insert_rows(rows):
+            if any(row["correlation_id"] == "bad" for row in rows):
+                raise ValueError("foreign key violation")
+            inserted.extend(rows)
+
+        monkeypatch.setattr(audit_module, "_insert_audit_rows", insert_rows)
+
+        await audit_module._write_audit_batch(
+            [{"correlation_id": "0"}, {"correlation_id": "bad"}, {"correlation_id": "2"}]
+        )
+
+        assert [row["correlation_id"] for row in inserted] == ["0", "2"]
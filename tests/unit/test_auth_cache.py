@@ -0,0 +1,153 @@
+"""
+Unit tests for the authenticated API key cache.
+"""
+
+import importlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import text, update
+
+from src.api.auth_middleware import get_current_api_key
+from src.api.cache import (
+    AuthIdentity,
+    get_cached_key,
+    store_api_key,
+    invalidate_api_key,
+    invalidate_project_keys,
+)
+from src.api.routes.scopes import delete_scope
+from src.database.models import AKMAPIKeyConfig, AKMProject, AKMScope
+from src.database.repositories.api_key_repository import api_key_repository
+
+auth_cache = importlib.import_module("src.api.cache.auth_cache")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    auth_cache._keys.clear()
+    yield
+    auth_cache._keys.clear()
+
+
+@pytest.fixture
+async def project_key(test_session):
+    """A project with two scopes and a key holding both; returns (project, scopes, plain key)"""
+    project = AKMProject(name="Cache Project", prefix="cache")
+    test_session.add(project)
+    await test_session.commit()
+    scopes = [
+        AKMScope(project_id=project.id, scope_name="cache:read"),
+        AKMScope(project_id=project.id, scope_name="cache:write"),
+    ]
+    test_session.add_all(scopes)
+    await test_session.commit()
+    _, plain_key = await api_key_repository.create_key(
+        test_session,
+        project_id=project.id,
+        name="Cached Key",
+        scopes=["cache:read", "cache:write"]
+    )
+    return project, scopes, plain_key
+
+
+def _request():
+    return SimpleNamespace(state=SimpleNamespace(), url=SimpleNamespace(path="/test"))
+
+
+def _identity(key_id, project_id):
+    return AuthIdentity(id=key_id, project_id=project_id, name="key", scope_names=frozenset(), config=None)
+
+
+@pytest.mark.unit
+class TestAuthCache:
+    """Test suite for the authenticated API key cache"""
+
+    def test_store_and_get(self):
+        """A stored identity is served until it expires"""
+        identity = _identity(1, 7)
+        store_api_key("a" * 64, identity)
+
+        assert get_cached_key("a" * 64) is identity
+        assert get_cached_key("b" * 64) is None
+
+    def test_expired_entry_is_dropped(self, monkeypatch):
+        """Entries past AUTH_CACHE_TTL are not served"""
+        monkeypatch.setattr(auth_cache, "AUTH_CACHE_TTL", -1)
+        store_api_key("a" * 64, _identity(1, 7))
+
+        assert get_cached_key("a" * 64) is None
+        assert auth_cache._keys == {}
+
+    def test_invalidate_by_key_and_project(self):
+        """Invalidation drops only the matching keys"""
+        store_api_key("a" * 64, _identity(1, 7))
+        store_api_key("b" * 64, _identity(2, 7))
+        store_api_key("c" * 64, _identity(3, 8))
+
+        invalidate_api_key(1)
+        assert get_cached_key("a" * 64) is None
+        assert get_cached_key("b" * 64) is not None
+
+        invalidate_project_keys(7)
+        assert get_cached_key("b" * 64) is None
+        assert get_cached_key("c" * 64) is not None
+
+    async def test_revoked_key_is_not_served_from_cache(self, test_session, project_key):
+        """A key revoked by another worker fails on its next cached use"""
+        _, _, plain_key = project_key
+        key = await get_current_api_key(_request(), plain_key, test_session)
+        assert get_cached_key(api_key_repository.hash_key(plain_key)) is not None
+
+        # Revoked without invalidating this process's cache
+        await api_key_repository.revoke_key(test_session, key.id)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_api_key(_request(), plain_key, test_session)
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert get_cached_key(api_key_repository.hash_key(plain_key)) is None
+
+    async def test_scope_removal_refreshes_cached_scopes(self, test_session, project_key):
+        """Deleting a scope drops cached keys so the next request sees the new scope set"""
+        project, scopes, plain_key = project_key
+        key = await get_current_api_key(_request(), plain_key, test_session)
+        assert key.scope_names == {"cache:read", "cache:write"}
+
+        # SQLite only cascades the key's scope assignment with foreign keys on
+        await test_session.execute(text("PRAGMA foreign_keys=ON"))
+        await delete_scope(project.id, scopes[1].id, hard_delete=True, api_key=key, session=test_session)
+
+        assert get_cached_key(api_key_repository.hash_key(plain_key)) is None
+        key = await get_current_api_key(_request(), plain_key, test_session)
+        assert key.scope_names == {"cache:read"}
+
+    async def test_changes_on_other_workers_refresh_cached_identity(self, test_session, project_key):
+        """Scope and config changes that skipped this process's invalidation are seen on the next hit"""
+        _, _, plain_key = project_key
+        key = await get_current_api_key(_request(), plain_key, test_session)
+        assert key.config.allowed_ips == ()
+
+        # Changed without invalidating this process's cache
+        await api_key_repository.set_scopes(test_session, key.id, ["cache:read"])
+        key = await get_current_api_key(_request(), plain_key, test_session)
+        assert key.scope_names == {"cache:read"}
+
+        await test_session.execute(
+            update(AKMAPIKeyConfig).where(AKMAPIKeyConfig.api_key_id == key.id).values(
+                ip_whitelist_enabled=True,
+                allowed_ips=["10.0.0.1"],
+                # SQLite timestamps only have second resolution
+                updated_at=datetime.now() + timedelta(seconds=1),
+            )
+        )
+        await test_session.commit()
+        key = await get_current_api_key(_request(), plain_key, test_session)
+        assert key.config.allowed_ips == ("10.0.0.1",)
+
+    async def test_unchanged_key_is_served_from_cache(self, test_session, project_key):
+        """A hit whose key is unchanged returns the cached identity"""
+        _, _, plain_key = project_key
+        first = await get_current_api_key(_request(), plain_key, test_session)
+        assert await get_current_api_key(_request(), plain_key, test_session) is first
@@ -0,0 +1,128 @@
+"""
+Unit tests for OpenAPI Scope Generator.
+"""
+
+import importlib
+import json
+import pickle
+
+import httpx
+import pytest
+
+from src.api.models.openapi_scopes import (
+    OpenAPISourceType,
+    ScopeGenerationStrategy,
+    ScopeNamingConfig,
+)
+from src.services.openapi_scope_generator import OpenAPIScopeGenerator
+
+# The services package re-exports the singleton under the module's name
+generator_module = importlib.import_module("src.services.openapi_scope_generator")
+
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1.0.0"},
+    "paths": {
+        "/pets": {
+            "get": {"operationId": "listPets", "tags": ["pets"]},
+            "post": {"operationId": "createPet", "tags": ["pets"]},
+        },
+        "/pets/{id}": {
+            "delete": {"operationId": "deletePet", "tags": ["pets"]},
+        },
+    },
+}
+
+
+@pytest.fixture
+def generator():
+    """Create generator instance with an empty URL cache."""
+    generator_module._url_spec_cache.clear()
+    yield OpenAPIScopeGenerator()
+    generator_module._url_spec_cache.clear()
+
+
+@pytest.fixture
+def mock_http(monkeypatch):
+    """Route httpx.AsyncClient through a MockTransport and record requests."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=SPEC, headers={"ETag": '"v1"'})
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(generator_module.httpx, "AsyncClient", client_factory)
+    return seen
+
+
+@pytest.mark.unit
+class TestOpenAPIScopeGenerator:
+    """Test suite for OpenAPI Scope Generator"""
+
+    async def test_load_from_url_uses_conditional_get(self, generator, mock_http):
+        """Second fetch sends If-None-Match and reuses the cached spec on 304"""
+        url = "https://example.com/openapi.json"
+
+        first, first_version = await generator._load_from_url(url)
+        second, second_version = await generator._load_from_url(url)
+
+        assert first == SPEC
+        assert second is first
+        assert first_version == second_version == '"v1"|'
+        assert "If-None-Match" not in mock_http[0].headers
+        assert mock_http[1].headers["If-None-Match"] == '"v1"'
+
+    async def test_url_cache_evicts_least_recently_used(self, generator, mock_http, monkeypatch):
+        """The URL cache keeps at most URL_SPEC_CACHE_MAX_ENTRIES specs"""
+        monkeypatch.setattr(generator_module, "URL_SPEC_CACHE_MAX_ENTRIES", 2)
+
+        await generator._load_from_url("https://example.com/a.json")
+        await generator._load_from_url("https://example.com/b.json")
+        await generator._load_from_url("https://example.com/a.json")
+        await generator._load_from_url("https://example.com/c.json")
+
+        assert list(generator_module._url_spec_cache) == [
+            "https://example.com/a.json",
+            "https://example.com/c.json",
+        ]
+
+    async def test_load_spec_uses_prebuilt_well_known_spec(
+        self, generator, mock_http, monkeypatch, tmp_path
+    ):
+        """Catalogued URLs are served from their pickle without an HTTP request"""
+        url = "https://example.com/petstore.json"
+        (tmp_path / "well_known_specs.json").write_text(json.dumps({"petstore": url}))
+        (tmp_path / "petstore.pickle").write_bytes(pickle.dumps(SPEC, protocol=5))
+        monkeypatch.setattr(generator_module, "WELL_KNOWN_SPECS_DIR", tmp_path)
+        monkeypatch.setattr(generator_module, "_well_known_urls", None)
+        monkeypatch.setattr(generator_module, "_well_known_specs", {})
+
+        spec = await generator.load_spec(OpenAPISourceType.URL, source=url)
+
+        assert spec == SPEC
+        assert mock_http == []
+
+    @pytest.mark.parametrize("strategy,expected", [
+        (ScopeGenerationStrategy.PATH_METHOD, {"api:pets_get:read", "api:pets_post:write", "api:pets_delete:delete"}),
+        (ScopeGenerationStrategy.PATH_RESOURCE, {"api:pets:read", "api:pets:write", "api:pets:delete"}),
+        (ScopeGenerationStrategy.TAG_BASED, {"api:pets:read", "api:pets:write", "api:pets:delete"}),
+        (ScopeGenerationStrategy.OPERATION_ID, {"api:listPets:execute", "api:createPet:execute", "api:deletePet:execute"}),
+    ])
+    def test_generate_scopes_per_strategy(self, generator, strategy, expected):
+        """Every strategy dispatches to its generator"""
+        result = generator.generate_scopes(
+            SPEC, strategy, ScopeNamingConfig(namespace="api"), "api", generate_wildcards=False
+        )
+
+        assert {scope.scope_name for scope in result.scopes} == expected
+        assert result.strategy_used == strategy
+        assert result.warnings == []
@@ -0,0 +1,103 @@
+"""
+Unit tests for OpenAPI scope route helpers.
+"""
+
+import pytest
+import yaml
+from fastapi import HTTPException, status
+
+from src.api.models import OpenAPISourceRequest, OpenAPISourceType
+from src.api.routes.openapi_scopes import (
+    MAX_YAML_ALIASES,
+    _check_yaml_aliases,
+    _compute_etag,
+    _inline_etag,
+    _yaml_input,
+)
+
+
+def _spec_with_wildcards(paths: int) -> bytes:
+    """A legitimate spec full of '*' and '&' characters but with no aliases"""
+    lines = [
+        "openapi: 3.0.0",
+        "info:",
+        "  title: Wildcards",
+        "  version: '1.0'",
+        "  description: '**Bold** docs, see https://example.com/?a=1&b=2'",
+        "paths:",
+    ]
+    for i in range(paths):
+        lines += [
+            f"  /items{i}:",
+            "    get:",
+            "      description: |",
+            "        Returns **all** items & their *tags*",
+            "      responses:",
+            "        '200':",
+            "          description: OK",
+            "          content:",
+            "            '*/*':",
+            "              schema:",
+            "                type: object",
+        ]
+    return "\n".join(lines).encode()
+
+
+def _billion_laughs(levels: int = 12) -> bytes:
+    """Each level aliases the previous one ten times"""
+    lines = ['l0: &l0 ["lol","lol","lol","lol","lol","lol","lol","lol","lol","lol"]']
+    for level in range(1, levels):
+        aliases = ",".join([f"*l{level - 1}"] * 10)
+        lines.append(f"l{level}: &l{level} [{aliases}]")
+    return "\n".join(lines).encode()
+
+
+@pytest.mark.unit
+class TestYAMLAliasGuard:
+    """Test suite for the YAML alias-expansion guard"""
+
+    def test_wildcards_and_ampersands_are_accepted(self):
+        """Media types, markdown and query strings are not aliases"""
+        content = _spec_with_wildcards(MAX_YAML_ALIASES)
+        assert content.count(b"*") > MAX_YAML_ALIASES
+
+        _check_yaml_aliases(content)
+        assert len(yaml.safe_load(content)["paths"]) == MAX_YAML_ALIASES
+
+    def test_billion_laughs_is_rejected(self):
+        """Documents with more alias tokens than the limit are refused"""
+        with pytest.raises(HTTPException) as exc_info:
+            _check_yaml_aliases(_billion_laughs())
+
+        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_upload_buffers_are_scanned_without_conversion(self):
+        """The bytearray from _read_upload is checked like bytes"""
+        with pytest.raises(HTTPException):
+            _check_yaml_aliases(bytearray(_billion_laughs()))
+
+        content = bytearray(_spec_with_wildcards(3))
+        _check_yaml_aliases(content)
+        assert len(yaml.load(_yaml_input(content), Loader=yaml.SafeLoader)["paths"]) == 3
+
+
+@pytest.mark.unit
+class TestSpecETag:
+    """Test suite for ETags of analyze/generate responses"""
+
+    def test_url_etag_follows_upstream_version(self):
+        """The same URL request gets a new ETag once the upstream spec changes"""
+        request = OpenAPISourceRequest(
+            project_id=1, source_type=OpenAPISourceType.URL, source="https://example.com/openapi.json"
+        )
+
+        assert _inline_etag(request) is None
+        assert _compute_etag(request, '"v1"|') != _compute_etag(request, '"v2"|')
+
+    def test_inline_etag_is_known_before_loading(self):
+        """Inline specs are fully described by the request body"""
+        request = OpenAPISourceRequest(
+            project_id=1, source_type=OpenAPISourceType.JSON, spec_data={"openapi": "3.0.0"}
+        )
+
+        assert _inline_etag(request) == _compute_etag(request, "inline")
@@ -0,0 +1,52 @@
+"""
+Unit tests for the project existence cache.
+"""
+
+import importlib
+
+import pytest
+from fastapi import HTTPException, status
+
+from src.api.cache import ensure_project_exists, invalidate_project
+
+project_cache = importlib.import_module("src.api.cache.project_cache")
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Count database lookups; Redis stays disabled"""
+    calls = []
+
+    async def get_by_id(session, project_id):
+        calls.append(project_id)
+        return None
+
+    monkeypatch.setattr(project_cache.project_repository, "get_by_id", get_by_id)
+    monkeypatch.setattr(project_cache, "get_redis", lambda: None)
+    project_cache._missing_projects.clear()
+    yield calls
+    project_cache._missing_projects.clear()
+
+
+@pytest.mark.unit
+class TestProjectCache:
+    """Test suite for the project existence cache"""
+
+    async def test_unknown_project_is_negatively_cached(self, lookups):
+        """Repeated misses for the same id hit the database once"""
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc_info:
+                await ensure_project_exists(None, 9999)
+            assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+        assert lookups == [9999]
+
+    async def test_invalidate_clears_negative_entry(self, lookups):
+        """A newly created project is not hidden by an earlier miss"""
+        with pytest.raises(HTTPException):
+            await ensure_project_exists(None, 42)
+        await invalidate_project(42)
+        with pytest.raises(HTTPException):
+            await ensure_project_exists(None, 42)
+
+        assert lookups == [42, 42]
@@ -6,7 +6,7 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from src.database.models import Base, AKMScope, AKMProject
-from src.database.repositories.scope_repository import ScopeRepository
+from src.database.repositories.scope_repository import ScopeRepository, ScopeRow
 
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -100,6 +100,16 @@ class TestScopeRepository:
         scope_names = {s.scope_name for s in scopes}
         assert scope_names == {"test:read", "test:write", "test:admin"}
 
+    async def test_list_by_project_seeks_after_cursor(self, repository, test_session, test_scopes, test_project):
+        """Keyset pages continue after the last scope_name seen"""
+        first = await repository.list_by_project(test_session, test_project.id, limit=2)
+        rest = await repository.list_by_project(
+            test_session, test_project.id, limit=2, after=first[-1].scope_name
+        )
+
+        assert [s.scope_name for s in first] == ["test:admin", "test:read"]
+        assert [s.scope_name for s in rest] == ["test:write"]
+
     async def test_bulk_exists_all_valid(self, repository, test_session, test_scopes):
         """Test checking multiple valid scopes"""
         result = await repository.bulk_exists(
@@ -154,3 +164,66 @@ class TestScopeRepository:
                 scope_name="test:read",
                 description="Duplicate scope"
             )
+
+    async def test_bulk_upsert_counts(self, repository, test_session, test_scopes, test_project):
+        """Test bulk upsert classifies created, updated and skipped scopes"""
+        result = await repository.bulk_upsert(
+            test_session,
+            test_project.id,
+            [
+                {"scope_name": "test:read", "description": "Read access", "is_active": True},
+                {"scope_name": "test:write", "description": "Write everything", "is_active": True},
+                ScopeRow("test:new", "New scope"),
+            ]
+        )
+        
+        assert result["created"] == 1
+        assert result["updated"] == 1
+        assert result["skipped"] == 1
+        assert result["errors"] == []
+        assert sorted(result["scope_names"]) == ["test:new", "test:write"]
+        
+        project_id = test_project.id
+        test_session.expire_all()
+        updated = await repository.get_by_project_and_name(test_session, project_id, "test:write")
+        created = await repository.get_by_project_and_name(test_session, project_id, "test:new")
+        assert updated.description == "Write everything"
+        assert created is not None
+
+    async def test_bulk_upsert_reports_invalid_items(self, repository, test_session, test_project):
+        """Test bulk upsert reports items without scope_name as errors"""
+        result = await repository.bulk_upsert(
+            test_session,
+            test_project.id,
+            [{"description": "Missing name"}]
+        )
+        
+        assert result["created"] == 0
+        assert len(result["errors"]) == 1
+
+    async def test_update_by_id_checks_project(self, repository, test_session, test_scopes, test_project):
+        """Test update_by_id only touches scopes owned by the given project"""
+        scope = test_scopes[0]
+        
+        missing = await repository.update_by_id(
+            test_session, scope.id, description="Changed", project_id=test_project.id + 1
+        )
+        updated = await repository.update_by_id(
+            test_session, scope.id, description="Changed", project_id=test_project.id
+        )
+        
+        assert missing is None
+        assert updated is not None
+        assert updated.description == "Changed"
+
+    async def test_check_project_and_duplicate(self, repository, test_session, test_scopes, test_project):
+        """Test project existence and name collision come back from one query"""
+        assert await repository.check_project_and_duplicate(
+            test_session, test_project.id, "test:read"
+        ) == (True, True)
+        assert await repository.check_project_and_duplicate(
+            test_session, test_project.id, "test:new"
+        ) == (True, False)
+        assert await repository.check_project_and_duplicate(
+            test_session, test_project.id + 1, "test:read"
+        ) == (False, False)
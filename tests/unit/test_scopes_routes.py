@@ -0,0 +1,53 @@
+"""
+Unit tests for scope list pagination.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+
+from src.api.routes.scopes import list_scopes
+from src.database.models import AKMProject, AKMScope
+
+
+@pytest.fixture
+async def project_id(test_session):
+    """A project holding exactly four scopes"""
+    project = AKMProject(name="Paged Project", prefix="paged")
+    test_session.add(project)
+    await test_session.commit()
+    test_session.add_all(
+        AKMScope(project_id=project.id, scope_name=f"paged:{name}")
+        for name in ("a", "b", "c", "d")
+    )
+    await test_session.commit()
+    return project.id
+
+
+async def _page(session, project_id, after=None):
+    response = Response()
+    scopes = await list_scopes(
+        project_id, response, limit=2, after=after,
+        api_key=SimpleNamespace(), session=session
+    )
+    return [scope.scope_name for scope in scopes], response.headers.get("X-Next-Cursor")
+
+
+@pytest.mark.unit
+class TestListScopesCursor:
+    """Test suite for keyset pagination of list_scopes"""
+
+    async def test_cursor_only_when_another_page_exists(self, test_session, project_id):
+        """A full last page carries no cursor"""
+        names, cursor = await _page(test_session, project_id)
+        assert names == ["paged:a", "paged:b"]
+        assert cursor == "paged:b"
+
+        names, cursor = await _page(test_session, project_id, after=cursor)
+        assert names == ["paged:c", "paged:d"]
+        assert cursor is None
+
+    async def test_cursor_past_the_end_returns_empty_page(self, test_session, project_id):
+        """Following a cursor past the last scope is not a 404"""
+        assert await _page(test_session, project_id, after="paged:d") == ([], None)